@@ -1,20 +1,44 @@
 import streamlit as st
-import google.generativeai as genai
+import copy
+import hashlib
 import os
-from dotenv import load_dotenv
-
-# 환경변수 로드 및 API 키 설정
-load_dotenv()
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-
-if not GOOGLE_API_KEY:
-    st.error("GOOGLE_API_KEY가 설정되지 않았습니다. .env 파일을 확인해주세요.")
-    st.stop()
-
-genai.configure(api_key=GOOGLE_API_KEY)
-
-# GPT 모델 초기화
-model = genai.GenerativeModel("gemini-1.5-pro")
+import sqlite3
+import time
+from contextlib import contextmanager
+# resources는 .env를 읽으므로 환경변수를 쓰는 다른 모듈보다 먼저 import
+from resources import (
+    DERIVED_KEY,
+    SESSION_KEYS,
+    get_backend,
+    get_prefetcher,
+    get_question_packs,
+    get_response_cache,
+    get_resume_renderer,
+    get_section_polisher,
+    get_session_journal,
+    get_session_memory,
+    get_session_store,
+    get_single_flight,
+    get_telemetry,
+    get_term_index,
+)
+from conversation_memory import ConversationMemory, extractive_summary, truncate_tokens
+import interview
+from interview import STEP_TOPICS, fallback_question, new_collected_info, new_resume_data, session_pack
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from llm_backend import BackendConfigError, estimate_tokens
+from llm_cache import make_cache_key
+from polish import POLISH_SYSTEM_PROMPT
+from question_packs import QuestionPackError
+from resilient_client import CircuitOpenError
+from resume_graph import SECTIONS, SectionVersions, affected, artifact_key
+from resume_render import DEFAULT_TEMPLATE, FORMATS, TEMPLATES
+from retrieval import SessionIndex, document_text
+from session_journal import SessionJournal, dumps
+from session_model import DerivedState, Sender, bot_message, restore_history, session_memory, share_strings, user_message
+from session_store import SessionStoreError, VersionConflict
+from telemetry import BYTES_BUCKETS, SIZE_BUCKETS
+from term_index import CATEGORY_LABELS, TECH_CATEGORIES
 
 # 페이지 설정
 st.set_page_config(
@@ -23,19 +47,119 @@ st.set_page_config(
     layout="wide"
 )
 
+# 계측 (단계별 소요 시간/토큰/캐시 적중/실행 횟수)
+telemetry = get_telemetry()
+
+# 모델 백엔드 초기화 (LLM_BACKEND=gemini|stub)
+try:
+    backend = get_backend()
+except BackendConfigError as e:
+    st.error(str(e))
+    st.stop()
+
+# 공유 세션 저장소 설정 확인
+try:
+    get_session_store()
+except SessionStoreError as e:
+    st.error(str(e))
+    st.stop()
+
+# 직무별 질문 팩 (QUESTION_PACKS_DIR) - 처음 불러올 때 검증/컴파일
+try:
+    get_question_packs()
+except QuestionPackError as e:
+    st.error(str(e))
+    st.stop()
+
+# 현재 세션의 질문 팩 (답변에서 찾은 직무 기준, 직무를 모르면 default 팩)
+def current_pack():
+    return session_pack(st.session_state, get_question_packs().get())
+
+# 저장소에서 읽은 상태로 session_state를 교체
+def apply_session_state(state):
+    for key in SESSION_KEYS:
+        if key in state:
+            st.session_state[key] = state[key]
+        elif key in st.session_state:
+            del st.session_state[key]
+    if isinstance(st.session_state.get("chat_history"), list):
+        # JSON으로 복원한 메시지/답변은 값마다 새 문자열이므로 Message 레코드로 되돌리고 같은 내용은 한 객체로 합침
+        st.session_state.chat_history = restore_history(st.session_state.chat_history)
+        share_strings(st.session_state)
+    # 검색 인덱스/검증 결과는 복원한 대화로 다시 만듦
+    st.session_state.pop(DERIVED_KEY, None)
+
+def session_snapshot():
+    return {key: st.session_state[key] for key in SESSION_KEYS if key in st.session_state}
+
+def state_digest(state):
+    return hashlib.blake2b(dumps(state).encode("utf-8"), digest_size=16).hexdigest()
+
+# URL의 resume 토큰으로 저장된 세션을 복원하거나, 새 토큰을 발급
+def restore_session():
+    journal, store = get_session_journal(), get_session_store()
+    if (journal is None and store is None) or "session_id" in st.session_state:
+        return
+    token = st.query_params.get("resume")
+    restored, version = (None, 0)
+    if token and store is not None:
+        restored, version = store.load(token)
+    if token and restored is None and journal is not None:
+        try:
+            restored = journal.load(token)
+        except sqlite3.Error:
+            st.toast("저장된 인터뷰를 불러오지 못해 새로 시작할게요.", icon="⚠️")
+    if restored is None:
+        token = SessionJournal.new_session_id()
+        st.query_params["resume"] = token
+    else:
+        apply_session_state(restored)
+    st.session_state.session_id = token
+    # 복원한 상태를 그대로 다시 저장하지 않도록 다이제스트를 기억
+    st.session_state.session_store = {"version": version, "digest": state_digest(session_snapshot()) if version else None}
+    if journal is not None:
+        tracker = {}
+        journal.track(token, st.session_state, tracker, write=False)
+        st.session_state.journal = tracker
+
+# 이번 실행에서 바뀐 상태를 저장
+# - 저널: 바뀐 키만 기록 (실제 쓰기는 백그라운드에서 묶어서 처리)
+# - 공유 저장소: 읽은 버전 그대로일 때만 저장하고, 다른 실행이 먼저 썼으면 최신 상태로 다시 실행
+@telemetry.timed("save_session")
+def save_session():
+    session_id = st.session_state.get("session_id")
+    if not session_id:
+        return
+    journal, store = get_session_journal(), get_session_store()
+    tracker = st.session_state.get("journal")
+    if journal is not None and tracker is not None:
+        journal.track(session_id, st.session_state, tracker)
+
+    store_state = st.session_state.get("session_store")
+    if store is None or store_state is None:
+        return
+    state = session_snapshot()
+    digest = state_digest(state)
+    if digest == store_state["digest"]:
+        return
+    try:
+        store_state["version"] = store.save(session_id, state, store_state["version"])
+        store_state["digest"] = digest
+    except VersionConflict:
+        latest, version = store.load(session_id)
+        if latest is not None:
+            apply_session_state(latest)
+        st.session_state.session_store = {"version": version, "digest": state_digest(session_snapshot())}
+        st.toast("다른 창에서 진행된 내용으로 화면을 갱신했어요.")
+        st.rerun()
+
+restore_session()
+
 # 세션 상태 초기화
 if "step" not in st.session_state:
     st.session_state.step = 1
     st.session_state.chat_history = []
-    st.session_state.resume_data = {
-        "basic_info": {},
-        "job_info": {},
-        "experience": [],
-        "projects": [],
-        "skills": [],
-        "certificates": [],
-        "summary": ""
-    }
+    st.session_state.resume_data = new_resume_data()
     st.session_state.current_question = 0
     st.session_state.context = {
         "current_topic": None,
@@ -44,39 +168,7 @@ if "step" not in st.session_state:
     }
     # 단계별 상태 초기화 (new_step은 더 이상 사용하지 않음)
     if "collected_info" not in st.session_state:
-        st.session_state.collected_info = {
-            "job_info": {
-                "지원 직무": False,
-                "관심 기술 분야": False,
-                "주로 다룬 기술": False
-            },
-            "experience": {
-                "회사명": False,
-                "직무": False,
-                "근무 기간": False,
-                "사용 기술": False,
-                "주요 업무": False,
-                "성과/결과": False
-            },
-            "projects": {
-                "프로젝트명": False,
-                "기간": False,
-                "역할": False,
-                "사용 기술": False,
-                "성과/결과": False
-            },
-            "skills": {
-                "언어": False,
-                "프레임워크": False,
-                "DB/인프라": False,
-                "기타 도구": False
-            },
-            "summary": {
-                "간단한 자기소개": False,
-                "일하는 스타일": False,
-                "커리어 방향 or 포부": False
-            }
-        }
+        st.session_state.collected_info = new_collected_info(get_question_packs().get().default)
 
 # 진행 상태 표시
 def show_progress():
@@ -85,350 +177,510 @@ def show_progress():
     st.progress(current_step / len(steps))
     st.caption(f"Step {current_step}/{len(steps)}: {steps[current_step-1]}")
 
-# GPT 응답 생성 함수
-def generate_gpt_response(prompt):
+# 단계 완료 신호
+STEP_COMPLETE_MARKER = "STEP_COMPLETE"
+
+# 캐시 키 - 고정 프롬프트(system instruction)도 키에 포함
+def response_cache_key(prompt, system_instruction=None, response_schema=None):
+    config = {}
+    if system_instruction:
+        config["system_instruction"] = system_instruction
+    if response_schema:
+        config["response_schema"] = response_schema
+    return make_cache_key(prompt, backend.model_name, config or None)
+
+# 모델 호출 (캐시 우선, 동일 요청은 한 번만 전송) - 오류는 호출 측에서 처리
+def call_model(prompt, system_instruction=None, response_schema=None):
+    kind = "schema" if response_schema else "text"
+    with telemetry.span("model_call", kind=kind) as span:
+        cache = get_response_cache()
+        key = response_cache_key(prompt, system_instruction, response_schema)
+        cached = cache.get(key)
+        if cached is not None:
+            span["cache"] = "hit"
+            telemetry.inc("model_requests_total", kind=kind, cache="hit")
+            return cached
+        prefetched = take_prefetched(key)
+        if prefetched is not None:
+            span["cache"] = "prefetch"
+            telemetry.inc("model_requests_total", kind=kind, cache="prefetch")
+            cache.set(key, prefetched)
+            return prefetched
+
+        def fetch():
+            span["cache"] = "miss"
+            text = backend.generate(prompt, system_instruction=system_instruction, response_schema=response_schema)
+            cache.set(key, text)
+            record_model_tokens(span, prompt, system_instruction, text)
+            return text
+
+        # 같은 요청을 기다리는 세션도 leader의 마감 시간보다 오래 기다리지 않음
+        timeout = float(os.getenv("LLM_SINGLE_FLIGHT_TIMEOUT", str(backend.deadline)))
+        span["cache"] = "shared"
+        try:
+            return get_single_flight().do(key, fetch, timeout=timeout)
+        except Exception:
+            span["cache"] = "error"
+            raise
+        finally:
+            telemetry.inc("model_requests_total", kind=kind, cache=span["cache"])
+
+# 추측 실행 보관 키 - 저장된 세션 id, 없으면 Streamlit 접속 id
+def prefetch_session():
+    ctx = get_script_run_ctx()
+    return st.session_state.get("session_id") or (ctx.session_id if ctx else None)
+
+# 곧 보낼 가능성이 높은 모델 요청을 백그라운드에서 미리 실행 (이미 캐시에 있으면 생략)
+def prefetch_model(prompt, system_instruction=None, response_schema=None):
+    prefetcher, session = get_prefetcher(), prefetch_session()
+    if prefetcher is None or not session:
+        return
+    key = response_cache_key(prompt, system_instruction, response_schema)
+    if get_response_cache().get(key) is not None:
+        return
+    prefetcher.submit(session, key, lambda: backend.generate(
+        prompt, system_instruction=system_instruction, response_schema=response_schema,
+    ))
+
+# 미리 실행한 응답 - 예측이 맞으면 결과(실행 중이면 기다림), 없거나 빗나가면 None
+# (세션의 다른 예측은 빗나간 것으로 보고 버림)
+def take_prefetched(key):
+    prefetcher, session = get_prefetcher(), prefetch_session()
+    if prefetcher is None or not session:
+        return None
+    hit, text = prefetcher.take(session, key, timeout=backend.deadline)
+    return text if hit else None
+
+# 상태가 바뀌어 쓸모없어진 예측 버리기 (새 답변 입력, 다음 단계로 이동, 처음으로)
+def discard_prefetched():
+    prefetcher, session = get_prefetcher(), prefetch_session()
+    if prefetcher is not None and session:
+        prefetcher.discard(session)
+
+# 이력서 문장 다듬기용 모델 호출 함수 - 워커 스레드에서 실행되므로 st.*를 쓰지 않도록
+# 응답 캐시는 호출 전에 스크립트 스레드에서 가져옴
+def polish_generate():
+    cache = get_response_cache()
+
+    def generate(prompt):
+        key = response_cache_key(prompt, POLISH_SYSTEM_PROMPT)
+        cached = cache.get(key)
+        if cached is not None:
+            telemetry.inc("model_requests_total", kind="polish", cache="hit")
+            return cached
+        with telemetry.span("polish_section") as span:
+            span["cache"] = "miss"
+            try:
+                text = backend.generate(prompt, system_instruction=POLISH_SYSTEM_PROMPT)
+            except Exception:
+                span["cache"] = "error"
+                raise
+            finally:
+                telemetry.inc("model_requests_total", kind="polish", cache=span["cache"])
+            record_model_tokens(span, prompt, POLISH_SYSTEM_PROMPT, text)
+        cache.set(key, text)
+        return text
+
+    return generate
+
+# 입출력 토큰 수 추정치 기록 (system instruction은 입력에 포함)
+def record_model_tokens(span, prompt, system_instruction, output):
+    input_tokens = estimate_tokens(prompt) + estimate_tokens(system_instruction)
+    output_tokens = estimate_tokens(output)
+    span["input_tokens"] = input_tokens
+    span["output_tokens"] = output_tokens
+    telemetry.inc("model_tokens_total", input_tokens, direction="input")
+    telemetry.inc("model_tokens_total", output_tokens, direction="output")
+
+# 모델 호출 실패 시 현재 단계에서 비어 있는 필드를 묻는 기본 질문
+def current_fallback_question():
+    topic = st.session_state.context.get("current_topic") or "job_info"
+    info = st.session_state.collected_info.get(topic, {})
+    return fallback_question(current_pack().step(topic), [name for name, collected in info.items() if not collected])
+
+# 모델 호출 실패 안내 - 오류 문구는 대화에 남기지 않고 알림으로만 표시
+def notify_model_failure(error):
+    if isinstance(error, CircuitOpenError):
+        st.toast("AI 서버가 불안정해 잠시 기본 질문으로 이어갈게요.", icon="⚠️")
+    else:
+        st.toast("AI 응답이 지연되어 기본 질문으로 이어갈게요.", icon="⚠️")
+
+# GPT 응답 생성 함수 (stream=True이면 텍스트 조각을 yield하는 제너레이터 반환)
+# 모델 호출에 실패하면 fallback(없으면 현재 단계의 기본 질문)을 응답으로 사용
+def generate_gpt_response(prompt, stream=False, system_instruction=None, fallback=None):
+    if stream:
+        return stream_gpt_response(prompt, system_instruction, fallback)
     try:
-        response = model.generate_content(prompt)
-        return response.text
+        return call_model(prompt, system_instruction)
     except Exception as e:
-        return f"❌ 오류: {e}"
-
-# 질문 목록
-QUESTIONS = {
-    "job_info": [
-        "주로 사용하시는 백엔드 기술 스택은 무엇인가요? (예: Java, Spring, Python, Django, Node.js, Go, PHP, Ruby on Rails, 데이터베이스 등) 각 기술에 대한 숙련도를 어느 정도라고 생각하시는지도 함께 알려주시면 더 좋습니다.",
-        "백엔드 개발 경험을 구체적인 프로젝트로 설명해주실 수 있나요? 프로젝트에서 맡았던 역할과 기여한 부분을 중심으로 설명해주세요.",
-        "API 개발 경험이 있으신가요? 있다면 어떤 종류의 API를 개발해보셨는지 알려주세요.",
-        "데이터베이스 관련 경험은 어떠신가요? 어떤 데이터베이스를 사용해보셨고, 데이터 모델링이나 쿼리 최적화 경험이 있으신지 궁금합니다.",
-        "혹시 백엔드 개발과 관련된 자격증이나 수상 경력이 있으신가요?"
-    ],
-    "experience": [
-        "가장 최근에 수행하신 프로젝트나 업무에 대해 설명해주세요. 어떤 역할을 맡으셨고, 어떤 성과를 이루셨나요?",
-        "이전 프로젝트에서 가장 어려웠던 기술적 도전과 그것을 어떻게 해결하셨는지 설명해주세요.",
-        "팀 프로젝트에서 협업 경험에 대해 말씀해주세요. 특히 기술적 의사결정이나 문제 해결 과정에서의 경험을 중심으로 설명해주시면 좋겠습니다."
-    ],
-    "projects": [
-        "가장 자신 있는 프로젝트 하나를 선정해서, 프로젝트의 목적, 사용한 기술 스택, 본인의 역할, 그리고 달성한 성과를 구체적으로 설명해주세요.",
-        "프로젝트 진행 중 발생했던 주요 문제점과 그 해결 과정을 설명해주세요.",
-        "프로젝트에서 개선한 성능이나 품질 관련 사례가 있다면 말씀해주세요."
-    ],
-    "skills": [
-        "주요 기술 스택과 각 기술에 대한 숙련도를 설명해주세요.",
-        "최근에 새롭게 학습하거나 향상시킨 기술이 있다면 말씀해주세요.",
-        "향후 발전시키고 싶은 기술 영역은 무엇인가요?"
-    ],
-    "summary": [
-        "자신의 강점과 특기를 중심으로 간단한 자기소개를 해주세요.",
-        "지원하시는 직무에서 본인이 가진 차별화된 경험이나 역량은 무엇인가요?",
-        "앞으로의 커리어 목표는 무엇인가요?"
-    ]
-}
+        notify_model_failure(e)
+        return fallback or current_fallback_question()
+
+# 모델 지연 시간 기록 - 첫 토큰까지의 시간(ttft)을 대표 지연 시간으로 사용
+def record_model_latency(ttft, total):
+    st.session_state.last_model_latency = {"ttft": ttft, "total": total}
+    telemetry.observe("model_ttft_seconds", ttft)
+
+# 스트리밍 응답 생성 함수 - 도착하는 대로 텍스트 조각을 yield
+def stream_gpt_response(prompt, system_instruction=None, fallback=None):
+    start = time.perf_counter()
+    ttft = None
+    span = {"kind": "stream", "cache": "miss"}
+    cache = get_response_cache()
+    key = response_cache_key(prompt, system_instruction)
+    try:
+        cached = cache.get(key)
+        if cached is not None:
+            span["cache"] = "hit"
+            ttft = time.perf_counter() - start
+            yield cached
+            return
+        prefetched = take_prefetched(key)
+        if prefetched is not None:
+            span["cache"] = "prefetch"
+            ttft = time.perf_counter() - start
+            cache.set(key, prefetched)
+            yield prefetched
+            return
+        def fetch():
+            span["cache"] = "miss"
+            return backend.stream(prompt, system_instruction=system_instruction)
+
+        # 같은 요청이 진행 중이면 그 스트림의 조각을 처음부터 이어 받음 (다음 조각은 leader의 마감 시간까지 기다림)
+        timeout = float(os.getenv("LLM_SINGLE_FLIGHT_TIMEOUT", str(backend.deadline)))
+        span["cache"] = "shared"
+        received = []
+        for text in get_single_flight().stream(key, fetch, timeout=timeout):
+            if not text:
+                continue
+            if ttft is None:
+                ttft = time.perf_counter() - start
+            received.append(text)
+            yield text
+        # 끝까지 정상적으로 받은 응답만 캐시 (토큰은 실제로 호출한 leader만 기록)
+        cache.set(key, "".join(received))
+        if span["cache"] == "miss":
+            record_model_tokens(span, prompt, system_instruction, "".join(received))
+    except Exception as e:
+        span["cache"] = "error"
+        # 받은 내용이 없으면 기본 질문으로 대신하고, 일부만 받은 경우에는 받은 내용만 유지
+        if ttft is None:
+            notify_model_failure(e)
+            yield fallback or current_fallback_question()
+        else:
+            st.toast("AI 응답이 중간에 끊겼습니다.", icon="⚠️")
+    finally:
+        total = time.perf_counter() - start
+        record_model_latency(ttft if ttft is not None else total, total)
+        telemetry.inc("model_requests_total", kind="stream", cache=span["cache"])
+        telemetry.record_span("model_stream", total, start, **span)
+
+# 스트림에서 STEP_COMPLETE 신호를 걸러내고 발견 여부를 state에 기록
+def strip_step_marker(chunks, state):
+    state["step_complete"] = False
+    buffer = ""
+    keep = len(STEP_COMPLETE_MARKER) - 1
+    for chunk in chunks:
+        buffer += chunk
+        if STEP_COMPLETE_MARKER in buffer:
+            state["step_complete"] = True
+            buffer = buffer.replace(STEP_COMPLETE_MARKER, "")
+        # 조각 경계에 걸친 신호를 위해 끝부분은 남겨둠
+        if len(buffer) > keep:
+            yield buffer[:-keep]
+            buffer = buffer[-keep:]
+    if buffer:
+        yield buffer
+
+# 스트리밍 응답을 assistant 메시지로 점진적으로 출력하고, 완성된 메시지를 한 번만 저장
+def render_streamed_response(chunks):
+    marker_state = {}
+    slot = st.empty()
+    with slot.container():
+        with st.chat_message("assistant"):
+            text = st.write_stream(strip_step_marker(chunks, marker_state))
+    text = text.strip() if isinstance(text, str) else "".join(map(str, text)).strip()
+    # STEP_COMPLETE 신호만 온 경우에는 빈 말풍선을 지우고 대화에도 남기지 않음
+    if not text:
+        slot.empty()
+    else:
+        st.session_state.chat_history.append(bot_message(text))
+        st.session_state.context["last_response"] = text
+    if marker_state.get("step_complete"):
+        st.session_state.step_complete_confirmed = True
+    return text
 
-# 필드 정의
-FIELD_DEFINITIONS = {
-    "job_info": [
-        ("지원 직무", "지원하시는 직무를 명확하게 파악"),
-        ("관심 기술 분야", "관심 있는 기술 분야 파악"),
-        ("주로 다룬 기술", "주요 기술 스택 파악")
-    ],
-    "experience": [
-        ("회사명", "회사명 파악"),
-        ("직무", "담당 직무 파악"),
-        ("근무 기간", "근무 기간 파악"),
-        ("사용 기술", "사용한 기술 스택 파악"),
-        ("주요 업무", "주요 업무 내용 파악"),
-        ("성과/결과", "주요 성과나 결과 파악")
-    ],
-    "projects": [
-        ("프로젝트명", "프로젝트명 파악"),
-        ("기간", "프로젝트 기간 파악"),
-        ("역할", "프로젝트에서의 역할 파악"),
-        ("사용 기술", "사용한 기술 스택 파악"),
-        ("성과/결과", "프로젝트 성과나 결과 파악")
-    ],
-    "skills": [
-        ("언어", "프로그래밍 언어 숙련도 파악"),
-        ("프레임워크", "프레임워크 숙련도 파악"),
-        ("DB/인프라", "데이터베이스/인프라 숙련도 파악"),
-        ("기타 도구", "기타 개발 도구 숙련도 파악")
-    ],
-    "summary": [
-        ("간단한 자기소개", "자기소개 내용 파악"),
-        ("일하는 스타일", "업무 스타일 파악"),
-        ("커리어 방향 or 포부", "커리어 목표 파악")
-    ]
+# 이력서 생성 관련 함수들
+REQUIRED_FIELDS = {
+    "basic_info": ["name", "email"],
+    "job_info": ["title"],
+    "summary": [],
+    "experience": [],
+    "projects": [],
+    "skills": []
 }
 
-# 이력서 생성 관련 함수들
+def validate_section(data, section):
+    if not data.get(section):
+        return [section]
+    return [f"{section}.{field}" for field in REQUIRED_FIELDS[section] if not data[section].get(field)]
+
+# 섹션별 검증 결과는 validation.<섹션> 키로 세션에 보관 - 바뀐 섹션만 다시 검사
 def validate_resume_data(data):
-    required_fields = {
-        "basic_info": ["name", "email"],
-        "job_info": ["title"],
-        "summary": [],
-        "experience": [],
-        "projects": [],
-        "skills": []
-    }
-    
+    cache = derived_state().setdefault("validation_cache", {})
     missing_fields = []
-    for section, fields in required_fields.items():
-        if not data.get(section):
-            missing_fields.append(section)
-        elif fields:
-            for field in fields:
-                if not data[section].get(field):
-                    missing_fields.append(f"{section}.{field}")
-    
+    for section in REQUIRED_FIELDS:
+        key = artifact_key(f"validation.{section}", data)
+        if cache.get(section, (None,))[0] != key:
+            cache[section] = (key, validate_section(data, section))
+        missing_fields.extend(cache[section][1])
     return missing_fields
 
+# 섹션 버전 갱신 - 이력서 확인 화면에 돌아올 때마다 바뀐 섹션과 다시 계산할 결과를 기록
+def track_section_versions(data):
+    tracker = st.session_state.get("section_versions")
+    first = tracker is None
+    if first:
+        tracker = st.session_state.section_versions = SectionVersions()
+    nodes = tracker.update(data)
+    if nodes and not first:
+        for node in nodes:
+            telemetry.inc("resume_section_changes_total", node=node)
+        st.session_state.section_changes = {"changed": sorted(nodes), "affected": sorted(affected(nodes))}
+
+# 다운로드 파일 형식 표시 이름
+RESUME_FORMAT_LABELS = {
+    "pdf": "PDF",
+    "docx": "Word (DOCX)",
+    "html": "HTML",
+    "md": "Markdown",
+    "txt": "텍스트",
+}
+
 def build_resume_text(data):
-    try:
-        basic_info = data.get("basic_info", {})
-        job_info = data.get("job_info", {})
-        
-        # 직무 정보 처리 개선
-        job_title = job_info.get('title', '미입력')
-        job_tech = job_info.get('answer_0', '')
-        job_exp = job_info.get('answer_1', '')
-        
-        resume_text = f"""
-[인적사항]
-이름: {basic_info.get('name', '미입력')}
-이메일: {basic_info.get('email', '미입력')}
-전화번호: {basic_info.get('phone', '미입력')}
-포트폴리오: {basic_info.get('portfolio', '없음')}
-
-[지원 직무]
-직무: {job_title}
-주요 기술: {job_tech}
-주요 경험: {job_exp}
-
-[자기소개]
-"""
-        # 자기소개 정보 추가 (개선됨)
-        summaries = data.get("summary", [])
-        if summaries:
-            for summary in summaries:
-                resume_text += f"{summary}\n"
-        else:
-            resume_text += "자기소개가 아직 작성되지 않았습니다.\n"
-
-        resume_text += "\n[경력 및 프로젝트 경험]"
-        # 경력 정보 추가
-        experiences = data.get("experience", [])
-        if experiences:
-            for i, exp in enumerate(experiences, 1):
-                resume_text += f"\n{i}. {exp}"
-        else:
-            resume_text += "\n경력 정보가 아직 작성되지 않았습니다."
-
-        resume_text += "\n\n[프로젝트 경험]"
-        # 프로젝트 정보 추가
-        projects = data.get("projects", [])
-        if projects:
-            for i, proj in enumerate(projects, 1):
-                resume_text += f"\n{i}. {proj}"
-        else:
-            resume_text += "\n프로젝트 정보가 아직 작성되지 않았습니다."
-
-        resume_text += "\n\n[기술 스택]"
-        # 기술 스택 추가
-        skills = data.get("skills", [])
-        if skills:
-            for skill in skills:
-                resume_text += f"\n{skill}"
-        else:
-            resume_text += "\n기술 스택이 아직 작성되지 않았습니다."
+    return render_resume(data, "txt")
 
-        return resume_text
+@telemetry.timed("render_resume")
+def render_resume(data, fmt, template=DEFAULT_TEMPLATE):
+    try:
+        return get_resume_renderer().render(data, fmt, template)
     except Exception as e:
         st.error(f"이력서 생성 중 오류가 발생했습니다: {str(e)}")
         return None
 
-# ReAct 기반 프롬프트 생성
-def create_react_prompt(user_input, context):
-    # 기본 정보가 있는 경우에만 포함
-    basic_info_section = ""
-    if st.session_state.resume_data["basic_info"]:
-        basic_info = st.session_state.resume_data["basic_info"]
-        basic_info_section = f"""
-        사용자의 기본 정보:
-        이름: {basic_info.get('name', '')}
-        이메일: {basic_info.get('email', '')}
-        전화번호: {basic_info.get('phone', '')}
-        포트폴리오: {basic_info.get('portfolio', '')}
-        """
+# ReAct 프롬프트의 고정 부분 - 모든 사용자/턴에 동일하므로 한 번만 만들어 system instruction으로 전달
+REACT_SYSTEM_PROMPT = """당신은 IT 이력서 작성을 도와주는 친근한 챗봇입니다. 사용자와 자연스럽게 대화하면서 경험과 역량을 파악해주세요.
+
+대화 규칙:
+- 친근하고 자연스러운 말투를 사용하세요. 예를 들어 '~해주세요' 대신 '~해볼까요?', '~하시나요?' 등을 사용하세요.
+- 반드시 한 번에 하나의 질문만 하세요. 여러 질문을 한꺼번에 하지 마세요.
+- 사용자의 답변을 잘 듣고 공감하는 태도로 대화를 이어가세요.
+- IT 관련 내용을 다룰 때도 쉽고 친근하게 설명해주세요.
+- 사용자의 답변이 짧다면, 구체적인 예시를 들어 더 자세히 이야기해볼 수 있도록 유도하세요.
+- 추가 정보를 요청할 때는 이전 대화 내용을 반영하여 자연스럽게 이어가세요.
+- 사용자가 언급한 기술이나 경험을 기억하고, 그것을 바탕으로 다음 질문을 이어가세요.
+- 각 단계에서 필요한 정보를 하나씩 순차적으로 수집하세요.
+
+이력서 작성 가이드라인:
+- STAR 방식(상황, 과제, 행동, 결과)을 자연스럽게 대화에 녹여주세요.
+- 구체적인 수치나 성과를 이야기할 수 있도록 도와주세요.
+- 기술 스택과 경험을 명확하게 파악하되, 대화가 딱딱하지 않도록 해주세요.
+- 프로젝트의 규모나 기간을 자연스럽게 물어보세요.
+
+내부 처리 과정:
+1. 현재 상황을 파악하고 다음 질문을 준비하세요.
+2. 대화가 자연스럽게 이어지도록 해주세요.
+3. 사용자의 응답을 잘 듣고 이해한 후 다음 단계를 계획하세요.
+4. 필요한 정보가 모두 수집되었다고 판단되면 'STEP_COMPLETE'를 포함해서 답변하세요.
+
+사용자 메시지에는 현재 대화 상황과 사용자 입력이 주어집니다. 그에 맞는 다음 응답을 생성해주세요."""
+
+# 단계 대화 요약 프롬프트 (기존 요약 + 새 대화)
+def summary_prompt(previous, messages, max_tokens):
+    conversation = "\n".join(f"{'사용자' if sender == Sender.USER else '챗봇'}: {msg}" for sender, msg in messages)
+    return f"""다음은 이력서 작성 인터뷰의 기존 요약과 새로 추가된 대화입니다.
+기존 요약에 새 대화의 사실(회사, 기간, 기술, 역할, 성과 등)을 반영해 갱신된 요약만 출력해주세요.
+요약은 {max_tokens}토큰 이내의 짧은 bullet 목록으로 작성해주세요.
+
+기존 요약:
+{previous or '(없음)'}
+
+새 대화:
+{conversation}"""
+
+# 이전 단계 대화를 모델로 요약 (실패하면 모델 없이 요약)
+def summarize_with_model(previous, messages, max_tokens):
+    try:
+        return truncate_tokens(call_model(summary_prompt(previous, messages, max_tokens)).strip(), max_tokens)
+    except Exception:
+        return extractive_summary(previous, messages, max_tokens)
+
+# 세션별 대화 메모리 (PROMPT_TOKEN_BUDGET 등으로 예산 조정, MEMORY_SUMMARIZER=model이면 모델로 요약)
+# state를 주면 세션 메모리 대신 그 상태(추측 실행용 복사본 등)를 사용
+def get_conversation_memory(state=None):
+    if "memory" not in st.session_state:
+        st.session_state.memory = {}
+    return ConversationMemory(
+        st.session_state.memory if state is None else state,
+        budget_tokens=int(os.getenv("PROMPT_TOKEN_BUDGET", "1500")),
+        recent_messages=int(os.getenv("MEMORY_RECENT_MESSAGES", "4")),
+        field_tokens=int(os.getenv("MEMORY_FIELD_TOKENS", "200")),
+        summary_tokens=int(os.getenv("MEMORY_SUMMARY_TOKENS", "250")),
+        summarizer=summarize_with_model if os.getenv("MEMORY_SUMMARIZER") == "model" else None,
+        # 세션 검색을 쓰면 이전 단계는 요약 대신 관련 답변만 넣음
+        earlier_summaries=retrieval_top_k() <= 0,
+    )
+
+# 프롬프트에 넣을 관련 이전 답변 수 (0이면 세션 검색을 끄고 이전 단계 요약과 직무 답변 전체를 넣음)
+def retrieval_top_k():
+    return int(os.getenv("RETRIEVAL_TOP_K", "4"))
+
+# 세션 검색 인덱스 - 새 답변/바뀐 추출 필드만 색인 (없으면 지금까지의 대화로 새로 만듦)
+# speculative=True이면 세션의 인덱스는 그대로 두고 복사본을 색인해서 돌려줌
+def get_session_index(speculative=False):
+    index = (st.session_state.get(DERIVED_KEY) or {}).get("retrieval_index")
+    if speculative:
+        index = copy.deepcopy(index) if index is not None else SessionIndex()
+    elif index is None:
+        index = derived_state()["retrieval_index"] = SessionIndex()
+    pack = current_pack()
+    labels = {}
+    for step, topic in STEP_TOPICS.items():
+        step_pack = pack.step(topic)
+        if step_pack:
+            labels[step] = labels[topic] = step_pack.label
+    memory = get_conversation_memory()
+    with telemetry.span("retrieval_sync"):
+        index.sync(st.session_state.chat_history, st.session_state.resume_data, memory.state["step_starts"], labels,
+                   get_term_index())
+    return index
+
+# 현재 질문과 관련된 이전 답변 상위 k개 [(라벨, 본문)]
+# 현재 단계의 대화와 추출 필드, 직무명 답변은 프롬프트의 다른 섹션에 이미 있으므로 뺌
+def retrieve_related(query, k, speculative=False):
+    index = get_session_index(speculative)
+    step = st.session_state.step
+    step_start = get_conversation_memory().state["step_starts"].get(step, len(st.session_state.chat_history))
+    topic = STEP_TOPICS.get(step)
+    title = st.session_state.resume_data.get("job_info", {}).get("title")
+
+    def exclude(key):
+        if key[0] == "field":
+            return key[1] == topic
+        return key[1] >= step_start or st.session_state.chat_history[key[1]][1] == title
+
+    with telemetry.span("retrieval_search"):
+        results = index.search(query, k, exclude=exclude, term_index=get_term_index())
+    telemetry.observe("retrieval_results", len(results), buckets=SIZE_BUCKETS)
+    history, data = st.session_state.chat_history, st.session_state.resume_data
+    return [(label, document_text(key, history, data)) for key, label, _ in results]
+
+# 값이 있는 항목만 "라벨: 값" 한 줄씩으로 정리
+def format_fields(title, fields):
+    lines = [f"{label}: {value}" for label, value in fields if value]
+    return f"{title}\n" + "\n".join(lines) if lines else ""
+
+# ReAct 기반 프롬프트 생성 - 턴마다 바뀌는 부분만 만든다 (고정 부분은 REACT_SYSTEM_PROMPT)
+# 누적된 용어를 "분류: 이름, ..." 줄로 정리
+def format_terms(terms, categories=None):
+    return [
+        f"{CATEGORY_LABELS[category]}: {', '.join(terms[category])}"
+        for category in (categories or CATEGORY_LABELS)
+        if terms.get(category)
+    ]
 
-    # 직무 정보가 있는 경우 포함
-    job_info_section = ""
-    if st.session_state.resume_data.get("job_info"):
-        job_info = st.session_state.resume_data["job_info"]
-        job_info_section = f"""
-        지원 직무 정보:
-        직무: {job_info.get('title', '')}
-        기술 스택: {job_info.get('answer_0', '')}
-        주요 경험: {job_info.get('answer_1', '')}
-        API 경험: {job_info.get('answer_2', '')}
-        DB 경험: {job_info.get('answer_3', '')}
-        자격증/수상: {job_info.get('answer_4', '')}
-        """
+# speculative=True(추측 실행)이면 세션 상태를 바꾸지 않음 - 대화 메모리의 요약 접기와 프롬프트 토큰 기록,
+# 검색 인덱스 색인은 복사본에서 하므로 예측이 빗나가도 실제 턴의 프롬프트는 같은 상태에서 만들어짐
+@telemetry.timed("prompt_build")
+def create_react_prompt(user_input, context, speculative=False):
+    # 기본 정보가 있는 경우에만 포함
+    basic_info = st.session_state.resume_data["basic_info"]
+    basic_info_section = format_fields("사용자의 기본 정보:", [
+        ("이름", basic_info.get('name')),
+        ("이메일", basic_info.get('email')),
+        ("전화번호", basic_info.get('phone')),
+        ("포트폴리오", basic_info.get('portfolio')),
+    ])
+
+    memory = get_conversation_memory(copy.deepcopy(st.session_state.get("memory", {})) if speculative else None)
+    pack = current_pack()
+    job_info = st.session_state.resume_data.get("job_info", {})
+    step_pack = pack.step_at(st.session_state.step)
+
+    # 직무 정보 - 직무명은 항상, 답변은 검색으로 현재 단계/질문과 관련된 것만 (RETRIEVAL_TOP_K=0이면 전부)
+    top_k = retrieval_top_k()
+    job_fields = [("직무", memory.clip(job_info.get('title')))]
+    if top_k <= 0:
+        job_fields += [
+            (label, memory.clip(job_info.get(f"answer_{i}")))
+            for i, label in enumerate(pack.step("job_info").answer_labels)
+        ]
+    job_info_section = format_fields("지원 직무 정보:", job_fields)
+    related_section = ""
+    if top_k > 0:
+        query = " ".join(filter(None, [
+            user_input, context.get("last_response"),
+            step_pack and step_pack.label, step_pack and " ".join(name for name, _ in step_pack.fields),
+        ]))
+        related = retrieve_related(query, top_k, speculative)
+        if related:
+            snippet_tokens = int(os.getenv("RETRIEVAL_SNIPPET_TOKENS", "80"))
+            related_section = "관련 이전 답변:\n" + "\n".join(
+                "- " + (f"[{label}] " if label else "") + truncate_tokens(text, snippet_tokens) for label, text in related
+            )
 
     # 현재 단계에 따른 추가 컨텍스트와 완료 조건
-    step_context = ""
-    completion_criteria = ""
-    if st.session_state.step == 2:  # 직무 확인 단계
-        step_context = "지금은 직무에 대해 알아보는 중이에요. 어떤 일을 하고 싶으신지, 어떤 경험이 있으신지 차근차근 이야기해주세요."
-        completion_criteria = """
-        다음 내용들이 잘 파악되면 'STEP_COMPLETE'를 포함해서 답변해주세요:
-        1. 어떤 직무를 원하시는지
-        2. 어떤 기술을 잘 다루시는지
-        3. 어떤 경험이 있으신지
-        4. API나 DB 관련 경험은 어떤지
-        5. 자격증이나 수상 경력이 있으신지
-        """
-    elif st.session_state.step == 3:  # 경력 상세화
-        step_context = "이제 경력에 대해 자세히 알아볼게요. 어떤 일을 하셨고, 어떤 성과를 이루셨는지 이야기해주세요."
-        completion_criteria = """
-        다음 내용들이 잘 파악되면 'STEP_COMPLETE'를 포함해서 답변해주세요:
-        1. 최근에 어떤 일을 하셨는지
-        2. 어떤 어려움을 겪으셨고 어떻게 해결하셨는지
-        3. 팀에서 어떻게 일하셨는지
-        """
-    elif st.session_state.step == 4:  # 프로젝트
-        step_context = "프로젝트 경험에 대해 이야기해주세요. 어떤 프로젝트를 진행하셨고, 어떤 역할을 맡으셨나요?"
-        completion_criteria = """
-        다음 내용들이 잘 파악되면 'STEP_COMPLETE'를 포함해서 답변해주세요:
-        1. 어떤 프로젝트를 했는지
-        2. 프로젝트에서 어떤 문제를 해결하셨는지
-        3. 어떤 성과를 이루셨는지
-        """
-    elif st.session_state.step == 5:  # 기술 스택
-        step_context = "이제 기술 스택에 대해 이야기해주세요. 어떤 기술을 잘 다루시고, 어떤 기술을 더 배우고 싶으신가요?"
-        completion_criteria = """
-        다음 내용들이 잘 파악되면 'STEP_COMPLETE'를 포함해서 답변해주세요:
-        1. 어떤 기술을 잘 다루시는지
-        2. 각 기술의 숙련도는 어느 정도인지
-        3. 최근에 새로 배운 기술이 있다면 어떤 것인지
-        4. 앞으로 어떤 기술을 더 배우고 싶으신지
-        """
-    elif st.session_state.step == 6:  # 자기소개
-        step_context = "마지막으로 자기소개를 작성해볼게요. 어떤 강점이 있으시고, 어떤 목표를 가지고 계신가요?"
-        completion_criteria = """
-        다음 내용들이 잘 파악되면 'STEP_COMPLETE'를 포함해서 답변해주세요:
-        1. 어떤 강점과 특기가 있는지
-        2. 다른 사람과 차별화되는 점은 무엇인지
-        3. 앞으로 어떤 목표를 가지고 계신지
-        """
-
-    # 추가 정보 요청 시 컨텍스트
-    if context.get("next_action") == "ask_more_info":
-        current_step = st.session_state.step
-        last_response = context.get("last_response", "")
-        
-        # 이전 대화 내용 분석
-        chat_history = st.session_state.chat_history
-        recent_responses = [msg for sender, msg in chat_history[-4:] if sender == "🧑"]  # 최근 사용자 응답 2개
-        
-        if current_step == 2:  # 직무 확인
-            if "백엔드" in last_response.lower():
-                step_context = "백엔드 개발자에 대해 더 자세히 이야기해주세요. 주로 어떤 백엔드 기술을 사용해보셨나요? (예: Spring, Django, Node.js 등)"
-            elif "프론트엔드" in last_response.lower():
-                step_context = "프론트엔드 개발자에 대해 더 자세히 이야기해주세요. 주로 어떤 프레임워크를 사용해보셨나요? (예: React, Vue, Angular 등)"
-            elif "데브옵스" in last_response.lower():
-                step_context = "DevOps 엔지니어에 대해 더 자세히 이야기해주세요. 어떤 클라우드 플랫폼을 사용해보셨나요? (예: AWS, Azure, GCP 등)"
-            else:
-                step_context = "해당 직무에 대해 더 자세히 이야기해주세요. 어떤 기술이나 도구를 주로 사용하시나요?"
-
-        elif current_step == 3:  # 경력 상세화
-            # 이전 응답에서 언급된 기술이나 프로젝트를 반영
-            mentioned_tech = [tech for tech in ["Java", "Python", "JavaScript", "Spring", "Django", "React"] if tech.lower() in last_response.lower()]
-            if mentioned_tech:
-                tech_str = ", ".join(mentioned_tech)
-                step_context = f"{tech_str}를 사용하신 경험이 있으시군요! 이 기술을 활용한 프로젝트에서 어떤 문제를 해결하기 위해 선택하셨나요?"
-            else:
-                step_context = "경력에 대해 더 자세히 이야기해주세요. 가장 기억에 남는 프로젝트나 업무는 무엇인가요?"
-
-        elif current_step == 4:  # 프로젝트
-            # 이전 응답에서 언급된 프로젝트 유형이나 기술을 반영
-            if "웹" in last_response.lower():
-                step_context = "웹 프로젝트에 대해 더 자세히 이야기해주세요. 어떤 기술 스택을 사용하셨나요?"
-            elif "모바일" in last_response.lower():
-                step_context = "모바일 앱 프로젝트에 대해 더 자세히 이야기해주세요. 어떤 플랫폼을 타겟으로 하셨나요? (iOS/Android)"
-            else:
-                step_context = "프로젝트에 대해 더 자세히 이야기해주세요. 프로젝트의 규모나 기간은 어땠나요?"
-
-        elif current_step == 5:  # 기술 스택
-            # 이전 응답에서 언급된 기술을 반영
-            mentioned_tech = [tech for tech in ["Java", "Python", "JavaScript", "Spring", "Django", "React"] if tech.lower() in last_response.lower()]
-            if mentioned_tech:
-                tech_str = ", ".join(mentioned_tech)
-                step_context = f"{tech_str}에 대해 더 자세히 이야기해주세요. 이 기술을 얼마나 오래 사용해보셨나요?"
-            else:
-                step_context = "기술 스택에 대해 더 자세히 이야기해주세요. 각 기술을 얼마나 오래 사용해보셨나요?"
-
-        elif current_step == 6:  # 자기소개
-            # 이전 응답에서 언급된 강점이나 목표를 반영
-            if "강점" in last_response.lower() or "특기" in last_response.lower():
-                step_context = "강점에 대해 더 자세히 이야기해주세요. 이 강점이 실제 프로젝트에서 어떻게 발휘되었나요?"
-            elif "목표" in last_response.lower() or "계획" in last_response.lower():
-                step_context = "커리어 목표에 대해 더 자세히 이야기해주세요. 이 목표를 이루기 위해 어떤 계획을 세우고 계신가요?"
-            else:
-                step_context = "자기소개에 대해 더 자세히 이야기해주세요. 어떤 강점이 지원하는 직무에 도움이 될 것 같으신가요?"
-
-    return f"""
-    당신은 IT 이력서 작성을 도와주는 친근한 챗봇입니다. 사용자와 자연스럽게 대화하면서 경험과 역량을 파악해주세요.
-
-    {basic_info_section}
-    {job_info_section}
-
-    현재 상황:
-    - 단계: {st.session_state.step}
-    - 현재 주제: {context['current_topic']}
-    - 마지막 응답: {context['last_response']}
-    - 다음 행동: {context['next_action']}
-    {step_context}
-    {completion_criteria}
-
-    사용자 입력: "{user_input}"
-
-    대화 규칙:
-    - 친근하고 자연스러운 말투를 사용하세요. 예를 들어 '~해주세요' 대신 '~해볼까요?', '~하시나요?' 등을 사용하세요.
-    - 반드시 한 번에 하나의 질문만 하세요. 여러 질문을 한꺼번에 하지 마세요.
-    - 사용자의 답변을 잘 듣고 공감하는 태도로 대화를 이어가세요.
-    - IT 관련 내용을 다룰 때도 쉽고 친근하게 설명해주세요.
-    - 사용자의 답변이 짧다면, 구체적인 예시를 들어 더 자세히 이야기해볼 수 있도록 유도하세요.
-    - 추가 정보를 요청할 때는 이전 대화 내용을 반영하여 자연스럽게 이어가세요.
-    - 사용자가 언급한 기술이나 경험을 기억하고, 그것을 바탕으로 다음 질문을 이어가세요.
-    - 각 단계에서 필요한 정보를 하나씩 순차적으로 수집하세요.
-
-    이력서 작성 가이드라인:
-    - STAR 방식(상황, 과제, 행동, 결과)을 자연스럽게 대화에 녹여주세요.
-    - 구체적인 수치나 성과를 이야기할 수 있도록 도와주세요.
-    - 기술 스택과 경험을 명확하게 파악하되, 대화가 딱딱하지 않도록 해주세요.
-    - 프로젝트의 규모나 기간을 자연스럽게 물어보세요.
-
-    내부 처리 과정:
-    1. 현재 상황을 파악하고 다음 질문을 준비하세요.
-    2. 대화가 자연스럽게 이어지도록 해주세요.
-    3. 사용자의 응답을 잘 듣고 이해한 후 다음 단계를 계획하세요.
-    4. 필요한 정보가 모두 수집되었다고 판단되면 'STEP_COMPLETE'를 포함해서 답변하세요.
-
-    다음 응답을 생성해주세요:
-    """
+    step_context, completion_criteria = (step_pack.context, step_pack.criteria) if step_pack else ("", "")
+
+    # 추가 정보 요청 시 컨텍스트 - 마지막 응답의 용어(사전 인덱스로 한 번에 찾음)에 맞는 팩 문구
+    if context.get("next_action") == "ask_more_info" and step_pack:
+        last_response = context.get("last_response") or ""
+        last_terms = get_term_index().group(last_response)
+        mentioned_tech = [name for category in TECH_CATEGORIES for name in last_terms.get(category, [])][:5]
+        step_context = step_pack.more_info_context(last_response, last_terms, mentioned_tech)
+
+    # 지금까지 답변에서 찾은 직무/기술 용어
+    terms_lines = format_terms(st.session_state.resume_data.get("terms", {}))
+    terms_section = "언급된 직무/기술:\n" + "\n".join(f"- {line}" for line in terms_lines) if terms_lines else ""
+
+    # 이전 대화는 메모리가 예산에 맞춰 요약 + 최근 대화로 채움
+    sections = [
+        ("basic_info", basic_info_section),
+        ("job_info", job_info_section),
+        ("related", related_section),
+        ("terms", terms_section),
+        ("history", None),
+        ("situation", f"""현재 상황:
+- 단계: {st.session_state.step}
+- 현재 주제: {context['current_topic']}
+- 마지막 응답: {memory.clip(context['last_response'])}
+- 다음 행동: {context['next_action']}"""),
+        ("step_context", step_context),
+        ("completion_criteria", completion_criteria),
+        ("user_input", f'사용자 입력: "{memory.clip(user_input)}"'),
+    ]
+    prompt = memory.render(sections, st.session_state.chat_history, st.session_state.step)
+    if not speculative:
+        telemetry.observe("prompt_tokens", sum(memory.state["last_prompt_tokens"].values()), buckets=SIZE_BUCKETS)
+    return prompt
 
 # 기본 정보 입력 폼
 def show_basic_info_form():
+    # 이력서 확인 화면에서 수정하러 온 경우 저장된 값을 채워둠
+    saved = st.session_state.resume_data.get("basic_info") or {}
     with st.form("basic_info_form"):
         st.subheader("기본 정보를 입력해주세요")
         
         # 필수 입력 필드
         name = st.text_input(
             "이름 *",
+            value=saved.get("name") or "",
             help="한글 또는 영문으로 입력해주세요",
             placeholder="홍길동"
         )
         email = st.text_input(
             "이메일 *",
+            value=saved.get("email") or "",
             help="이력서에 표시될 이메일 주소를 입력해주세요",
             placeholder="example@email.com"
         )
@@ -436,11 +688,13 @@ def show_basic_info_form():
         # 선택 입력 필드
         phone = st.text_input(
             "전화번호",
+            value=saved.get("phone") or "",
             help="선택사항입니다",
             placeholder="010-0000-0000"
         )
         portfolio = st.text_input(
             "포트폴리오 링크",
+            value=saved.get("portfolio") or "",
             help="GitHub, 블로그 등",
             placeholder="https://github.com/username"
         )
@@ -468,215 +722,473 @@ def show_basic_info_form():
             "phone": phone,
             "portfolio": portfolio
         }
-        st.session_state.step = 2
+        if not return_to_review():
+            st.session_state.step = 2
         return True
     
     return False
 
+# 단계별 첫 질문 메시지 (직무 팩의 단계 소개 문구)
+def step_intro_message(step):
+    step_pack = current_pack().step_at(step)
+    if step_pack is None:
+        return None
+    return step_pack.intro_message(st.session_state.resume_data['basic_info']['name'])
+
+# 단계별 다음 주제/행동
+STEP_TRANSITIONS = {
+    2: ("experience", "ask_experience"),
+    3: ("projects", "ask_projects"),
+    4: ("skills", "ask_skills"),
+    5: ("summary", "ask_summary"),
+}
+
+# 아래 콜백들은 위젯 이벤트 직후, 스크립트 실행 전에 호출되므로
+# 상태만 바꿔두면 같은 실행에서 바로 반영된다 (st.rerun 불필요)
+
+# 채팅 입력 콜백 - 입력을 대기열에 넣고 이번 실행에서 처리
+def queue_user_input():
+    user_input = st.session_state.get("chat_input")
+    if user_input and not st.session_state.get("is_processing"):
+        st.session_state.pending_input = user_input
+        discard_prefetched()
+
+# "네, 다음 단계로" 콜백
+def advance_step():
+    current_step = st.session_state.step
+
+    # 직무 정보 저장
+    if "job_info" in st.session_state.resume_data and "title" not in st.session_state.resume_data["job_info"] and len(st.session_state.chat_history) >= 2:
+        # 사용자의 첫 번째 응답을 직무로 저장
+        user_responses = [msg for sender, msg in st.session_state.chat_history if sender == Sender.USER]
+        if user_responses:
+            st.session_state.resume_data["job_info"]["title"] = user_responses[0]
+
+    # 끝난 단계의 대화를 요약에 반영하고 다음 단계 대화의 시작 위치를 기록
+    memory = get_conversation_memory()
+    memory.close_step(current_step, st.session_state.chat_history)
+    memory.start_step(current_step + 1, len(st.session_state.chat_history))
+    discard_prefetched()
+
+    if return_to_review():
+        pass
+    elif current_step in STEP_TRANSITIONS:
+        topic, next_action = STEP_TRANSITIONS[current_step]
+        st.session_state.step = current_step + 1
+        st.session_state.current_question = 0
+        st.session_state.context["current_topic"] = topic
+        st.session_state.context["next_action"] = next_action
+        # 다음 단계 첫 질문 메시지 직접 추가
+        st.session_state.chat_history.append(bot_message(step_intro_message(current_step + 1)))
+    elif current_step == 6:  # 자기소개 완료
+        st.session_state.step = 7
+        st.session_state.context["next_action"] = "show_resume"
+
+    st.session_state.step_complete_confirmed = False
+
+# "아니요, 더 이야기할게 남았어요" 콜백 - 추가 질문은 이번 실행에서 스트리밍으로 생성
+def request_more_info():
+    st.session_state.step_complete_confirmed = False
+    st.session_state.context["next_action"] = "ask_more_info"
+
+    if st.session_state.context.get("current_topic"):
+        st.session_state.pending_prompt = more_info_prompt(st.session_state.context)
+
+# 추가 질문 프롬프트 - 마지막 사용자 답변 기준 (context의 next_action은 ask_more_info)
+def more_info_prompt(context, speculative=False):
+    user_responses = [msg for sender, msg in st.session_state.chat_history if sender == Sender.USER]
+    last_input = user_responses[-1] if user_responses else ""
+    return create_react_prompt(last_input, context, speculative)
+
+# 단계 완료 확인 중 - 사용자가 고르는 동안 두 선택지의 모델 요청을 미리 실행
+# ("아니요": 추가 질문, "네": MEMORY_SUMMARIZER=model이면 끝난 단계의 대화 요약)
+def prefetch_next_messages():
+    if get_prefetcher() is None or not st.session_state.context.get("current_topic"):
+        return
+    # 같은 상태로 다시 실행될 때 프롬프트를 다시 만들지 않음
+    mark = (st.session_state.step, len(st.session_state.chat_history))
+    if st.session_state.get("prefetch_mark") == mark:
+        return
+    st.session_state.prefetch_mark = mark
+    prefetch_model(more_info_prompt({**st.session_state.context, "next_action": "ask_more_info"}, speculative=True),
+                   REACT_SYSTEM_PROMPT)
+    if os.getenv("MEMORY_SUMMARIZER") == "model":
+        memory = get_conversation_memory()
+        pending = memory.pending_fold(st.session_state.step, st.session_state.chat_history)
+        if pending:
+            prefetch_model(summary_prompt(*pending, memory.summary_tokens))
+    # 마지막 단계: "네"를 누르면 보여줄 이력서 문장 다듬기를 미리 시작 (결과는 섹션 내용 해시로 보관)
+    polisher = get_section_polisher()
+    if st.session_state.step == 6 and polisher is not None:
+        polisher.start(st.session_state.resume_data, polish_generate(), model=backend.model_name)
+
+# 이력서 확인 화면의 수정 버튼 콜백 - 그 단계만 다시 진행하고 끝나면 이력서 확인 화면으로 돌아옴
+# (뒤 단계를 다시 거치지 않고, 다듬은 문장/렌더링 결과도 바뀐 섹션에 의존하는 것만 다시 만듦)
+def go_to_step(step):
+    get_conversation_memory().start_step(step, len(st.session_state.chat_history))
+    discard_prefetched()
+    st.session_state.step = step
+    st.session_state.step_complete_confirmed = False
+    st.session_state.context["return_to_review"] = True
+    step_pack = current_pack().step_at(step)
+    if step_pack is not None:
+        st.session_state.context["current_topic"] = step_pack.topic
+        st.session_state.context["next_action"] = None
+        st.session_state.chat_history.append(
+            bot_message(f"{step_pack.label} 내용을 고쳐볼게요. 바꾸거나 덧붙일 내용을 말씀해 주세요.")
+        )
+
+# 수정하러 간 단계를 마치면 다음 단계 대신 이력서 확인 화면으로
+def return_to_review():
+    if not st.session_state.context.pop("return_to_review", False):
+        return False
+    st.session_state.step = 7
+    st.session_state.context["next_action"] = "show_resume"
+    return True
+
+# "처음으로 돌아가기" 콜백 - 세션 상태를 비우면 스크립트 상단에서 다시 초기화됨
+def reset_session():
+    discard_prefetched()
+    session_id = st.session_state.get("session_id")
+    if session_id:
+        get_session_memory().forget(session_id)
+        # 지난 인터뷰의 개인 정보는 저널에 남기지 않음 (지우지 못하면 보관 기간이 지난 뒤 백그라운드에서 지워짐)
+        journal = get_session_journal()
+        if journal is not None:
+            try:
+                journal.delete(session_id)
+            except sqlite3.Error:
+                pass
+    for key in list(st.session_state.keys()):
+        del st.session_state[key]
+    # 이전 세션이 다시 복원되지 않도록 resume 토큰도 지움
+    st.query_params.clear()
+
+# 사용자 턴 처리 - 입력 표시, 응답 분석, 후속 질문 표시를 한 번의 실행에서 수행
+def process_user_turn(user_input):
+    st.session_state.chat_history.append(user_message(user_input))
+    with st.chat_message("user"):
+        st.write(user_input)
+
+    # 현재 주제 설정
+    current_topic = st.session_state.context.get("current_topic")
+    if not current_topic and st.session_state.step == 2:
+        current_topic = "job_info"
+        st.session_state.context["current_topic"] = current_topic
+
+    # 주제가 없는 경우 기본 응답
+    if not current_topic:
+        st.session_state.step_complete_confirmed = True
+        return
+
+    reply_slot = st.empty()
+    try:
+        with reply_slot.container():
+            with st.chat_message("assistant"):
+                with st.spinner("AI가 답변을 생성 중입니다..."):
+                    is_complete, followup = analyze_response(user_input, current_topic)
+
+        if is_complete:
+            st.session_state.step_complete_confirmed = True
+            reply_slot.empty()
+            return
+        if not isinstance(followup, str):
+            # 모델이 만드는 후속 질문은 도착하는 대로 출력 (대화 기록 저장도 render_streamed_response에서 한 번만)
+            reply_slot.empty()
+            with reply_slot.container():
+                render_streamed_response(followup)
+            return
+        # 부족한 정보에 대한 후속 질문
+        bot_response = followup
+        st.session_state.context["last_response"] = bot_response
+    except Exception as e:
+        # 오류 문구 대신 기본 질문으로 대화를 이어감
+        notify_model_failure(e)
+        bot_response = current_fallback_question()
+        st.session_state.context["last_response"] = bot_response
+
+    st.session_state.chat_history.append(bot_message(bot_response))
+    with reply_slot.container():
+        with st.chat_message("assistant"):
+            st.write(bot_response)
+
+# 스크립트 실행 수 기록 - 세션별로도 누적해 턴 사이에 몇 번 실행되었는지 계산
+def count_script_run(kind):
+    telemetry.inc("script_runs_total", kind=kind)
+    runs = st.session_state.setdefault("run_counts", {"full": 0, "fragment": 0, "turns": 0, "since_turn": 0})
+    runs[kind] += 1
+    runs["since_turn"] += 1
+
+# 턴 하나(답변 처리 또는 추가 질문 생성)를 trace로 묶고, 끝난 시점의 대화 크기를 기록
+@contextmanager
+def traced_turn(kind):
+    runs = st.session_state.setdefault("run_counts", {"full": 0, "fragment": 0, "turns": 0, "since_turn": 0})
+    telemetry.inc("turns_total", kind=kind)
+    telemetry.observe("runs_per_turn", runs["since_turn"], buckets=SIZE_BUCKETS)
+    with telemetry.trace(
+        "turn", kind=kind, session=st.session_state.get("session_id"),
+        step=st.session_state.step, runs_since_last_turn=runs["since_turn"],
+    ) as trace:
+        runs["turns"] += 1
+        runs["since_turn"] = 0
+        yield trace
+        history = st.session_state.chat_history
+        tokens = sum(estimate_tokens(msg) for _, msg in history)
+        trace.update(chat_messages=len(history), chat_tokens=tokens)
+        telemetry.observe("chat_history_messages", len(history), buckets=SIZE_BUCKETS)
+        telemetry.observe("chat_history_tokens", tokens, buckets=SIZE_BUCKETS)
+        trace.update(session_state_bytes=record_session_memory())
+
+# 다시 만들 수 있는 값 모음 - 비워져 있으면(유휴 세션 정리 등) 쓰는 쪽에서 다시 만듦
+def derived_state():
+    derived = st.session_state.get(DERIVED_KEY)
+    if derived is None:
+        derived = st.session_state[DERIVED_KEY] = DerivedState()
+    return derived
+
+# 세션 상태 메모리 - 키별 바이트 (대화 메시지와 같은 객체를 가리키는 값은 chat_history에서 한 번만 셈)
+def measure_session_memory():
+    keys = ["chat_history", *sorted(key for key in st.session_state.keys() if key != "chat_history")]
+    return session_memory(st.session_state, keys)
+
+# 턴이 끝날 때 세션 메모리를 프로세스 기록에 남기고, SESSION_STATE_MAX_BYTES를 넘으면
+# 다시 만들 수 있는 값(검색 인덱스, 검증 결과)을 비움
+# 다른 세션 중 유휴 세션과 세션 상한을 넘은 오래된 세션의 다시 만들 수 있는 값도 여기서 비움
+def record_session_memory():
+    measured = measure_session_memory()
+    limit = int(os.getenv("SESSION_STATE_MAX_BYTES", "0"))
+    if limit and measured["total"] > limit:
+        derived_state().clear()
+        telemetry.inc("session_state_trims_total")
+        measured = measure_session_memory()
+    total = measured["total"]
+    telemetry.observe("session_state_bytes", total, buckets=BYTES_BUCKETS)
+
+    registry = get_session_memory()
+    ctx = get_script_run_ctx()
+    registry.update(
+        st.session_state.get("session_id") or (ctx.session_id if ctx else "local"), total,
+        derived=derived_state(), derived_bytes=measured["keys"].get(DERIVED_KEY, 0),
+    )
+    evicted = registry.evict()
+    if evicted:
+        telemetry.inc("session_evictions_total", len(evicted))
+    report = registry.report()
+    telemetry.set_gauge("sessions_in_memory", report["sessions"] - report["idle_sessions"], state="active")
+    telemetry.set_gauge("sessions_in_memory", report["idle_sessions"], state="idle")
+    telemetry.set_gauge("sessions_state_bytes", report["total_bytes"])
+    if report["rss_bytes"] is not None:
+        telemetry.set_gauge("process_rss_bytes", report["rss_bytes"])
+    return total
+
+# 채팅 영역을 fragment로 분리 - 새 메시지가 와도 폼/진행 바/단계 완료 UI는 다시 그리지 않음
+# (fragment를 지원하지 않는 Streamlit 버전에서는 일반 함수로 동작)
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+
+def chat_fragment(func):
+    return _fragment(func) if _fragment else func
+
+# 현재 실행이 fragment만 다시 실행하는 중인지 여부
+def is_fragment_rerun():
+    ctx = get_script_run_ctx()
+    return bool(ctx and getattr(ctx, "fragment_ids_this_run", None))
+
+# 화면에 바로 보여줄 최근 메시지 수
+CHAT_WINDOW_SIZE = int(os.getenv("CHAT_WINDOW_SIZE", "12"))
+
+# 대화 출력 - 최근 메시지만 그리고, 이전 메시지는 요청할 때만 불러오는 보관함에 둠
+def render_chat_history(history, window=CHAT_WINDOW_SIZE):
+    archived_count = max(len(history) - window, 0)
+    if archived_count:
+        with st.expander(f"이전 대화 {archived_count}개"):
+            if st.toggle("이전 대화 불러오기", key="show_chat_archive"):
+                for sender, msg in history[:archived_count]:
+                    with st.chat_message("user" if sender == Sender.USER else "assistant"):
+                        st.write(msg)
+    for sender, msg in history[archived_count:]:
+        with st.chat_message("user" if sender == Sender.USER else "assistant"):
+            st.write(msg)
+
+@chat_fragment
+def chat_panel():
+    if is_fragment_rerun():
+        count_script_run("fragment")
+    state_before = (st.session_state.step, st.session_state.step_complete_confirmed)
+    render_chat_history(st.session_state.chat_history)
+
+    # 입력창 자리 - 응답 생성 중에는 비활성화된 입력창을 먼저 보여주고, 끝나면 교체
+    # (fragment 밖으로는 위젯을 쓸 수 없으므로 fragment 안에서는 대화 아래에 두고,
+    #  그 외에는 하단 고정 영역의 placeholder를 써야 같은 자리에서 교체됨)
+    input_slot = st.empty() if _fragment else st._bottom.empty()
+
+    # 대기 중인 사용자 입력 / 모델 요청을 이번 실행에서 바로 처리
+    pending_input = st.session_state.pop("pending_input", None)
+    pending_prompt = st.session_state.pop("pending_prompt", None)
+    if pending_input or pending_prompt:
+        st.session_state.is_processing = True
+        input_slot.chat_input("AI가 답변을 생성 중입니다...", key="chat_input_busy", disabled=True)
+        try:
+            with traced_turn("answer" if pending_input else "more_info"):
+                if pending_input:
+                    process_user_turn(pending_input)
+                if pending_prompt:
+                    render_streamed_response(generate_gpt_response(pending_prompt, stream=True, system_instruction=REACT_SYSTEM_PROMPT))
+        finally:
+            st.session_state.is_processing = False
+
+    input_slot.chat_input("답변을 입력해주세요...", key="chat_input", on_submit=queue_user_input)
+
+    # fragment만 다시 실행된 경우, 단계 완료처럼 바깥 UI가 바뀌어야 하면 전체를 다시 그림
+    if is_fragment_rerun():
+        save_session()
+        if (st.session_state.step, st.session_state.step_complete_confirmed) != state_before:
+            st.rerun()
+
+# 단계별로 추출된 필드 값 표시 (Step 7)
+def show_structured_fields(topic):
+    values = st.session_state.resume_data.get("structured", {}).get(topic)
+    if not values:
+        return
+    lines = []
+    for name, _ in current_pack().step(topic).fields:
+        value = values.get(name)
+        if value:
+            text = ", ".join(value) if isinstance(value, list) else value
+            lines.append(f"**{name}**: {text}  ")
+    if lines:
+        st.markdown("\n".join(lines))
+
+# 이력서 문장 다듬기 - 섹션별 요청을 한꺼번에 보내고 끝나는 순서대로 각 섹션 자리(slots)를 채움
+# 결과는 resume_data["polished"]에 남겨 다운로드/미리보기에도 쓰고, 실패한 섹션은 입력한 답변을 그대로 씀
+@telemetry.timed("polish_resume")
+def polish_resume(data, slots):
+    polisher = get_section_polisher()
+    if polisher is None:
+        return
+    for slot in slots.values():
+        slot.caption("✨ 이력서용 문장으로 다듬는 중...")
+    polished = {}
+    for section, text, error in polisher.polish(data, polish_generate(), list(slots), backend.model_name):
+        slot = slots.pop(section)
+        if text:
+            polished[section] = text
+            with slot.container():
+                st.caption("✨ 이력서용 문장")
+                st.markdown(text)
+        else:
+            slot.caption("문장 다듬기에 실패해 입력한 답변을 그대로 사용합니다.")
+    # 내용이 없어 다듬지 않은 섹션
+    for slot in slots.values():
+        slot.empty()
+    if data.get("polished", {}) != polished:
+        data["polished"] = polished
+
+# 관리/디버그 패널 표시 여부 - ADMIN_PANEL=1이거나 ?admin= 값이 ADMIN_TOKEN과 같을 때
+def admin_panel_enabled():
+    if os.getenv("ADMIN_PANEL") == "1":
+        return True
+    token = os.getenv("ADMIN_TOKEN")
+    return bool(token) and st.query_params.get("admin") == token
+
+# 단계별 p50/p95/p99(ms), 모델/캐시 지표, 현재 세션 실행 수
+def show_admin_panel():
+    with st.sidebar.expander("🛠 운영 지표"):
+        rows = [
+            f"| {labels.get('stage')} | {count} | " + " | ".join(f"{value * 1000:.1f}" for value in values.values()) + " |"
+            for labels, count, values in telemetry.percentiles("stage_duration_seconds")
+        ]
+        if rows:
+            st.markdown("\n".join(["| 단계 | 횟수 | p50(ms) | p95(ms) | p99(ms) |", "|---|---:|---:|---:|---:|", *rows]))
+        else:
+            st.caption("아직 기록된 단계가 없습니다.")
+
+        requests = {", ".join(value for _, value in key): count for key, count in telemetry.counter_values("model_requests_total").items()}
+        tokens = {dict(key)["direction"]: count for key, count in telemetry.counter_values("model_tokens_total").items()}
+        st.caption("모델 요청 (종류, 캐시)")
+        st.json(requests)
+        st.caption("토큰 추정치")
+        st.json(tokens)
+        st.caption("응답 캐시 / 동일 요청 합치기 / 모델 호출")
+        st.json({"cache": get_response_cache().stats(), "single_flight": get_single_flight().stats(), "backend": backend.stats()})
+        prefetcher = get_prefetcher()
+        if prefetcher is not None:
+            st.caption("추측 실행")
+            st.json(prefetcher.stats())
+        st.caption("질문 팩")
+        st.json({**get_question_packs().stats(), "session": current_pack().id})
+        polisher = get_section_polisher()
+        if polisher is not None:
+            st.caption("이력서 문장 다듬기")
+            st.json(polisher.stats())
+        st.caption("이력서 렌더링 캐시")
+        st.json(get_resume_renderer().stats())
+        tracker = st.session_state.get("section_versions")
+        if tracker is not None:
+            st.caption("섹션 버전 / 마지막 수정으로 다시 계산한 결과")
+            st.json({"versions": {node: tracker.numbers[node] for node in SECTIONS},
+                     **st.session_state.get("section_changes", {})})
+        index = (st.session_state.get(DERIVED_KEY) or {}).get("retrieval_index")
+        if index is not None:
+            st.caption("세션 검색 인덱스 / 마지막 프롬프트 섹션별 토큰")
+            st.json({**index.stats(), "prompt_tokens": st.session_state.get("memory", {}).get("last_prompt_tokens", {})})
+
+        st.caption("세션 메모리 (bytes) / 프로세스")
+        st.json({"session": measure_session_memory(), "process": get_session_memory().report()})
+
+        history = st.session_state.get("chat_history", [])
+        st.caption("현재 세션")
+        st.json({
+            "runs": st.session_state.get("run_counts", {}),
+            "chat_messages": len(history),
+            "chat_tokens": sum(estimate_tokens(msg) for _, msg in history),
+        })
+
 # 메인 앱
 def main():
+    count_script_run("full")
     st.title("💼 IT 직무 이력서 생성 챗봇")
-    show_progress()
+    progress_slot = st.empty()
 
-    # Step 1: 기본 정보 입력 (폼 기반)
+    # Step 1: 기본 정보 입력 (폼 기반) - 제출되면 폼을 지우고 같은 실행에서 Step 2로 진행
     if st.session_state.step == 1:
-        if show_basic_info_form():
-            st.rerun()
+        form_slot = st.empty()
+        with form_slot.container():
+            submitted = show_basic_info_form()
+        if submitted:
+            form_slot.empty()
+
+    with progress_slot.container():
+        show_progress()
 
     # Step 2 이후: 챗봇 기반 흐름
-    else:
+    if st.session_state.step != 1:
         # 챗봇 환영 메시지
         if not st.session_state.chat_history:
-            intro = f"""안녕하세요 {st.session_state.resume_data['basic_info']['name']}님! 😊
-이력서 작성을 도와드릴게요. 차근차근 이야기 나누면서 좋은 이력서를 만들어보아요!
-
-먼저, 어떤 직무에 지원하실 예정인가요?
-예시) `백엔드 개발자, DevOps 엔지니어`
-
-위 예시 중에서 선택하시거나, 다른 직무를 말씀해 주셔도 좋아요!"""
-            st.session_state.chat_history.append(("🤖", intro))
+            intro = step_intro_message(2)
+            st.session_state.chat_history.append(bot_message(intro))
             st.session_state.context["next_action"] = "ask_job_title"
 
-        # 대화 출력 - 채팅 기록의 각 메시지를 화면에 표시
-        for i, (sender, msg) in enumerate(st.session_state.chat_history):
-            with st.chat_message("user" if sender == "🧑" else "assistant"):
-                st.write(msg)
-
         # 단계 완료 확인 상태 초기화
         if "step_complete_confirmed" not in st.session_state:
             st.session_state.step_complete_confirmed = False
 
-        # 처리 중 상태 관리 초기화
-        if "is_processing" not in st.session_state:
-            st.session_state.is_processing = False
-            
-        # 처리 중일 때 로딩 표시
-        if st.session_state.is_processing:
-            with st.chat_message("assistant"):
-                with st.spinner("AI가 답변을 생성 중입니다..."):
-                    st.empty()
-        
-        # 입력창 - 처리 중일 때 비활성화
-        user_input = st.chat_input("답변을 입력해주세요...", disabled=st.session_state.is_processing)
-
-        if user_input and not st.session_state.is_processing:
-            # 사용자 입력 추가
-            st.session_state.chat_history.append(("🧑", user_input))
-
-            # 처리 중으로 설정
-            st.session_state.is_processing = True
-            st.rerun()  # 사용자 입력과 로딩 표시 위해 재실행
-            
-        # 처리 중이고 입력이 대화 내역에 표시되어 있으면 응답 처리 진행
-        elif st.session_state.is_processing and len(st.session_state.chat_history) > 0 and st.session_state.chat_history[-1][0] == "🧑":
-            # 가장 최근 사용자 입력 가져오기
-            user_input = st.session_state.chat_history[-1][1]
-            
-            # 현재 주제 설정
-            current_topic = st.session_state.context.get("current_topic")
-            if not current_topic and st.session_state.step == 2:
-                current_topic = "job_info"
-                st.session_state.context["current_topic"] = current_topic
-            
-            # 주제가 있을 경우에만 분석 수행
-            if current_topic:
-                try:
-                    # 응답 분석 전에 사용자 입력 저장 (중복 저장 방지를 위해 analyze_response 함수 내에서 처리)
-                    is_complete, followup = analyze_response(user_input, current_topic)
-                    
-                    # 추가: 직무 정보 처리
-                    if current_topic == "job_info" and "title" not in st.session_state.resume_data["job_info"] and user_input:
-                        # 첫 번째 응답은 직무로 간주
-                        job_words = ["개발자", "프론트엔드", "백엔드", "데브옵스", "엔지니어", "기획자"]
-                        if any(word in user_input.lower() for word in job_words):
-                            st.session_state.resume_data["job_info"]["title"] = user_input
-                    
-                    if is_complete:
-                        st.session_state.step_complete_confirmed = True
-                        # 처리 완료 설정
-                        st.session_state.is_processing = False
-                        st.rerun()
-                    else:
-                        # 부족한 정보에 대한 후속 질문
-                        bot_response = followup
-                        st.session_state.chat_history.append(("🤖", bot_response))
-                        st.session_state.context["last_response"] = bot_response
-                        # 처리 완료 설정
-                        st.session_state.is_processing = False
-                        st.rerun()
-                except Exception as e:
-                    # 오류 발생 시 알림
-                    st.session_state.chat_history.append(("🤖", f"죄송합니다, 오류가 발생했습니다: {str(e)}"))
-                    st.session_state.is_processing = False
-                    st.rerun()
-            else:
-                # 주제가 없는 경우 기본 응답
-                st.session_state.step_complete_confirmed = True
-                st.session_state.is_processing = False
-                st.rerun()
+        # 대화 영역 (대화 출력 + 입력 처리)
+        chat_panel()
 
         # 단계 완료 확인 UI
         if st.session_state.step_complete_confirmed:
-            current_step = st.session_state.step
-            step_names = {
-                2: "직무 확인",
-                3: "경력 상세화",
-                4: "프로젝트",
-                5: "기술 스택",
-                6: "자기소개"
-            }
-            
+            step_pack = current_pack().step_at(st.session_state.step)
+
             st.divider()
-            st.subheader(f"📝 {step_names.get(current_step, '')} 단계 완료")
+            st.subheader(f"📝 {step_pack.label if step_pack else ''} 단계 완료")
             st.write("지금까지 이야기해주신 내용이 충분해 보여요. 다음 단계로 넘어갈까요?")
             
             col1, col2 = st.columns(2)
             with col1:
-                if st.button("네, 다음 단계로 넘어갈게요"):
-                    # 직무 정보 저장
-                    if "job_info" in st.session_state.resume_data and "title" not in st.session_state.resume_data["job_info"] and len(st.session_state.chat_history) >= 2:
-                        # 사용자의 첫 번째 응답을 직무로 저장
-                        user_responses = [msg for sender, msg in st.session_state.chat_history if sender == "🧑"]
-                        if user_responses:
-                            st.session_state.resume_data["job_info"]["title"] = user_responses[0]
-                    
-                    if current_step == 2:  # 직무 확인 완료
-                        st.session_state.step = 3
-                        st.session_state.current_question = 0
-                        st.session_state.context["current_topic"] = "experience"
-                        st.session_state.context["next_action"] = "ask_experience"
-                        
-                        # 단계 3 경력 상세화 첫 질문 메시지 직접 추가
-                        intro_message = f"""이제 {st.session_state.resume_data['basic_info']['name']}님의 직장 경력에 대해 자세히 알아볼게요! 🌟
-
-지금까지 어떤 회사에서 근무하셨는지 말씀해 주실 수 있을까요?
-회사명, 담당 직무, 근무 기간, 주요 업무와 성과 등을 중심으로 설명해 주시면 좋겠어요."""
-                        st.session_state.chat_history.append(("🤖", intro_message))
-                        
-                    elif current_step == 3:  # 경력 상세화 완료
-                        st.session_state.step = 4
-                        st.session_state.current_question = 0
-                        st.session_state.context["current_topic"] = "projects"
-                        st.session_state.context["next_action"] = "ask_projects"
-                        
-                        # 단계 4 프로젝트 첫 질문 메시지 직접 추가
-                        intro_message = f"""이번에는 주요 프로젝트 경험에 대해 이야기 나눠볼까요? 🚀
-
-진행했던 프로젝트 중에서 기술적으로 가장 도전적이었거나 의미 있었던 프로젝트를 소개해 주세요.
-프로젝트명, 목적, 사용한 기술 스택, 본인의 역할, 그리고 달성한 성과를 간단히 소개해 주시면 좋겠어요."""
-                        st.session_state.chat_history.append(("🤖", intro_message))
-                        
-                    elif current_step == 4:  # 프로젝트 완료
-                        st.session_state.step = 5
-                        st.session_state.current_question = 0
-                        st.session_state.context["current_topic"] = "skills"
-                        st.session_state.context["next_action"] = "ask_skills"
-                        
-                        # 단계 5 기술 스택 첫 질문 메시지 직접 추가
-                        intro_message = f"""이제 {st.session_state.resume_data['basic_info']['name']}님의 기술 스택에 대해 알아볼게요! 💻
-
-주로 사용하시는 기술 스택은 무엇인가요? 각 기술에 대한 숙련도도 함께 말씀해 주시면 도움이 될 것 같아요."""
-                        st.session_state.chat_history.append(("🤖", intro_message))
-                        
-                    elif current_step == 5:  # 기술 스택 완료
-                        st.session_state.step = 6
-                        st.session_state.current_question = 0
-                        st.session_state.context["current_topic"] = "summary"
-                        st.session_state.context["next_action"] = "ask_summary"
-                        
-                        # 단계 6 자기소개 첫 질문 메시지 직접 추가
-                        intro_message = f"""마지막으로 자기소개를 작성해볼까요? ✨
-
-{st.session_state.resume_data['basic_info']['name']}님의 강점과 특기를 중심으로 간단히 자기소개를 해주시겠어요?
-지원하시는 직무에서 본인이 가진 차별화된 역량이 있다면 함께 말씀해 주세요."""
-                        st.session_state.chat_history.append(("🤖", intro_message))
-                    elif current_step == 6:  # 자기소개 완료
-                        st.session_state.step = 7
-                        st.session_state.context["next_action"] = "show_resume"
-                    
-                    # 상태 업데이트 및 재실행
-                    st.session_state.step_complete_confirmed = False
-                    st.rerun()
-            
+                st.button("네, 다음 단계로 넘어갈게요", on_click=advance_step)
             with col2:
-                if st.button("아니요, 더 이야기할게 남았어요"):
-                    # 처리 중 상태로 설정
-                    st.session_state.is_processing = True
-                    st.session_state.step_complete_confirmed = False
-                    st.session_state.context["next_action"] = "ask_more_info"
-                    
-                    # 추가 질문 생성
-                    current_topic = st.session_state.context.get("current_topic")
-                    if current_topic:
-                        try:
-                            followup_question = f"더 자세히 알려주실 부분이 있을까요? {current_topic} 관련해서 추가로 알고 싶습니다."
-                            st.session_state.chat_history.append(("🤖", followup_question))
-                        except:
-                            pass
-                            
-                    # 처리 완료 후 상태 업데이트
-                    st.session_state.is_processing = False
-                    st.rerun()
+                st.button("아니요, 더 이야기할게 남았어요", on_click=request_more_info)
+            prefetch_next_messages()
 
     # Step 7: 이력서 구성 요소별 출력
     if st.session_state.step == 7:
@@ -687,14 +1199,16 @@ def main():
         data = st.session_state.resume_data
         basic_info = data.get("basic_info", {})
         job_info = data.get("job_info", {})
+        track_section_versions(data)
 
         # 데이터 검증
         missing_fields = validate_resume_data(data)
         if missing_fields:
             st.warning(f"다음 항목이 누락되었습니다: {', '.join(missing_fields)}")
-            if st.button("누락된 항목 입력하기"):
-                st.session_state.step = 1
-                st.rerun()
+            st.button("누락된 항목 입력하기", on_click=go_to_step, args=(1,))
+
+        # 섹션별 다듬은 문장 자리 - 화면을 먼저 그린 뒤 끝나는 섹션부터 채움
+        slots = {}
 
         # 1. 인적사항
         with st.expander("1. 인적사항", expanded=True):
@@ -704,9 +1218,7 @@ def main():
             **전화번호**: {basic_info.get('phone', '미입력')}  
             **포트폴리오**: {basic_info.get('portfolio', '없음')}
             """)
-            if st.button("인적사항 수정"):
-                st.session_state.step = 1
-                st.rerun()
+            st.button("인적사항 수정", on_click=go_to_step, args=(1,))
 
         # 2. 지원 직무
         with st.expander("2. 지원 직무", expanded=True):
@@ -715,185 +1227,137 @@ def main():
             **주요 기술**: {job_info.get('answer_0', '미입력')}  
             **주요 경험**: {job_info.get('answer_1', '미입력')}
             """)
-            if st.button("직무 정보 수정"):
-                st.session_state.step = 2
-                st.rerun()
+            show_structured_fields("job_info")
+            st.button("직무 정보 수정", on_click=go_to_step, args=(2,))
 
         # 3. 자기소개
         with st.expander("3. 자기소개", expanded=True):
+            slots["summary"] = st.empty()
             summary = data.get("summary", [])
             if summary:
                 st.markdown("\n".join(summary))
             else:
                 st.info("자기소개가 아직 작성되지 않았습니다.")
-            if st.button("자기소개 수정"):
-                st.session_state.step = 6
-                st.rerun()
+            show_structured_fields("summary")
+            st.button("자기소개 수정", on_click=go_to_step, args=(6,))
 
         # 4. 경력 요약
         with st.expander("4. 경력 및 프로젝트 경험", expanded=True):
+            slots["experience"] = st.empty()
             experiences = data.get("experience", [])
             if experiences:
                 for i, exp in enumerate(experiences, 1):
                     st.markdown(f"**{i}.** {exp}")
             else:
                 st.info("아직 입력된 경력 정보가 없습니다.")
-            if st.button("경력 정보 수정"):
-                st.session_state.step = 3
-                st.rerun()
+            show_structured_fields("experience")
+            st.button("경력 정보 수정", on_click=go_to_step, args=(3,))
 
         # 5. 프로젝트 요약
         with st.expander("5. 프로젝트 경험", expanded=True):
+            slots["projects"] = st.empty()
             projects = data.get("projects", [])
             if projects:
                 for i, proj in enumerate(projects, 1):
                     st.markdown(f"**{i}.** {proj}")
             else:
                 st.info("아직 입력된 프로젝트 정보가 없습니다.")
-            if st.button("프로젝트 정보 수정"):
-                st.session_state.step = 4
-                st.rerun()
+            show_structured_fields("projects")
+            st.button("프로젝트 정보 수정", on_click=go_to_step, args=(4,))
 
         # 6. 기술 스택
         with st.expander("6. 기술 스택", expanded=True):
+            slots["skills"] = st.empty()
             skills = data.get("skills", [])
             if skills:
                 st.markdown("\n".join(skills))
             else:
                 st.info("기술 스택이 아직 작성되지 않았습니다.")
-            if st.button("기술 스택 수정"):
-                st.session_state.step = 5
-                st.rerun()
+            show_structured_fields("skills")
+            terms_lines = format_terms(data.get("terms", {}), TECH_CATEGORIES)
+            if terms_lines:
+                st.caption("대화에서 언급된 기술")
+                st.markdown("\n".join(f"- {line}" for line in terms_lines))
+            st.button("기술 스택 수정", on_click=go_to_step, args=(5,))
+
+        polish_resume(data, slots)
 
         st.divider()
 
-        # 이력서 다운로드 옵션
+        # 이력서 다운로드 옵션 - 선택한 템플릿/포맷만 렌더링하고, 결과는 내용 해시로 캐시됨
         col1, col2 = st.columns(2)
         with col1:
-            if st.button("이력서 다운로드"):
-                resume_text = build_resume_text(data)
-                if resume_text:
-                    st.success("이력서가 생성되었습니다!")
-                    st.download_button(
-                        "📥 이력서 다운로드",
-                        resume_text,
-                        file_name=f"{basic_info.get('name', 'resume')}.txt",
-                        mime="text/plain"
-                    )
+            template_labels = {spec["label"]: key for key, spec in TEMPLATES.items()}
+            format_labels = {label: key for key, label in RESUME_FORMAT_LABELS.items()}
+            template = template_labels[st.selectbox("템플릿", list(template_labels), key="resume_template")]
+            fmt = format_labels[st.selectbox("파일 형식", list(format_labels), key="resume_format")]
+            resume_file = render_resume(data, fmt, template)
+            if resume_file is not None:
+                extension, mime = FORMATS[fmt]
+                st.download_button(
+                    "📥 이력서 다운로드",
+                    resume_file,
+                    file_name=f"{basic_info.get('name', 'resume')}.{extension}",
+                    mime=mime
+                )
 
         with col2:
-            if st.button("처음으로 돌아가기"):
-                for key in st.session_state.keys():
-                    del st.session_state[key]
-                st.rerun()
-
-def analyze_response(user_input: str, topic: str) -> tuple[bool, str]:
-    """사용자 응답을 분석하고 수집된 정보 상태를 업데이트"""
-    # 기본 설정: 질문 카운터 초기화
-    if "question_count" not in st.session_state:
-        st.session_state.question_count = {}
-    
-    if topic not in st.session_state.question_count:
-        st.session_state.question_count[topic] = 0
-    
-    # 응답 저장 로직 - 현재 단계의 정보를 resume_data에 저장
-    if topic == "job_info":
-        # 직무 정보 저장
-        if "answer_" + str(st.session_state.question_count[topic]) not in st.session_state.resume_data["job_info"]:
-            st.session_state.resume_data["job_info"]["answer_" + str(st.session_state.question_count[topic])] = user_input
-    
-    elif topic == "experience":
-        # 경력 정보 저장
-        if not st.session_state.resume_data.get("experience"):
-            st.session_state.resume_data["experience"] = []
-        
-        if st.session_state.question_count[topic] == 0:
-            st.session_state.resume_data["experience"].append(user_input)
-        else:
-            # 마지막 경력 항목 업데이트
-            if st.session_state.resume_data["experience"]:
-                last_exp = st.session_state.resume_data["experience"][-1]
-                st.session_state.resume_data["experience"][-1] = f"{last_exp}\n추가 정보: {user_input}"
-            else:
-                st.session_state.resume_data["experience"].append(user_input)
-    
-    elif topic == "projects":
-        # 프로젝트 정보 저장
-        if not st.session_state.resume_data.get("projects"):
-            st.session_state.resume_data["projects"] = []
-        
-        if st.session_state.question_count[topic] == 0:
-            st.session_state.resume_data["projects"].append(user_input)
-        else:
-            # 마지막 프로젝트 항목 업데이트
-            if st.session_state.resume_data["projects"]:
-                last_proj = st.session_state.resume_data["projects"][-1]
-                st.session_state.resume_data["projects"][-1] = f"{last_proj}\n추가 정보: {user_input}"
-            else:
-                st.session_state.resume_data["projects"].append(user_input)
-    
-    elif topic == "skills":
-        # 기술 스택 정보 저장
-        if not st.session_state.resume_data.get("skills"):
-            st.session_state.resume_data["skills"] = []
-        
-        skill_entry = f"- {user_input}"
-        if skill_entry not in st.session_state.resume_data["skills"]:
-            st.session_state.resume_data["skills"].append(skill_entry)
-    
-    elif topic == "summary":
-        # 자기소개 정보 저장
-        if not st.session_state.resume_data.get("summary"):
-            st.session_state.resume_data["summary"] = []
-        
-        st.session_state.resume_data["summary"].append(user_input)
-    
-    # 직무 정보 특별 처리
-    if topic == "job_info":
-        # 직무 관련 키워드 확인
-        job_keywords = ["개발자", "프론트엔드", "백엔드", "풀스택", "데브옵스", "엔지니어", "PM", "PO", "기획자"]
-        
-        # 사용자가 직무명을 포함했는지 확인
-        if any(keyword in user_input for keyword in job_keywords):
-            st.session_state.resume_data["job_info"]["title"] = user_input
-            return False, f"{user_input}로 지원하시는군요. 해당 직무에서 주로 사용하시는 기술 스택이나 경험에 대해 알려주세요."
-        
-        # 이미 한 번 이상 대화했다면 단계 완료
-        st.session_state.question_count[topic] += 1
-        if st.session_state.question_count[topic] >= 2:
-            return True, ""
-        
-        # 추가 질문
-        return False, "해당 직무에서 가장 중요한 기술이나 역량은 무엇이라고 생각하시나요?"
-    
-    # 나머지 토픽 처리 (단순화된 로직)
-    st.session_state.question_count[topic] += 1
-    
-    # 2번의 질문-응답 후 다음 단계로 이동
-    if st.session_state.question_count[topic] >= 2:
-        return True, ""
-    
-    # 첫 번째 질문 후 추가 질문
-    follow_up_questions = {
-        "experience": "해당 경험에서 가장 기억에 남는 성과나 어려움은 무엇이었나요?",
-        "projects": "이 프로젝트에서 본인의 역할과 기여한 부분을 좀 더 자세히 설명해주실 수 있을까요?",
-        "skills": "앞으로 발전시키고 싶은 기술 분야가 있으신가요?",
-        "summary": "앞으로의 커리어 목표나 발전 방향에 대해 말씀해주세요."
-    }
-    
-    return False, follow_up_questions.get(topic, "조금 더 자세히 설명해주실 수 있을까요?")
+            st.button("처음으로 돌아가기", on_click=reset_session)
+
+        with st.expander("이력서 미리보기"):
+            preview = render_resume(data, "md", template)
+            if preview:
+                st.markdown(preview)
+
+    # 이어하기 안내
+    session_id = st.session_state.get("session_id")
+    if session_id:
+        with st.sidebar:
+            st.caption("이 주소로 다시 접속하면 진행 중인 인터뷰를 이어서 할 수 있어요.")
+            st.code(session_id, language=None)
+
+    if admin_panel_enabled():
+        show_admin_panel()
 
-def generate_followup_question(previous_answer, topic):
+    save_session()
+
+# 스트리밍하지 않는 모델 호출(필드 추출) - 응답이 한 번에 도착하므로 첫 토큰까지의 시간이 곧 전체 시간
+def timed_model_call(prompt, schema):
+    start = time.perf_counter()
+    try:
+        return call_model(prompt, response_schema=schema)
+    finally:
+        elapsed = time.perf_counter() - start
+        record_model_latency(elapsed, elapsed)
+
+@telemetry.timed("analyze_response")
+def analyze_response(user_input, topic):
+    """사용자 응답을 분석하고 수집된 정보 상태를 업데이트 (interview.analyze_response를 현재 세션에 적용)"""
+    return interview.analyze_response(
+        st.session_state,
+        user_input,
+        topic,
+        generate=timed_model_call,
+        term_index=get_term_index(),
+        memory=get_conversation_memory(),
+        packs=get_question_packs().get(),
+        # 모델 후속 질문은 생성하지 않고 스트림으로 돌려받아 process_user_turn에서 바로 출력
+        followup=lambda answer, topic: generate_followup_question(answer, topic, stream=True),
+        on_decision=lambda source: telemetry.inc("step_decisions_total", source=source),
+    )
+
+def generate_followup_question(previous_answer, topic, stream=False):
     # 현재 단계의 수집 상태 확인
     current_info = st.session_state.collected_info.get(topic, {})
     incomplete_fields = [field for field, collected in current_info.items() if not collected]
     
     if not incomplete_fields:
-        return "STEP_COMPLETE"
+        return iter([STEP_COMPLETE_MARKER]) if stream else STEP_COMPLETE_MARKER
     
     # 부족한 필드에 대한 질문 생성
+    step_pack = current_pack().step(topic)
     field_name = incomplete_fields[0]
-    field_description = next((desc for name, desc in FIELD_DEFINITIONS[topic] if name == field_name), "")
+    field_description = next((desc for name, desc in step_pack.fields if name == field_name), "")
     
     # 첫 질문인 경우
     if not previous_answer:
@@ -906,7 +1370,7 @@ def generate_followup_question(previous_answer, topic):
         """
     else:
         prompt = f"""
-        이전 응답: "{previous_answer}"
+        이전 응답: "{get_conversation_memory().clip(previous_answer)}"
         
         다음 필드에 대한 추가 정보를 요청하는 질문을 생성해주세요:
         필드명: {field_name}
@@ -915,8 +1379,15 @@ def generate_followup_question(previous_answer, topic):
         질문은 자연스럽고 친근한 말투로 작성해주세요.
         """
     
-    response = model.generate_content(prompt)
-    return response.text.strip()
+    fallback = fallback_question(step_pack, incomplete_fields)
+    if stream:
+        return stream_gpt_response(prompt, fallback=fallback)
+    try:
+        return call_model(prompt).strip()
+    except Exception as e:
+        notify_model_failure(e)
+        return fallback
 
 if __name__ == "__main__":
-    main()
+    with telemetry.span("script_run"):
+        main()
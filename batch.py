@@ -0,0 +1,269 @@
+"""헤드리스 배치 모드 - 인터뷰 답변/대화 기록 JSONL을 Streamlit 없이 이력서로 변환
+
+입력 JSONL은 한 줄에 지원자 한 명이다.
+    {"id": "cand-001",
+     "basic_info": {"name": "홍길동", "email": "hong@example.com"},
+     "answers": {"job_info": ["백엔드 개발자", "..."], "experience": ["..."], ...}}
+answers 키는 주제(job_info, experience, projects, skills, summary) 또는 단계 번호(2~6)이다.
+answers 대신 대화 기록을 줄 수도 있다 (사용자 발화만 사용).
+    {"id": "...", "basic_info": {...},
+     "transcript": [{"step": 2, "role": "user", "text": "..."}, {"step": 2, "role": "assistant", "text": "..."}]}
+
+앱과 같은 interview.analyze_response(필드 추출, 용어 탐지 포함)와 직무별 질문 팩으로
+단계별 답변을 처리하고 resume_render로 이력서를 만든다. 지원자는 프로세스 풀에서 병렬로 처리하고, 모델 호출은
+모든 프로세스를 합쳐 --model-concurrency개까지만 동시에 보낸다. 끝나는 순서대로
+--output-dir에 파일을, --output-jsonl(기본값: 표준 출력)에 결과 한 줄을 바로 쓴다.
+파일 이름은 "입력 줄 번호-id.확장자"라서 id가 같은 지원자끼리도 서로 덮어쓰지 않는다.
+
+사용 예:
+    python batch.py candidates.jsonl --output-dir out/ --formats txt pdf --workers 8 --model-concurrency 4
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from dotenv import load_dotenv
+
+import interview
+from conversation_memory import ConversationMemory
+from interview import STEP_TOPICS, new_collected_info, new_resume_data
+from llm_backend import create_backend
+from llm_cache import ResponseCache, make_cache_key
+from question_packs import QuestionPackError, load_question_packs
+from resilient_client import wrap_backend
+from resume_render import DEFAULT_TEMPLATE, FORMATS, TEMPLATES, render
+from session_model import bot_message, user_message
+from term_index import TermIndex
+
+# 워커 프로세스별 자원 (initializer에서 한 번만 생성)
+_worker = {}
+
+
+def _init_worker(semaphore):
+    load_dotenv()
+    backend = wrap_backend(create_backend())
+    _worker.update(
+        backend=backend,
+        semaphore=semaphore,
+        term_index=TermIndex.from_file(os.getenv("TERM_DICTIONARY_PATH") or None),
+        packs=load_question_packs(os.getenv("QUESTION_PACKS_DIR") or None),
+        cache=ResponseCache(
+            path=os.getenv("LLM_CACHE_PATH", ".cache/llm_cache.sqlite3") or None,
+            max_memory_items=int(os.getenv("LLM_CACHE_MEMORY_ITEMS", "256")),
+            max_disk_items=int(os.getenv("LLM_CACHE_DISK_ITEMS", "10000")),
+            ttl=float(os.getenv("LLM_CACHE_TTL", str(24 * 60 * 60))),
+        ),
+    )
+
+
+def _generate(prompt, response_schema):
+    """앱의 call_model과 같은 캐시 키를 써서 앱/배치가 응답 캐시를 공유
+
+    워커들이 같은 SQLite 캐시를 쓰므로 잠금 등으로 캐시를 읽고 쓰지 못하면 캐시 없이 진행한다
+    (이미 받은 모델 응답 때문에 지원자 처리가 실패하지 않도록).
+    """
+    backend, cache = _worker["backend"], _worker["cache"]
+    key = make_cache_key(prompt, backend.model_name, {"response_schema": response_schema})
+    try:
+        cached = cache.get(key)
+    except sqlite3.Error:
+        cached = None
+    if cached is not None:
+        return cached
+    with _worker["semaphore"]:
+        _worker["calls"] = _worker.get("calls", 0) + 1
+        text = backend.generate(prompt, response_schema=response_schema)
+    try:
+        cache.set(key, text)
+    except sqlite3.Error:
+        pass
+    return text
+
+
+def _new_memory(state):
+    return ConversationMemory(
+        state,
+        budget_tokens=int(os.getenv("PROMPT_TOKEN_BUDGET", "1500")),
+        recent_messages=int(os.getenv("MEMORY_RECENT_MESSAGES", "4")),
+        field_tokens=int(os.getenv("MEMORY_FIELD_TOKENS", "200")),
+        summary_tokens=int(os.getenv("MEMORY_SUMMARY_TOKENS", "250")),
+    )
+
+
+def candidate_answers(record):
+    """{단계: [사용자 답변, ...]}"""
+    topic_steps = {topic: step for step, topic in STEP_TOPICS.items()}
+    answers = {}
+    if "answers" in record:
+        for key, values in record["answers"].items():
+            step = topic_steps.get(key) or (int(key) if str(key).isdigit() else None)
+            if step not in STEP_TOPICS:
+                raise ValueError(f"알 수 없는 단계/주제입니다: {key}")
+            answers.setdefault(step, []).extend([values] if isinstance(values, str) else values)
+    for turn in record.get("transcript", []):
+        if turn.get("role", "user") == "user" and turn.get("text"):
+            step = int(turn.get("step", 2))
+            if step not in STEP_TOPICS:
+                raise ValueError(f"알 수 없는 단계입니다: {step}")
+            answers.setdefault(step, []).append(turn["text"])
+    return answers
+
+
+def run_interview(record, generate, term_index, packs):
+    """앱의 Step 2~6 흐름을 그대로 따라가며 답변을 처리하고 세션 상태를 반환"""
+    state = {
+        "step": 2,
+        "chat_history": [],
+        "resume_data": new_resume_data(record.get("basic_info")),
+        "question_count": {},
+        "collected_info": new_collected_info(packs.default),
+        "context": {"current_topic": None, "last_response": None, "next_action": "ask_job_title"},
+        "memory": {},
+    }
+    memory = _new_memory(state["memory"])
+    answers = candidate_answers(record)
+    for step, topic in STEP_TOPICS.items():
+        state["step"] = step
+        state["context"]["current_topic"] = topic
+        memory.start_step(step, len(state["chat_history"]))
+        # 답변 세트는 이미 정해져 있으므로 단계가 완료되어도 남은 답변까지 모두 반영
+        for answer in answers.get(step, []):
+            state["chat_history"].append(user_message(answer))
+            _, followup = interview.analyze_response(state, answer, topic, generate, term_index, memory, packs)
+            if followup:
+                state["chat_history"].append(bot_message(followup))
+                state["context"]["last_response"] = followup
+        # 앱의 advance_step과 같이, 직무가 정해지지 않았으면 첫 답변을 직무로 사용
+        job_info = state["resume_data"]["job_info"]
+        if step == 2 and "title" not in job_info and answers.get(2):
+            job_info["title"] = answers[2][0]
+        memory.close_step(step, state["chat_history"])
+    state["step"] = 7
+    return state
+
+
+def _safe_name(name):
+    return re.sub(r"[^0-9A-Za-z가-힣._-]+", "_", str(name)).strip("._") or "candidate"
+
+
+def process_candidate(line_number, line, formats, template, output_dir):
+    """지원자 한 명 처리 - 워커 프로세스에서 실행"""
+    start = time.perf_counter()
+    calls_before = _worker.get("calls", 0)
+    result = {"line": line_number}
+    try:
+        record = json.loads(line)
+        result["id"] = str(record.get("id") or f"line-{line_number}")
+        state = run_interview(record, _generate, _worker["term_index"], _worker["packs"])
+        data = state["resume_data"]
+        result["resume_data"] = data
+        # 주제별로 채우지 못한 필드 (같은 이름의 필드가 여러 주제에 있을 수 있음)
+        missing = {}
+        for topic, fields in state["collected_info"].items():
+            names = [name for name, collected in fields.items() if not collected]
+            if names:
+                missing[topic] = names
+        result["missing"] = missing
+        if output_dir:
+            files = []
+            for fmt in formats:
+                extension, _ = FORMATS[fmt]
+                path = os.path.join(output_dir, f"{line_number}-{_safe_name(result['id'])}.{extension}")
+                content = render(data, fmt, template)
+                mode, encoding = ("wb", None) if isinstance(content, bytes) else ("w", "utf-8")
+                with open(path, mode, encoding=encoding) as f:
+                    f.write(content)
+                files.append(path)
+            result["files"] = files
+        else:
+            result["resume_text"] = render(data, "txt", template)
+    except Exception as e:
+        result.setdefault("id", f"line-{line_number}")
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["model_calls"] = _worker.get("calls", 0) - calls_before
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def read_lines(path):
+    with (sys.stdin if path == "-" else open(path, encoding="utf-8")) as f:
+        for number, line in enumerate(f, 1):
+            if line.strip():
+                yield number, line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="IT 이력서 챗봇 헤드리스 배치 변환")
+    parser.add_argument("input", help="지원자 JSONL 파일 경로 (- 이면 표준 입력)")
+    parser.add_argument("--output-dir", help="이력서 파일을 저장할 디렉터리")
+    parser.add_argument("--output-jsonl", default="-", help="결과 JSONL 경로 (기본값: 표준 출력)")
+    parser.add_argument("--formats", nargs="+", default=["txt"], choices=list(FORMATS), help="저장할 파일 형식")
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE, choices=list(TEMPLATES), help="이력서 템플릿")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="워커 프로세스 수")
+    parser.add_argument("--model-concurrency", type=int, default=4, help="전체 프로세스의 동시 모델 호출 수 상한")
+    args = parser.parse_args(argv)
+
+    # 질문 팩 오류는 워커를 띄우기 전에 알림 (워커는 각자 한 번씩 컴파일)
+    load_dotenv()
+    try:
+        load_question_packs(os.getenv("QUESTION_PACKS_DIR") or None)
+    except QuestionPackError as e:
+        parser.error(str(e))
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    context = multiprocessing.get_context()
+    semaphore = context.BoundedSemaphore(max(1, args.model_concurrency))
+    max_in_flight = max(1, args.workers) * 4
+    counts = {"done": 0, "failed": 0, "duplicate_ids": 0}
+    seen_ids = set()
+    start = time.perf_counter()
+
+    out = sys.stdout if args.output_jsonl == "-" else open(args.output_jsonl, "w", encoding="utf-8")
+    try:
+        with ProcessPoolExecutor(max_workers=max(1, args.workers), mp_context=context,
+                                 initializer=_init_worker, initargs=(semaphore,)) as pool:
+            pending = set()
+
+            def drain(return_when):
+                nonlocal pending
+                done, pending = wait(pending, return_when=return_when)
+                for future in done:
+                    result = future.result()
+                    counts["failed" if "error" in result else "done"] += 1
+                    if result["id"] in seen_ids:
+                        counts["duplicate_ids"] += 1
+                    seen_ids.add(result["id"])
+                    out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                    out.flush()
+
+            # 입력을 한꺼번에 읽지 않고, 처리 중인 작업 수를 제한하며 제출
+            for number, line in read_lines(args.input):
+                pending.add(pool.submit(process_candidate, number, line, args.formats, args.template, args.output_dir))
+                if len(pending) >= max_in_flight:
+                    drain(FIRST_COMPLETED)
+            while pending:
+                drain(FIRST_COMPLETED)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"완료 {counts['done']}명, 실패 {counts['failed']}명, {elapsed:.1f}초",
+        file=sys.stderr,
+    )
+    if counts["duplicate_ids"]:
+        print(f"id가 중복된 지원자 {counts['duplicate_ids']}명 (파일 이름의 줄 번호로 구분)", file=sys.stderr)
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,361 @@
+"""다중 세션 부하 테스트 / 벤치마크
+
+Streamlit AppTest로 N개의 가상 세션을 띄워 Step 1(기본 정보 폼)부터
+Step 7(이력서 확인)까지 전체 흐름을 진행하고, 결과를 JSON으로 출력한다.
+모델은 항상 스텁 백엔드(LLM_BACKEND=stub)를 사용한다.
+
+사용 예:
+    python benchmarks/bench_sessions.py --sessions 20 --concurrency 4 --output bench.json
+    # 단계마다 "아니요"를 한 번 누르고, 사용자가 읽고 고르는 시간(초)을 흉내 냄 (추측 실행 효과 측정)
+    python benchmarks/bench_sessions.py --more-info --think-time 0.3 --output prefetch.json
+
+측정 항목:
+- 스크립트 실행(rerun) 1회당 지연 시간 p50/p90/p95/p99
+- 사용자 턴(채팅 입력/버튼 클릭) 1회당 스크립트 실행 횟수
+- 턴 종류별 지연 시간 (think-time은 포함하지 않음)
+- 세션 종료 시점의 session_state 메모리 사용량
+- 추측 실행(prefetch) 결과별 횟수와 적중률
+- 전체 처리량(세션/초, 턴/초)
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "app.py")
+
+# 단계별 사용자 답변 (순서대로 사용하고, 부족하면 반복)
+ANSWERS = {
+    2: [
+        "백엔드 개발자",
+        "Java와 Spring Boot를 3년 정도 사용했고 MySQL, Redis도 다룰 수 있어요.",
+        "REST API 설계와 결제 시스템 개발을 주로 했습니다.",
+    ],
+    3: [
+        "ABC커머스에서 2021년 3월부터 2024년 2월까지 백엔드 개발자로 일했습니다.",
+        "주문 처리 API를 개선해서 응답 시간을 40% 줄였어요.",
+        "Java, Spring Boot, JPA, Kafka를 주로 사용했습니다.",
+    ],
+    4: [
+        "사내 정산 자동화 프로젝트를 6개월 동안 리드했습니다. Kotlin, Spring Batch를 사용했어요.",
+        "월 정산 시간을 3일에서 4시간으로 단축했습니다.",
+    ],
+    5: [
+        "Java, Kotlin은 상급이고 Python은 중급입니다. Spring, JPA, MySQL, AWS를 주로 씁니다.",
+        "최근에는 Kubernetes를 공부하고 있어요.",
+        "Git, Jira, IntelliJ IDEA를 매일 씁니다.",
+    ],
+    6: [
+        "문제를 끝까지 파고드는 개발자입니다.",
+        "대규모 트래픽을 다루는 백엔드 아키텍트가 되는 것이 목표입니다.",
+        "코드 리뷰와 문서화로 팀과 적극적으로 소통하며 협업하는 스타일이에요.",
+    ],
+}
+NEXT_STEP_LABEL = "네, 다음 단계로 넘어갈게요"
+MORE_INFO_LABEL = "아니요, 더 이야기할게 남았어요"
+MAX_TURNS_PER_STEP = 8
+PREFETCH_OUTCOMES = ("submitted", "hit", "miss", "discarded", "expired", "error")
+
+
+def _install_runner():
+    """AppTest가 실제 Streamlit 런타임처럼 동작하도록 스크립트 러너를 교체
+
+    - st.rerun()으로 중단된 실행 뒤에는 트리거 위젯(버튼/채팅 입력) 값을 초기화
+      (AppTest 기본 러너는 트리거를 남겨둬서 같은 입력이 반복 처리됨)
+    - 실행마다 이전 실행의 메시지를 비워 마지막 실행 화면만 남김
+    - 스크립트 실행 1회마다 소요 시간을 기록
+    - 실제 런타임처럼 컴파일된 스크립트를 실행 간에 재사용 (AppTest는 실행마다 새로 컴파일)
+    """
+    from streamlit.runtime.scriptrunner import ScriptRunnerEvent
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+    script_cache = ScriptCache()
+    local_script_runner.ScriptCache = lambda: script_cache
+
+    class RecordingScriptRunner(LocalScriptRunner):
+        executions = []
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self._execution_started = None
+            self.on_event.connect(self._on_started, weak=False)
+
+        def _on_started(self, sender, event, **kwargs):
+            # st.rerun()에 의한 재실행도 같은 _run_script 호출 안에서 반복되므로 이벤트로 구분
+            if event == ScriptRunnerEvent.SCRIPT_STARTED:
+                self.forward_msg_queue.clear()
+                self._execution_started = time.perf_counter()
+
+        def _on_script_finished(self, ctx, event, premature_stop):
+            if self._execution_started is not None:
+                RecordingScriptRunner.executions.append(time.perf_counter() - self._execution_started)
+                self._execution_started = None
+            if event == ScriptRunnerEvent.SCRIPT_STOPPED_FOR_RERUN:
+                self._session_state.on_script_finished(ctx.widget_ids_this_run)
+            super()._on_script_finished(ctx, event, premature_stop)
+
+    app_test.LocalScriptRunner = RecordingScriptRunner
+    return RecordingScriptRunner
+
+
+def percentile(values, p):
+    """최근접 순위 방식 백분위수"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(values):
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values) if values else None,
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else None,
+    }
+
+
+def run_session(session_id, timeout, think_time=0.0, more_info=False):
+    """가상 사용자 한 명이 Step 1 → 7까지 진행
+
+    - think_time: 사용자 턴마다 화면을 읽고 답하는 시간(초) - 턴 지연 시간에는 넣지 않음
+    - more_info: 단계마다 완료 확인에서 "아니요"를 한 번 누른 뒤 이어서 답함
+    """
+    # 스크립트 러너가 sys.modules["__main__"]를 app 모듈로 바꾸므로 끝나면 되돌림
+    # (워커 프로세스가 다음 작업의 run_session을 찾을 수 있도록)
+    main_module = sys.modules["__main__"]
+    try:
+        return _run_session(session_id, timeout, think_time, more_info)
+    finally:
+        sys.modules["__main__"] = main_module
+
+
+def _run_session(session_id, timeout, think_time=0.0, more_info=False):
+    runner = _install_runner()
+    from streamlit.testing.v1 import AppTest
+    from session_model import session_memory
+
+    # 워커 프로세스는 세션을 하나씩 실행하므로 세션 전후 카운터 차이가 이 세션의 추측 실행 결과
+    prefetch_before = prefetch_counts(timeout)
+    runner.executions = []
+    turns = []
+
+    def act(kind, fn):
+        if think_time and kind != "initial":
+            time.sleep(think_time)
+        before = len(runner.executions)
+        start = time.perf_counter()
+        fn()
+        turns.append({
+            "kind": kind,
+            "reruns": len(runner.executions) - before,
+            "seconds": time.perf_counter() - start,
+            # 이 턴에서 마지막으로 만든 대화 프롬프트의 토큰 수 (ConversationMemory가 섹션별로 기록)
+            "prompt_tokens": sum((at.session_state["memory"].get("last_prompt_tokens") or {}).values())
+            if "memory" in at.session_state else 0,
+        })
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+
+    start = time.perf_counter()
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    act("initial", at.run)
+
+    # Step 1: 기본 정보 폼 제출
+    at.text_input[0].input(f"사용자{session_id}")
+    at.text_input[1].input(f"user{session_id}@example.com")
+    at.text_input[2].input("010-1234-5678")
+    act("form", lambda: at.button[0].click().run())
+
+    # Step 2 ~ 6: 채팅 후 단계 완료 확인
+    for step in range(2, 7):
+        if at.session_state.step != step:
+            raise RuntimeError(f"step {step}를 기대했지만 {at.session_state.step} 단계입니다")
+        answers = ANSWERS[step]
+        asked_more = not more_info
+        for turn in range(MAX_TURNS_PER_STEP):
+            if at.session_state.step_complete_confirmed:
+                if asked_more:
+                    break
+                asked_more = True
+                button = next(b for b in at.button if b.label == MORE_INFO_LABEL)
+                act("more_info", lambda: button.click().run())
+            answer = answers[turn % len(answers)]
+            act("chat", lambda: at.chat_input[0].set_value(answer).run())
+        else:
+            raise RuntimeError(f"step {step}가 {MAX_TURNS_PER_STEP}턴 안에 끝나지 않았습니다")
+        button = next(b for b in at.button if b.label == NEXT_STEP_LABEL)
+        act("confirm", lambda: button.click().run())
+
+    if at.session_state.step != 7 or not any("이력서 항목별 정리" in t.value for t in at.title):
+        raise RuntimeError("Step 7 이력서 화면에 도달하지 못했습니다")
+
+    seconds, executions = time.perf_counter() - start, list(runner.executions)
+    prefetch_after = prefetch_counts(timeout)
+    state = {key: at.session_state[key] for key in at.session_state._state.filtered_state}
+    memory = session_memory(state, ["chat_history", *sorted(key for key in state if key != "chat_history")])
+    return {
+        "session_id": session_id,
+        "seconds": seconds,
+        "executions": executions,
+        "turns": turns,
+        "session_state_bytes": memory["total"],
+        "session_state_bytes_by_key": memory["keys"],
+        "chat_messages": len(state.get("chat_history", [])),
+        "prefetch": {outcome: prefetch_after[outcome] - prefetch_before.get(outcome, 0) for outcome in prefetch_after},
+    }
+
+
+def prefetch_counts(timeout):
+    """앱이 쓰는 추측 실행기의 결과별 누적 횟수 (PREFETCH_WORKERS=0이면 빈 dict)
+
+    st.cache_resource는 스크립트 실행 밖에서 부르면 캐시를 읽지 않고 새 객체를 만들므로
+    작은 스크립트를 AppTest로 실행해서 앱과 같은 인스턴스를 읽는다.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_function(_read_prefetch_stats, default_timeout=timeout).run()
+    stats = at.session_state["prefetch_stats"]
+    return {outcome: stats[outcome] for outcome in PREFETCH_OUTCOMES if outcome in stats}
+
+
+def _read_prefetch_stats():
+    import streamlit as st
+    from resources import get_prefetcher
+
+    prefetcher = get_prefetcher()
+    st.session_state.prefetch_stats = prefetcher.stats() if prefetcher is not None else {}
+
+
+def summarize_prefetch(results):
+    """세션별 추측 실행 횟수를 합치고 적중률 계산 (hit / (hit + miss + discarded + expired + error))"""
+    totals = dict.fromkeys(PREFETCH_OUTCOMES, 0)
+    for r in results:
+        for outcome, amount in r["prefetch"].items():
+            totals[outcome] += amount
+    decided = sum(totals[outcome] for outcome in PREFETCH_OUTCOMES if outcome != "submitted")
+    return {
+        **totals,
+        "hit_rate": round(totals["hit"] / decided, 3) if decided else None,
+        "miss_rate": round((decided - totals["hit"]) / decided, 3) if decided else None,
+    }
+
+
+def _configure_env(args):
+    os.environ["LLM_BACKEND"] = "stub"
+    os.environ["STUB_LATENCY"] = str(args.stub_latency)
+    os.environ["STUB_LENGTH"] = str(args.stub_length)
+    # 벤치마크 결과가 디스크 캐시 상태에 좌우되지 않도록 메모리 캐시만 사용하고 세션 저널은 끔
+    os.environ.setdefault("LLM_CACHE_PATH", "")
+    os.environ.setdefault("SESSION_JOURNAL_PATH", "")
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+
+def _worker_init(env):
+    os.environ.update(env)
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="IT 이력서 챗봇 다중 세션 벤치마크")
+    parser.add_argument("--sessions", type=int, default=10, help="실행할 가상 세션 수")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시에 실행할 세션 수(프로세스 수)")
+    parser.add_argument("--stub-latency", type=float, default=0.05, help="스텁 모델 응답 시간(초)")
+    parser.add_argument("--stub-length", type=int, default=120, help="스텁 모델 응답 길이(글자)")
+    parser.add_argument("--timeout", type=float, default=60, help="AppTest 실행 1회당 제한 시간(초)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="사용자 턴 사이의 대기 시간(초)")
+    parser.add_argument("--more-info", action="store_true", help='단계마다 "아니요"를 한 번 누름')
+    parser.add_argument("--output", help="결과 JSON 파일 경로 (생략 시 표준 출력)")
+    args = parser.parse_args(argv)
+
+    _configure_env(args)
+    env = {k: os.environ[k] for k in ("LLM_BACKEND", "STUB_LATENCY", "STUB_LENGTH", "LLM_CACHE_PATH", "SESSION_JOURNAL_PATH")}
+    env.update({k: os.environ[k] for k in ("PREFETCH_WORKERS", "MEMORY_SUMMARIZER", "LOCAL_COMPLETENESS", "RETRIEVAL_TOP_K") if k in os.environ})
+
+    results, failures = [], []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.concurrency, initializer=_worker_init, initargs=(env,)) as pool:
+        futures = {
+            pool.submit(run_session, i, args.timeout, args.think_time, args.more_info): i
+            for i in range(args.sessions)
+        }
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                failures.append({"session_id": futures[future], "error": repr(e)})
+    wall = time.perf_counter() - start
+
+    executions = [t for r in results for t in r["executions"]]
+    user_turns = [t for r in results for t in r["turns"] if t["kind"] in ("chat", "more_info", "confirm", "form")]
+    memory = [r["session_state_bytes"] for r in results]
+    report = {
+        "benchmark": "sessions",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "config": {
+            "sessions": args.sessions,
+            "concurrency": args.concurrency,
+            "stub_latency": args.stub_latency,
+            "stub_length": args.stub_length,
+            "think_time": args.think_time,
+            "more_info": args.more_info,
+            "prefetch_workers": int(os.getenv("PREFETCH_WORKERS", "4")),
+            "local_completeness": os.getenv("LOCAL_COMPLETENESS", "1") != "0",
+            "retrieval_top_k": int(os.getenv("RETRIEVAL_TOP_K", "4")),
+        },
+        "completed_sessions": len(results),
+        "failures": failures,
+        "rerun_latency_seconds": summarize(executions),
+        "turn_latency_seconds": summarize([t["seconds"] for t in user_turns]),
+        "reruns_per_turn": {
+            kind: summarize([t["reruns"] for r in results for t in r["turns"] if t["kind"] == kind])
+            for kind in ("form", "chat", "more_info", "confirm")
+        },
+        "turn_latency_by_kind": {
+            kind: summarize([t["seconds"] for r in results for t in r["turns"] if t["kind"] == kind])
+            for kind in ("form", "chat", "more_info", "confirm")
+        },
+        # 단계를 마칠 때까지 보낸 답변 수 (적을수록 인터뷰가 빨리 끝남)
+        "chat_turns_per_session": summarize([sum(t["kind"] == "chat" for t in r["turns"]) for r in results]),
+        "prompt_tokens_per_chat_turn": summarize([t["prompt_tokens"] for r in results for t in r["turns"] if t["kind"] == "chat"]),
+        "session_state_bytes": summarize(memory),
+        "prefetch": summarize_prefetch(results),
+        "session_state_bytes_by_key": {
+            key: summarize([r["session_state_bytes_by_key"].get(key, 0) for r in results])["p50"]
+            for key in sorted({key for r in results for key in r["session_state_bytes_by_key"]})
+        },
+        "throughput": {
+            "wall_seconds": wall,
+            "sessions_per_second": len(results) / wall if wall else None,
+            "turns_per_second": len(user_turns) / wall if wall else None,
+            "reruns_per_second": len(executions) / wall if wall else None,
+        },
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
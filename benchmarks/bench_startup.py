@@ -0,0 +1,171 @@
+"""시작 시간 벤치마크 - 콜드 스타트와 실행(rerun)마다의 모듈 오버헤드
+
+새 파이썬 프로세스에서 측정하므로 이미 불러온 모듈/캐시의 영향을 받지 않는다.
+- import_seconds: 모듈별 import 시간 (각각 새 프로세스에서, 중앙값)
+- first_run_seconds: 새 프로세스에서 첫 스크립트 실행이 끝날 때까지의 시간 (첫 화면)
+- cold_start_seconds: streamlit import부터 첫 실행 종료까지의 시간
+- rerun_script_seconds: 같은 프로세스에서 이어지는 실행(기본 정보 입력 화면) 1회의 스크립트 시간
+- sdk_import_started_at_first_paint: 첫 실행이 끝난 시점에 모델 SDK import가 시작되었는지
+  (백그라운드 warm-up이 첫 실행과 겹쳐 시작되므로 첫 실행 시간에 SDK import가 포함되었는지는
+  first_run_seconds로 판단)
+
+기본값은 LLM_BACKEND=gemini로, GOOGLE_API_KEY가 없으면 더미 키를 쓴다
+(클라이언트 생성까지만 하고 모델 호출은 하지 않으므로 네트워크가 필요 없다).
+
+사용 예:
+    python benchmarks/bench_startup.py --repeat 5 --reruns 30 --output startup.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "app.py")
+
+# 앱이 불러오는 모듈 (streamlit은 비교 기준)
+MODULES = [
+    "streamlit",
+    "llm_backend",
+    "llm_cache",
+    "resilient_client",
+    "completeness",
+    "conversation_memory",
+    "retrieval",
+    "extraction",
+    "interview",
+    "polish",
+    "prefetch",
+    "question_packs",
+    "term_index",
+    "resume_graph",
+    "resume_render",
+    "session_journal",
+    "session_model",
+    "session_store",
+    "single_flight",
+    "telemetry",
+]
+
+SDK_MODULE = "google.generativeai"
+
+
+def summarize(values):
+    values = sorted(values)
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean": statistics.fmean(values),
+        "p50": values[len(values) // 2],
+        "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+        "max": values[-1],
+    }
+
+
+def child_env():
+    env = dict(os.environ)
+    env.setdefault("LLM_BACKEND", "gemini")
+    if env["LLM_BACKEND"] == "gemini":
+        env.setdefault("GOOGLE_API_KEY", "benchmark-dummy-key")
+    # 디스크 캐시/저널/지표 서버는 시작 시간과 무관하므로 끔
+    env.update(LLM_CACHE_PATH="", SESSION_JOURNAL_PATH="", SESSION_STORE_URL="", METRICS_PORT="", METRICS_FILE="")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+    return env
+
+
+def run_child(args):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), *args],
+        env=child_env(), cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def child_import(module):
+    start = time.perf_counter()
+    __import__(module)
+    print(json.dumps({"seconds": time.perf_counter() - start, "sdk_loaded": SDK_MODULE in sys.modules}))
+
+
+def child_app(reruns):
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+
+    streamlit_import = time.perf_counter() - start
+    # 스크립트 실행 1회의 시간은 AppTest의 대기 시간을 빼고 러너에서 직접 측정
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from bench_sessions import _install_runner
+
+    runner = _install_runner()
+    main_module = sys.modules.get("__main__")
+    at = AppTest.from_file(APP_PATH, default_timeout=60)
+    first_start = time.perf_counter()
+    at.run()
+    first_run = time.perf_counter() - first_start
+    sdk_loaded = SDK_MODULE in sys.modules
+    cold_start = time.perf_counter() - start
+    for _ in range(reruns):
+        at.run()
+    sys.modules["__main__"] = main_module
+    print(json.dumps({
+        "streamlit_import_seconds": streamlit_import,
+        "first_run_seconds": first_run,
+        "cold_start_seconds": cold_start,
+        "sdk_loaded_at_first_paint": sdk_loaded,
+        "rerun_script_seconds": runner.executions[-reruns:] if reruns else [],
+        "exceptions": [e.value for e in at.exception],
+    }))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="시작 시간 벤치마크")
+    parser.add_argument("--repeat", type=int, default=5, help="새 프로세스 측정 반복 횟수")
+    parser.add_argument("--reruns", type=int, default=30, help="프로세스당 이어지는 실행 횟수")
+    parser.add_argument("--output", help="결과 JSON 파일 경로 (생략 시 표준 출력)")
+    parser.add_argument("--child-import", help=argparse.SUPPRESS)
+    parser.add_argument("--child-app", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child_import:
+        return child_import(args.child_import)
+    if args.child_app:
+        return child_app(args.reruns)
+
+    imports = {}
+    for module in MODULES:
+        runs = [run_child(["--child-import", module]) for _ in range(args.repeat)]
+        imports[module] = {
+            "p50": summarize([run["seconds"] for run in runs])["p50"],
+            "loads_sdk": any(run["sdk_loaded"] for run in runs),
+        }
+
+    apps = [run_child(["--child-app", "--reruns", str(args.reruns)]) for _ in range(args.repeat)]
+    result = {
+        "benchmark": "startup",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "config": {"repeat": args.repeat, "reruns": args.reruns, "backend": child_env()["LLM_BACKEND"]},
+        "import_seconds": imports,
+        "streamlit_import_seconds": summarize([app["streamlit_import_seconds"] for app in apps]),
+        "first_run_seconds": summarize([app["first_run_seconds"] for app in apps]),
+        "cold_start_seconds": summarize([app["cold_start_seconds"] for app in apps]),
+        "sdk_import_started_at_first_paint": sum(app["sdk_loaded_at_first_paint"] for app in apps),
+        "rerun_script_seconds": summarize([seconds for app in apps for seconds in app["rerun_script_seconds"]]),
+        "exceptions": sorted({e for app in apps for e in app["exceptions"]}),
+    }
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
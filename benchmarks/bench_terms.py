@@ -0,0 +1,96 @@
+"""용어 탐지 벤치마크 - 사전 크기에 따른 메시지 1개당 탐지 시간
+
+data/tech_terms.json에 합성 용어를 더해 사전 크기를 늘려가며
+Aho-Corasick 인덱스(TermIndex.find)와 별칭마다 `in` 으로 검사하는 기존 방식을 비교한다.
+
+사용 예:
+    python benchmarks/bench_terms.py --sizes 1000 10000 50000 --output terms.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from term_index import DEFAULT_DICTIONARY_PATH, TermIndex, normalize  # noqa: E402
+
+MESSAGES = [
+    "ABC커머스에서 2021년 3월부터 백엔드 개발자로 일하면서 Java, 스프링부트, JPA로 주문 API를 만들었어요.",
+    "React와 타입스크립트로 어드민을 개발했고 k8s, ArgoCD로 배포 파이프라인을 구성했습니다.",
+    "사내 정산 자동화 프로젝트를 6개월 동안 리드했습니다. Kotlin, Spring Batch, MySQL, Redis를 사용했어요.",
+    "데이터 엔지니어로 Airflow와 Spark, BigQuery 기반 파이프라인을 운영했고 Python을 주로 씁니다.",
+]
+
+
+def load_terms():
+    with open(DEFAULT_DICTIONARY_PATH, encoding="utf-8") as f:
+        return json.load(f)["terms"]
+
+
+def synthetic_terms(base, size):
+    """기본 사전에 합성 용어를 더해 대표 이름 수를 size로 맞춤"""
+    terms = {category: dict(entries) for category, entries in base.items()}
+    count = sum(len(entries) for entries in terms.values())
+    tools = terms.setdefault("tool", {})
+    i = 0
+    while count < size:
+        tools[f"synthtool{i}"] = [f"합성도구{i}", f"synth-tool-{i}"]
+        count += 1
+        i += 1
+    return terms
+
+
+def naive_find(aliases, text):
+    lowered = normalize(text)[0]
+    return {name for alias, name in aliases if alias in lowered}
+
+
+def measure(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for message in MESSAGES:
+            fn(message)
+    return (time.perf_counter() - start) / (repeat * len(MESSAGES))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="용어 탐지 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 5000, 50000], help="사전 크기(대표 이름 수)")
+    parser.add_argument("--repeat", type=int, default=200, help="메시지별 반복 횟수")
+    parser.add_argument("--output", help="결과 JSON 파일 경로 (생략 시 표준 출력)")
+    args = parser.parse_args(argv)
+
+    base = load_terms()
+    results = []
+    for size in args.sizes:
+        terms = synthetic_terms(base, size)
+        start = time.perf_counter()
+        index = TermIndex(terms)
+        build_seconds = time.perf_counter() - start
+        aliases = [
+            (normalize(alias)[0], name)
+            for entries in terms.values()
+            for name, names in entries.items()
+            for alias in [name, *names]
+        ]
+        results.append({
+            "terms": index.term_count,
+            "patterns": index.pattern_count,
+            "build_seconds": build_seconds,
+            "automaton_seconds_per_message": measure(index.find, args.repeat),
+            "naive_seconds_per_message": measure(lambda text: naive_find(aliases, text), max(1, args.repeat // 10)),
+        })
+
+    text = json.dumps({"benchmark": "terms", "results": results}, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""로컬 답변 충실도 판정 - 모델 호출 없이 단계 필드가 답변에 들어 있는지 빠르게 확인
+
+필드마다 종류(kind)에 맞는 검출기를 쓴다. 종류는 질문 팩 필드의 detect 항목으로 정하고,
+없으면 필드 이름으로 추정한다 (infer_kind).
+- period: 날짜/기간 (2021.03, 2021년 3월, 2년, 6개월, 현재, 재직 중 ...)
+- metric: 수치 성과 (40%, 3배, 200ms, 1만 명 ...) - 수치 없이 '개선', '단축' 같은 말만 있으면 애매함
+- terms: 용어 사전의 기술/직무/분야 용어 (categories로 분류 지정) 또는 keywords 목록
+- org: 회사/조직 이름 패턴 ((주), OO사에서, 스타트업 ...)
+- project: 프로젝트 이름 패턴 (따옴표로 감싼 이름, OO 시스템/서비스/플랫폼 ...)
+- role: 직무/역할 (용어 사전의 직무, 개발자/엔지니어/담당/리드 ...)
+- text: 서술형 - 필드별 핵심어가 있으면 채워진 것으로, 없지만 답변이 길면 애매함으로 봄
+
+필드 점수는 1(채워짐), 0.5(애매함 - 모델이 판단), 0(비어 있음).
+- 모든 필드가 1이면 모델 호출 없이 단계 완료
+- 애매한 필드 없이 비어 있는 필드만 있으면 모델 호출 없이 그 필드를 묻는 질문
+- 애매한 필드가 있을 때만 모델로 필드를 추출
+검출기는 질문 팩을 컴파일할 때 한 번 만들고, 판정은 정규식과 용어 사전 조회 몇 번이다.
+"""
+import re
+
+from term_index import CATEGORY_LABELS, TECH_CATEGORIES
+
+KINDS = ("period", "metric", "terms", "org", "project", "role", "text")
+
+# 서술형 답변이 이 길이(공백 제외 글자 수) 이상이면 핵심어가 없어도 애매함으로 봄
+TEXT_MIN_CHARS = 20
+
+# 필드 이름 -> 종류 추정 (앞에서부터 처음 맞는 규칙)
+_KIND_RULES = (
+    (("기간",), "period"),
+    (("성과", "결과"), "metric"),
+    (("회사",), "org"),
+    (("프로젝트명",), "project"),
+    (("지원 직무", "직무", "역할"), "role"),
+    (("기술", "도구", *CATEGORY_LABELS.values()), "terms"),
+)
+
+_DATE = r"(?:19|20)\d{2}\s*(?:[.\-/]\s*\d{1,2}|년(?:\s*\d{1,2}\s*월)?)"
+_PERIOD_RE = re.compile(
+    rf"{_DATE}(?:\s*(?:~|-|–|부터)\s*(?:{_DATE}|현재))?"
+    r"|\d+(?:\.\d+)?\s*(?:년|개월|달|주)(?:\s*(?:간|동안|차|반))?"
+    r"|현재|재직\s*중|근무\s*중|진행\s*중"
+)
+_METRIC_RE = re.compile(
+    r"\d+(?:[.,]\d+)?\s*(?:%|퍼센트|배|건|명|만|억|천|원|초|ms|분|시간|개(?!월)|회|x\b|TPS|QPS|RPS|GB|TB|MB|점|위|등)",
+    re.IGNORECASE,
+)
+_RESULT_WORDS_RE = re.compile(r"개선|단축|감소|증가|절감|향상|달성|줄였|줄어|늘었|늘려|높였|낮췄|최적화|수상|선정")
+_ORG_RE = re.compile(
+    r"(?P<name>[가-힣A-Za-z0-9&]+)\s?에서\s?(?:\S+\s){0,8}?\S*(?:일했|일하|근무|재직|다녔|다니|있었|인턴)"
+    r"|㈜|\(주\)|주식회사|[가-힣A-Za-z0-9]+(?:사|회사|은행|전자|그룹|랩스?|테크|소프트|컴퍼니|스튜디오|코리아|증권|카드)에서"
+    r"|[A-Z][A-Za-z0-9&]+(?:\s[A-Z][A-Za-z0-9&]+)*\s?에서|스타트업|대기업|중견기업|공공기관|에이전시|SI\s?업체"
+)
+_PROJECT_RE = re.compile(
+    r"['\"“‘「『][^'\"”’」』\n]{2,40}['\"”’」』]"
+    r"|[가-힣A-Za-z0-9]+\s?(?:프로젝트|시스템|서비스|플랫폼|앱|어플|사이트|봇|대시보드|파이프라인|솔루션|API)"
+)
+_ROLE_RE = re.compile(r"개발자|엔지니어|담당|리드|매니저|PM|PO|기획자|디자이너|인턴|팀장|파트장|아키텍트|분석가|연구원")
+_SENTENCE_RE = re.compile(r"(?<=[.!?。])\s+|\n+")
+
+# 서술형 필드 이름 -> 핵심어 (이름에 들어 있는 말로 찾음, 맞는 것이 없으면 길이만 봄)
+_TEXT_KEYWORDS = (
+    (("업무",), r"개발|구축|운영|설계|담당|유지보수|구현|관리|분석|기획|개선|맡|작성|처리"),
+    (("스타일",), r"협업|소통|스타일|꼼꼼|주도|문서화|리뷰|공유|책임|성향|일하|팀워크|커뮤니케이션"),
+    (("포부", "커리어", "방향", "목표"), r"목표|포부|성장|되고\s*싶|앞으로|커리어|방향|꿈|도전|기여"),
+    (("자기소개",), r"저는|입니다|개발자|엔지니어|경력|년차"),
+)
+
+
+def _keyword_pattern(word):
+    """영문/숫자 핵심어는 다른 단어의 일부와 맞지 않도록 경계를 둠 (예: GA가 Gradle에 맞지 않게)"""
+    pattern = re.escape(word)
+    if word[:1].isascii() and word[:1].isalnum():
+        pattern = r"(?<![A-Za-z0-9])" + pattern
+    if word[-1:].isascii() and word[-1:].isalnum():
+        pattern += r"(?![A-Za-z0-9])"
+    return pattern
+
+
+def infer_kind(name):
+    for words, kind in _KIND_RULES:
+        if any(word in name for word in words):
+            return kind
+    return "text"
+
+
+def infer_categories(name, kind):
+    """terms 필드가 볼 용어 분류 - 이름이 분류 이름과 같으면 그 분류, 아니면 기술 분류 전체"""
+    if kind == "role":
+        return ("role",)
+    for category, label in CATEGORY_LABELS.items():
+        if label == name:
+            return (category,)
+    if "분야" in name:
+        return ("domain", *TECH_CATEGORIES)
+    return TECH_CATEGORIES
+
+
+class FieldDetector:
+    """필드 하나의 검출기 - 질문 팩 필드 정의({"name", "detect", "categories", "keywords"})로 만듦"""
+
+    __slots__ = ("name", "kind", "categories", "keywords", "text_re")
+
+    def __init__(self, name, kind=None, categories=None, keywords=None):
+        self.name = name
+        self.kind = kind or ("terms" if keywords else infer_kind(name))
+        self.categories = tuple(categories) if categories else infer_categories(name, self.kind)
+        self.keywords = re.compile("|".join(map(_keyword_pattern, keywords)), re.IGNORECASE) if keywords else None
+        pattern = next((words for keys, words in _TEXT_KEYWORDS if any(key in name for key in keys)), None)
+        self.text_re = re.compile(pattern) if pattern else None
+
+    @classmethod
+    def from_field(cls, field):
+        return cls(field["name"], field.get("detect"), field.get("categories"), field.get("keywords"))
+
+    def score(self, text, terms):
+        """(점수, 근거) - terms: 답변에서 찾은 {분류: [용어]}"""
+        kind = self.kind
+        if kind == "terms" or kind == "role":
+            # 직무/역할은 사용자가 쓴 표현(문장)을 근거로 남김
+            if kind == "role" and (match := _ROLE_RE.search(text)):
+                return 1.0, _sentence(text, match)
+            found = [name for category in self.categories for name in terms.get(category, ())]
+            if self.keywords is not None:
+                found += [match.group(0) for match in self.keywords.finditer(text)]
+            if found:
+                return 1.0, list(dict.fromkeys(found))
+            return 0.0, None
+        if kind == "period":
+            matches = [match.group(0) for match in _PERIOD_RE.finditer(text)]
+            return (1.0, ", ".join(dict.fromkeys(matches))) if matches else (0.0, None)
+        if kind == "metric":
+            match = _METRIC_RE.search(text)
+            if match:
+                return 1.0, _sentence(text, match)
+            return (0.5, None) if _RESULT_WORDS_RE.search(text) else (0.0, None)
+        pattern = {"org": _ORG_RE, "project": _PROJECT_RE}.get(kind, self.text_re)
+        match = pattern.search(text) if pattern is not None else None
+        if match:
+            if kind == "text":
+                return 1.0, _sentence(text, match)
+            return 1.0, (match.groupdict().get("name") or match.group(0)).removesuffix("에서").strip()
+        return (0.5, None) if len(re.sub(r"\s", "", text)) >= TEXT_MIN_CHARS else (0.0, None)
+
+
+def _sentence(text, match):
+    """match가 들어 있는 문장"""
+    start = 0
+    for boundary in _SENTENCE_RE.finditer(text):
+        if boundary.end() > match.start():
+            return text[start:boundary.start()].strip()
+        start = boundary.end()
+    return text[start:].strip()
+
+
+# 비어 있는 필드를 묻는 질문 (종류별, 없으면 호출 측의 기본 질문)
+KIND_QUESTIONS = {
+    "period": "언제부터 언제까지였는지 알려주실 수 있을까요? (예: 2021.03 ~ 2023.02)",
+    "metric": "그 결과를 숫자로 표현해 볼 수 있을까요? 예를 들어 응답 시간이 몇 % 줄었는지, 사용자가 몇 명 늘었는지처럼요.",
+    "terms": "{name} 관련해서 써보신 기술이나 도구가 있다면 알려주세요. 얼마나 익숙한지도 함께요!",
+    "org": "어느 회사(또는 조직)에서 일하셨는지 알려주실 수 있을까요?",
+    "project": "그 프로젝트의 이름을 알려주실 수 있을까요? 이력서에 제목으로 들어갈 거예요.",
+}
+
+
+def missing_question(detectors, name):
+    """비어 있는 필드 name을 묻는 질문 - 종류별 질문이 없으면 None"""
+    detector = next((detector for detector in detectors if detector.name == name), None)
+    template = KIND_QUESTIONS.get(detector.kind) if detector is not None else None
+    return template.format(name=name) if template else None
+
+
+class Assessment:
+    """단계 답변 판정 결과"""
+
+    __slots__ = ("scores", "evidence")
+
+    def __init__(self, scores, evidence):
+        self.scores = scores
+        self.evidence = evidence
+
+    @property
+    def missing(self):
+        return [name for name, score in self.scores.items() if score == 0.0]
+
+    @property
+    def ambiguous(self):
+        return [name for name, score in self.scores.items() if 0.0 < score < 1.0]
+
+    @property
+    def complete(self):
+        return all(score >= 1.0 for score in self.scores.values())
+
+    @property
+    def coverage(self):
+        return sum(self.scores.values()) / len(self.scores) if self.scores else 1.0
+
+
+def assess(detectors, answers, terms, known=None):
+    """단계 필드별 점수 - 이미 추출된 값(known)이 있는 필드는 1
+
+    - detectors: 질문 팩 단계의 FieldDetector 목록
+    - answers: 현재 단계의 사용자 답변들
+    - terms: 답변들에서 찾은 {분류: [용어]} (term_index.group)
+    """
+    text = "\n".join(answers)
+    known = known or {}
+    scores, evidence = {}, {}
+    for detector in detectors:
+        if known.get(detector.name):
+            scores[detector.name] = 1.0
+            continue
+        scores[detector.name], found = detector.score(text, terms)
+        if found:
+            evidence[detector.name] = found
+    return Assessment(scores, evidence)
@@ -0,0 +1,154 @@
+"""토큰 예산 기반 대화 메모리
+
+프롬프트에 들어가는 섹션별 토큰 수를 세고, 전체가 예산을 넘으면 현재 단계의
+오래된 대화부터 단계별 요약(rolling summary)으로 접어 넣는다. 요약은 매번 새로
+만들지 않고 "이전 요약 + 새로 접히는 대화"만으로 갱신한다.
+
+메모리 상태는 session_state에 저장되는 plain dict이다.
+    {
+        "step_starts": {단계: 해당 단계가 시작된 chat_history 인덱스},
+        "folded": {단계: 요약에 반영된 마지막 chat_history 인덱스},
+        "summaries": {단계: 요약 텍스트},
+        "last_prompt_tokens": {섹션명: 토큰 수},
+    }
+"""
+from llm_backend import estimate_tokens
+from session_model import Sender
+
+USER_SENDER = Sender.USER
+
+
+def truncate_tokens(text, max_tokens):
+    """대략 max_tokens 이내가 되도록 앞에서부터 자름"""
+    if not text or estimate_tokens(text) <= max_tokens:
+        return text
+    encoded = text.encode("utf-8")[: max_tokens * 4]
+    return encoded.decode("utf-8", errors="ignore").rstrip() + "…"
+
+
+def _first_sentence(text):
+    for mark in (". ", "? ", "! ", "다. ", "\n"):
+        index = text.find(mark)
+        if 0 < index:
+            return text[: index + len(mark)].strip()
+    return text.strip()
+
+
+def extractive_summary(previous, messages, max_tokens):
+    """모델 호출 없이 쓰는 기본 요약기 - 사용자 답변의 첫 문장을 이전 요약 뒤에 누적
+
+    예산을 넘으면 가장 오래된 줄부터 버린다.
+    """
+    lines = previous.splitlines() if previous else []
+    for sender, msg in messages:
+        if sender == USER_SENDER and msg:
+            lines.append(f"- {truncate_tokens(_first_sentence(msg), max(max_tokens // 4, 16))}")
+    while len(lines) > 1 and estimate_tokens("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    return truncate_tokens("\n".join(lines), max_tokens)
+
+
+class ConversationMemory:
+    """세션별 대화 메모리
+
+    - budget_tokens: 프롬프트 전체(고정 system instruction 제외)의 토큰 예산
+    - recent_messages: 요약하지 않고 항상 원문으로 남겨둘 최근 메시지 수
+    - field_tokens: 이력서 항목/메시지 하나가 프롬프트에서 차지할 수 있는 최대 토큰
+    - summary_tokens: 단계별 요약의 최대 토큰
+    - summarizer: (이전 요약, 새 메시지 목록, 최대 토큰) -> 갱신된 요약
+    - earlier_summaries: history 섹션에 이전 단계 요약을 넣을지 (세션 검색으로 관련 답변만
+      넣는 경우 False)
+    """
+
+    def __init__(self, state, budget_tokens=1500, recent_messages=4, field_tokens=200,
+                 summary_tokens=250, summarizer=None, earlier_summaries=True):
+        self.state = state
+        for key in ("step_starts", "folded", "summaries", "last_prompt_tokens"):
+            state.setdefault(key, {})
+        self.budget_tokens = budget_tokens
+        self.recent_messages = recent_messages
+        self.field_tokens = field_tokens
+        self.summary_tokens = summary_tokens
+        self.summarizer = summarizer or extractive_summary
+        self.earlier_summaries = earlier_summaries
+
+    def clip(self, text):
+        """이력서 항목처럼 계속 길어지는 값을 프롬프트용 길이로 자름"""
+        return truncate_tokens(text, self.field_tokens) if text else text
+
+    def start_step(self, step, history_len):
+        self.state["step_starts"][step] = history_len
+        self.state["folded"][step] = history_len
+
+    def _fold_start(self, step):
+        return self.state["folded"].get(step, self.state["step_starts"].get(step, 0))
+
+    def _fold(self, step, history, upto):
+        start = self._fold_start(step)
+        if upto <= start:
+            return
+        previous = self.state["summaries"].get(step, "")
+        self.state["summaries"][step] = self.summarizer(previous, history[start:upto], self.summary_tokens)
+        self.state["folded"][step] = upto
+
+    def close_step(self, step, history):
+        """단계가 끝나면 남은 대화를 모두 해당 단계 요약에 반영"""
+        self._fold(step, history, len(history))
+
+    def pending_fold(self, step, history):
+        """close_step이 요약기에 넘길 (이전 요약, 새 메시지 목록) - 넘길 메시지가 없으면 None"""
+        start = self._fold_start(step)
+        if len(history) <= start:
+            return None
+        return self.state["summaries"].get(step, ""), history[start:]
+
+    def _history_section(self, step, history):
+        earlier = [
+            f"[{s}단계] {summary}"
+            for s, summary in sorted(self.state["summaries"].items())
+            if s != step and summary
+        ] if self.earlier_summaries else []
+        current_summary = self.state["summaries"].get(step, "")
+        start = self._fold_start(step)
+        recent = [
+            f"{'사용자' if sender == USER_SENDER else '챗봇'}: {self.clip(msg)}"
+            for sender, msg in history[start:]
+        ]
+        parts = []
+        if earlier:
+            parts.append("이전 단계 요약:\n" + "\n".join(earlier))
+        if current_summary:
+            parts.append("이번 단계 요약:\n" + current_summary)
+        if recent:
+            parts.append("최근 대화:\n" + "\n".join(recent))
+        return "\n\n".join(parts)
+
+    def render(self, sections, history, step):
+        """섹션 목록[(이름, 텍스트)]을 예산 안에 맞춰 하나의 프롬프트로 합침
+
+        이름이 "history"인 섹션 자리에 요약 + 최근 대화가 들어간다.
+        """
+        fixed_tokens = sum(estimate_tokens(text) for name, text in sections if name != "history" and text)
+        history_budget = self.budget_tokens - fixed_tokens
+
+        history_text = self._history_section(step, history)
+        # 예산을 넘으면 현재 단계의 가장 오래된 메시지부터 요약으로 접음
+        while estimate_tokens(history_text) > history_budget:
+            start = self._fold_start(step)
+            if len(history) - start <= self.recent_messages:
+                break
+            self._fold(step, history, min(start + 2, len(history) - self.recent_messages))
+            history_text = self._history_section(step, history)
+        if estimate_tokens(history_text) > history_budget:
+            history_text = truncate_tokens(history_text, max(history_budget, self.field_tokens))
+
+        rendered = []
+        token_counts = {}
+        for name, text in sections:
+            if name == "history":
+                text = history_text
+            if text:
+                rendered.append(text)
+                token_counts[name] = estimate_tokens(text)
+        self.state["last_prompt_tokens"] = token_counts
+        return "\n\n".join(rendered)
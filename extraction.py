@@ -0,0 +1,114 @@
+"""단계별 필드 일괄 추출 - 한 번의 JSON 응답으로 단계의 모든 필드를 채운다
+
+질문 팩 단계의 (필드명, 설명) 목록으로 JSON 스키마를 만들고, 사용자의 답변들을
+한 번에 보내 모든 필드 값과 다음 질문을 함께 받는다.
+목록으로 받을 필드는 list_fields로 지정한다 (생략하면 기본 팩의 목록 필드).
+"""
+import json
+import re
+
+# 목록으로 받는 필드 (나머지는 문자열) - list_fields를 주지 않을 때의 기본값
+LIST_FIELDS = {"주로 다룬 기술", "관심 기술 분야", "사용 기술", "언어", "프레임워크", "DB/인프라", "기타 도구"}
+
+NEXT_QUESTION_KEY = "next_question"
+
+
+class ExtractionError(ValueError):
+    """모델 응답을 필드 값으로 해석할 수 없는 경우"""
+
+
+def build_schema(fields, list_fields=LIST_FIELDS):
+    """Gemini response_schema(OpenAPI 부분집합) 형식의 JSON 스키마"""
+    properties = {}
+    for name, description in fields:
+        if name in list_fields:
+            properties[name] = {"type": "array", "items": {"type": "string"}, "description": description}
+        else:
+            properties[name] = {"type": "string", "nullable": True, "description": description}
+    properties[NEXT_QUESTION_KEY] = {"type": "string", "description": "아직 채워지지 않은 필드를 묻는 다음 질문"}
+    return {"type": "object", "properties": properties}
+
+
+def build_prompt(topic_label, fields, answers, known=None, list_fields=LIST_FIELDS):
+    field_lines = "\n".join(
+        f"- {name} ({'문자열 목록' if name in list_fields else '문자열 또는 null'}): {description}"
+        for name, description in fields
+    )
+    answer_lines = "\n".join(f"{i}. {answer}" for i, answer in enumerate(answers, 1))
+    known_text = json.dumps(known, ensure_ascii=False) if known else "{}"
+    return f"""다음은 이력서 작성 인터뷰 중 '{topic_label}' 단계에서 사용자가 한 답변들입니다.
+답변에서 아래 필드의 값을 찾아 JSON 객체 하나로만 응답해주세요.
+
+필드:
+{field_lines}
+- {NEXT_QUESTION_KEY} (문자열): 아직 값이 없는 필드 중 가장 중요한 것을 묻는 친근한 질문 하나 (모두 채워졌다면 빈 문자열)
+
+규칙:
+- 답변에 없는 내용은 추측하지 말고 null(목록 필드는 빈 목록)로 두세요.
+- 이미 알고 있는 값: {known_text}
+- JSON 외의 설명은 쓰지 마세요.
+
+사용자 답변:
+{answer_lines}"""
+
+
+def _strip_code_fence(text):
+    text = text.strip()
+    match = re.match(r"^```(?:json)?\s*(.*?)\s*```$", text, re.DOTALL)
+    if match:
+        return match.group(1)
+    # 앞뒤에 설명이 붙은 경우 첫 번째 JSON 객체만 사용
+    start, end = text.find("{"), text.rfind("}")
+    return text[start : end + 1] if start != -1 and end > start else text
+
+
+def _normalize(name, value, list_fields=LIST_FIELDS):
+    if name in list_fields:
+        if isinstance(value, str):
+            value = [item.strip() for item in re.split(r"[,/\n·]", value)]
+        if not isinstance(value, list):
+            return []
+        return [str(item).strip() for item in value if item and str(item).strip()]
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value if value and value.lower() not in ("null", "none", "없음") else None
+
+
+def parse_response(text, fields, list_fields=LIST_FIELDS):
+    """모델 응답(JSON 텍스트)을 {필드명: 값}, 다음 질문으로 변환"""
+    try:
+        data = json.loads(_strip_code_fence(text))
+    except (TypeError, json.JSONDecodeError) as e:
+        raise ExtractionError(f"JSON 응답을 해석할 수 없습니다: {e}") from e
+    if not isinstance(data, dict):
+        raise ExtractionError("JSON 객체가 아닙니다")
+    values = {name: _normalize(name, data.get(name), list_fields) for name, _ in fields}
+    next_question = data.get(NEXT_QUESTION_KEY) or ""
+    return values, str(next_question).strip()
+
+
+def merge_values(known, extracted):
+    """새로 찾은 값만 덮어씀 (빈 값은 기존 값을 유지)"""
+    merged = dict(known or {})
+    for name, value in extracted.items():
+        if value:
+            merged[name] = value
+        else:
+            merged.setdefault(name, value)
+    return merged
+
+
+def missing_fields(values, fields):
+    return [name for name, _ in fields if not values.get(name)]
+
+
+def extract_fields(generate, topic_label, fields, answers, known=None, list_fields=LIST_FIELDS):
+    """generate(prompt, response_schema) -> 응답 텍스트 를 한 번 호출해 필드 값을 채움
+
+    반환값: (병합된 필드 값, 다음 질문)
+    """
+    prompt = build_prompt(topic_label, fields, answers, known, list_fields)
+    text = generate(prompt, build_schema(fields, list_fields))
+    extracted, next_question = parse_response(text, fields, list_fields)
+    return merge_values(known, extracted), next_question
@@ -0,0 +1,265 @@
+"""인터뷰 진행 로직 - Streamlit 화면과 배치 CLI가 함께 쓰는 답변 분석/정보 수집
+
+모든 함수는 세션 상태를 인자로 받는다. 상태는 st.session_state 또는 같은 키
+(step, chat_history, resume_data, question_count, collected_info, memory)를 가진 dict이다.
+모델 호출, 용어 인덱스, 대화 메모리도 인자로 받아 Streamlit 런타임 없이 동작한다.
+단계별 필드/질문은 직무별 질문 팩(question_packs)에서 가져온다.
+"""
+import os
+
+from completeness import assess, missing_question
+from conversation_memory import USER_SENDER
+from extraction import extract_fields, missing_fields
+from session_model import Sender
+
+BOT_SENDER = Sender.BOT
+
+# 단계 -> 주제
+STEP_TOPICS = {
+    2: "job_info",
+    3: "experience",
+    4: "projects",
+    5: "skills",
+    6: "summary"
+}
+
+# 한 단계에서 던질 수 있는 최대 질문 수 (필드가 다 채워지지 않아도 이후에는 단계 완료)
+MAX_QUESTIONS_PER_STEP = int(os.getenv("MAX_QUESTIONS_PER_STEP", "4"))
+
+# 로컬 충실도 판정 (completeness.py) - 0이면 답변마다 모델로 필드를 추출해 완료 여부를 정함
+LOCAL_COMPLETENESS = os.getenv("LOCAL_COMPLETENESS", "1") != "0"
+
+
+def fallback_question(step_pack, missing=None, asked=None):
+    """모델 없이 만드는 후속 질문 - 비어 있는 첫 필드를 묻고, 모르면 팩의 단계 질문(asked번째)이나 기본 질문
+
+    - step_pack: 질문 팩의 현재 단계 (question_packs.StepPack)
+    """
+    if missing:
+        return (missing_question(step_pack.detectors, missing[0])
+                or f"{missing[0]}에 대해 조금 더 자세히 알려주실 수 있을까요?")
+    if asked is not None and asked < len(step_pack.questions):
+        return step_pack.questions[asked]
+    return step_pack.followup
+
+
+def new_resume_data(basic_info=None):
+    return {
+        "basic_info": dict(basic_info or {}),
+        "job_info": {},
+        "experience": [],
+        "projects": [],
+        "skills": [],
+        "certificates": [],
+        "summary": "",
+        "structured": {},
+        "terms": {}
+    }
+
+
+def new_collected_info(pack):
+    return {topic: {name: False for name, _ in step.fields} for topic, step in pack.steps.items()}
+
+
+def session_pack(state, packs):
+    """지금까지 답변에서 찾은 직무로 고른 질문 팩 (직무를 모르면 default 팩)"""
+    return packs.for_roles(state["resume_data"].get("terms", {}).get("role"))
+
+
+# 사용자 답변에서 찾은 용어를 분류별로 누적 - 이번 답변의 {분류: [대표 이름]} 반환
+def record_terms(state, term_index, text):
+    found = term_index.group(text)
+    terms = state["resume_data"].setdefault("terms", {})
+    for category, names in found.items():
+        known = terms.setdefault(category, [])
+        known.extend(name for name in names if name not in known)
+    return found
+
+
+def analyze_response(state, user_input, topic, generate, term_index, memory, packs, followup=None, on_decision=None):
+    """사용자 응답을 분석하고 수집된 정보 상태를 업데이트
+
+    - state: 세션 상태 (st.session_state 또는 같은 키를 가진 dict)
+    - generate: (프롬프트, 응답 스키마) -> 응답 텍스트
+    - packs: 컴파일된 질문 팩 (question_packs.QuestionPacks) - 답변에서 찾은 직무의 팩을 사용
+    - followup: (이전 답변, 주제) -> 후속 질문 (없거나 실패하면 기본 질문 사용)
+      후속 질문 대신 텍스트 조각을 yield하는 이터러블을 돌려주면 그대로 반환해 호출한 쪽이 스트리밍함
+    - on_decision: (판정 방법) -> None - 계측용 콜백
+      (local_complete/local_question: 로컬 판정, model: 모델 추출, fallback: 추출 실패 시 규칙)
+
+    반환값: (단계 완료 여부, 후속 질문 또는 followup이 돌려준 이터러블)
+    """
+    # 기본 설정: 질문 카운터 초기화
+    question_count = state.setdefault("question_count", {})
+    question_count.setdefault(topic, 0)
+    resume_data = state["resume_data"]
+    
+    # 응답 저장 로직 - 현재 단계의 정보를 resume_data에 저장
+    if topic == "job_info":
+        # 직무 정보 저장
+        if "answer_" + str(question_count[topic]) not in resume_data["job_info"]:
+            resume_data["job_info"]["answer_" + str(question_count[topic])] = user_input
+    
+    elif topic == "experience":
+        # 경력 정보 저장
+        if not resume_data.get("experience"):
+            resume_data["experience"] = []
+        
+        if question_count[topic] == 0:
+            resume_data["experience"].append(user_input)
+        else:
+            # 마지막 경력 항목 업데이트
+            if resume_data["experience"]:
+                last_exp = resume_data["experience"][-1]
+                resume_data["experience"][-1] = f"{last_exp}\n추가 정보: {user_input}"
+            else:
+                resume_data["experience"].append(user_input)
+    
+    elif topic == "projects":
+        # 프로젝트 정보 저장
+        if not resume_data.get("projects"):
+            resume_data["projects"] = []
+        
+        if question_count[topic] == 0:
+            resume_data["projects"].append(user_input)
+        else:
+            # 마지막 프로젝트 항목 업데이트
+            if resume_data["projects"]:
+                last_proj = resume_data["projects"][-1]
+                resume_data["projects"][-1] = f"{last_proj}\n추가 정보: {user_input}"
+            else:
+                resume_data["projects"].append(user_input)
+    
+    elif topic == "skills":
+        # 기술 스택 정보 저장
+        if not resume_data.get("skills"):
+            resume_data["skills"] = []
+        
+        skill_entry = f"- {user_input}"
+        if skill_entry not in resume_data["skills"]:
+            resume_data["skills"].append(skill_entry)
+    
+    elif topic == "summary":
+        # 자기소개 정보 저장
+        if not resume_data.get("summary"):
+            resume_data["summary"] = []
+        
+        resume_data["summary"].append(user_input)
+    
+    # 답변에서 직무/기술 용어를 한 번에 찾아 누적
+    found_terms = record_terms(state, term_index, user_input)
+
+    # 직무가 정해지면 이번 답변부터 그 직무의 팩으로 필드를 추출하고 질문함
+    step_pack = session_pack(state, packs).step(topic)
+
+    # 직무 정보 특별 처리 - 직무명이 포함된 답변은 직무로 저장 (질문 횟수에는 포함하지 않음)
+    title_followup = None
+    if topic == "job_info":
+        if found_terms.get("role"):
+            resume_data["job_info"]["title"] = user_input
+            if step_pack.title_followup:
+                title_followup = step_pack.title_followup.format(title=user_input)
+    if title_followup is None:
+        question_count[topic] += 1
+
+    def decided(source):
+        if on_decision is not None:
+            on_decision(source)
+
+    # 로컬 판정 - 모든 필드가 채워졌거나 비어 있는 필드만 있으면(애매한 필드 없음) 모델을 부르지 않음
+    assessment = assess_step(state, step_pack, term_index, memory)
+    if LOCAL_COMPLETENESS and assessment is not None and not assessment.ambiguous:
+        apply_assessment(state, step_pack, assessment)
+        if assessment.complete or question_count[topic] >= MAX_QUESTIONS_PER_STEP:
+            decided("local_complete")
+            return True, ""
+        decided("local_question")
+        return False, title_followup or fallback_question(step_pack, assessment.missing)
+
+    # 애매한 필드가 있으면 단계의 모든 필드를 한 번의 모델 호출로 추출하고, 남은 빈 필드로 후속 질문 결정
+    extraction = extract_step_fields(state, step_pack, generate, memory)
+    if extraction is not None:
+        decided("model")
+        missing, next_question = extraction
+        if not missing or question_count[topic] >= MAX_QUESTIONS_PER_STEP:
+            return True, ""
+        if next_question:
+            return False, next_question
+        if title_followup:
+            return False, title_followup
+        if followup is not None:
+            try:
+                return False, followup(user_input, topic)
+            except Exception:
+                pass
+        return False, fallback_question(step_pack, missing)
+
+    # 추출에 실패한 경우 규칙 기반 처리: 로컬 판정으로 비어 있는 필드가 없거나 2번의 질문-응답 후 다음 단계로 이동
+    decided("fallback")
+    missing = assessment.missing if assessment is not None else None
+    if assessment is not None:
+        apply_assessment(state, step_pack, assessment)
+    if title_followup:
+        return False, title_followup
+    if question_count[topic] >= 2 or (assessment is not None and not missing):
+        return True, ""
+
+    # 비어 있는 필드를 묻고, 모르면 팩의 단계 질문을 순서대로 사용
+    return False, fallback_question(step_pack, missing, asked=question_count[topic])
+
+
+# 현재 단계에서 사용자가 한 답변들
+def current_step_answers(state, memory):
+    start = memory.state["step_starts"].get(state["step"], 0)
+    return [memory.clip(msg) for sender, msg in state["chat_history"][start:] if sender == USER_SENDER]
+
+
+# 현재 단계 답변의 로컬 판정 (답변이 없으면 None) - 이미 추출된 필드는 채워진 것으로 봄
+def assess_step(state, step_pack, term_index, memory):
+    answers = current_step_answers(state, memory)
+    if not answers:
+        return None
+    known = state["resume_data"].get("structured", {}).get(step_pack.topic)
+    return assess(step_pack.detectors, answers, term_index.group("\n".join(answers)), known)
+
+
+# 로컬 판정 결과 반영 - 비어 있는 필드만 근거(찾은 용어/문장)로 채우고 collected_info를 갱신
+def apply_assessment(state, step_pack, assessment):
+    values = state["resume_data"].setdefault("structured", {}).setdefault(step_pack.topic, {})
+    for name, found in assessment.evidence.items():
+        if values.get(name):
+            continue
+        if name in step_pack.list_fields:
+            values[name] = found if isinstance(found, list) else [found]
+        else:
+            values[name] = ", ".join(found) if isinstance(found, list) else found
+    state["collected_info"][step_pack.topic] = {
+        name: bool(values.get(name)) or assessment.scores.get(name, 0.0) >= 1.0 for name, _ in step_pack.fields
+    }
+
+
+# 단계 필드 일괄 추출 - collected_info와 resume_data["structured"]를 갱신
+# 반환값: (아직 비어 있는 필드 목록, 다음 질문), 추출하지 못하면 None
+def extract_step_fields(state, step_pack, generate, memory):
+    topic, fields = step_pack.topic, step_pack.fields
+    answers = current_step_answers(state, memory)
+    if not answers:
+        return None
+
+    structured = state["resume_data"].setdefault("structured", {})
+    try:
+        values, next_question = extract_fields(
+            generate,
+            step_pack.label,
+            fields,
+            answers,
+            known=structured.get(topic),
+            list_fields=step_pack.list_fields,
+        )
+    except Exception:
+        return None
+
+    structured[topic] = values
+    # 단계 도중에 직무 팩이 바뀌었을 수 있으므로 현재 팩의 필드로 다시 채움
+    state["collected_info"][topic] = {name: bool(values.get(name)) for name, _ in fields}
+    return missing_fields(values, fields), next_question
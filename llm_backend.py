@@ -0,0 +1,287 @@
+"""LLM 백엔드 추상화 - 앱의 모든 모델 호출은 이 인터페이스를 거친다
+
+LLM_BACKEND 환경변수로 백엔드를 선택한다.
+- gemini (기본값): Google Gemini API
+- stub: 네트워크 없이 동작하는 결정적 응답 (프로파일링/부하 테스트용)
+
+google.generativeai는 import에만 0.5초 이상 걸리므로 모듈 상단에서 불러오지 않고,
+첫 모델 호출이나 warm_up()(앱 시작 시 백그라운드 스레드)에서 불러온다.
+"""
+import hashlib
+import inspect
+import json
+import os
+import random
+import threading
+import time
+
+
+class BackendConfigError(RuntimeError):
+    """백엔드 설정이 잘못되었거나 필요한 값이 없는 경우"""
+
+
+def estimate_tokens(text):
+    """토크나이저 없이 쓰는 대략적인 토큰 수 (UTF-8 4바이트당 1토큰, 한글은 약 0.75토큰/글자)"""
+    if not text:
+        return 0
+    return max(1, len(text.encode("utf-8")) // 4)
+
+
+class LLMBackend:
+    """모델 백엔드 공통 인터페이스
+
+    system_instruction은 모든 사용자/턴에 공통인 고정 프롬프트(페르소나, 규칙 등)로,
+    백엔드가 지원하면 지시문이 설정된 모델을 재사용한다.
+    usage의 input_tokens는 지시문을 포함한 전체 입력이고, cached_input_tokens는 그중
+    컨텍스트 캐시로 처리된 입력만 센다 (캐시를 쓰지 않는 백엔드는 0).
+    response_schema가 주어지면 해당 JSON 스키마를 따르는 JSON 텍스트를 반환한다.
+    """
+
+    name = "base"
+    model_name = "base"
+
+    def __init__(self):
+        self._usage_lock = threading.Lock()
+        self.usage = {"calls": 0, "input_tokens": 0, "cached_input_tokens": 0}
+
+    def _record_usage(self, input_tokens, cached_input_tokens=0):
+        with self._usage_lock:
+            self.usage["calls"] += 1
+            self.usage["input_tokens"] += input_tokens
+            self.usage["cached_input_tokens"] += cached_input_tokens
+
+    def generate(self, prompt, system_instruction=None, response_schema=None):
+        """전체 응답 텍스트를 반환"""
+        raise NotImplementedError
+
+    def stream(self, prompt, system_instruction=None):
+        """응답을 텍스트 조각 단위로 yield (기본 구현은 한 번에 반환)"""
+        yield self.generate(prompt, system_instruction=system_instruction)
+
+    def warm_up(self):
+        """첫 호출 전에 무거운 초기화(SDK import, 클라이언트 생성)를 미리 수행"""
+
+    def warm_up_in_background(self):
+        """warm_up을 백그라운드 스레드에서 실행 - 실패해도 첫 호출에서 다시 시도하므로 무시"""
+
+        def run():
+            try:
+                self.warm_up()
+            except Exception:
+                pass
+
+        thread = threading.Thread(target=run, name="backend-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+
+class GeminiBackend(LLMBackend):
+    name = "gemini"
+
+    def __init__(self, api_key, model_name="gemini-1.5-pro"):
+        super().__init__()
+        if not api_key:
+            raise BackendConfigError("GOOGLE_API_KEY가 설정되지 않았습니다. .env 파일을 확인해주세요.")
+        self.api_key = api_key
+        self.model_name = model_name
+        self._genai = None
+        self._model = None
+        self._instruction_models = {}
+        self._lock = threading.Lock()
+
+    def _client(self):
+        """SDK를 불러와 기본 모델을 만든다 (프로세스당 한 번)"""
+        if self._genai is None:
+            with self._lock:
+                if self._genai is None:
+                    import google.generativeai as genai
+
+                    genai.configure(api_key=self.api_key)
+                    # system_instruction, response_schema는 google-generativeai 0.5 이상에서 지원
+                    self.supports_system_instruction = "system_instruction" in inspect.signature(genai.GenerativeModel).parameters
+                    self.supports_response_schema = "response_schema" in inspect.signature(genai.GenerationConfig).parameters
+                    self._model = genai.GenerativeModel(self.model_name)
+                    self._genai = genai
+        return self._genai
+
+    def warm_up(self):
+        self._client()
+
+    def _prepare(self, prompt, system_instruction):
+        """system_instruction을 지원하면 해당 지시문이 설정된 모델을 재사용하고,
+        지원하지 않으면 프롬프트 앞에 붙여 보냄
+
+        어느 쪽이든 지시문은 매 호출 입력으로 과금되므로(컨텍스트 캐시를 만들지 않음) 캐시된
+        입력 토큰으로 세지 않는다."""
+        genai = self._client()
+        if not system_instruction:
+            self._record_usage(estimate_tokens(prompt))
+            return self._model, prompt
+        if not self.supports_system_instruction:
+            contents = f"{system_instruction}\n\n{prompt}"
+            self._record_usage(estimate_tokens(contents))
+            return self._model, contents
+        with self._lock:
+            model = self._instruction_models.get(system_instruction)
+            if model is None:
+                model = genai.GenerativeModel(self.model_name, system_instruction=system_instruction)
+                self._instruction_models[system_instruction] = model
+        self._record_usage(estimate_tokens(prompt) + estimate_tokens(system_instruction))
+        return model, prompt
+
+    def generate(self, prompt, system_instruction=None, response_schema=None):
+        model, contents = self._prepare(prompt, system_instruction)
+        if response_schema is None:
+            return model.generate_content(contents).text
+        # 스키마를 지원하지 않는 SDK에서는 프롬프트의 JSON 지시에만 의존
+        generation_config = None
+        if self.supports_response_schema:
+            generation_config = self._genai.GenerationConfig(
+                response_mime_type="application/json",
+                response_schema=response_schema,
+            )
+        return model.generate_content(contents, generation_config=generation_config).text
+
+    def stream(self, prompt, system_instruction=None):
+        model, contents = self._prepare(prompt, system_instruction)
+        for chunk in model.generate_content(contents, stream=True):
+            if chunk.text:
+                yield chunk.text
+
+
+# 스텁 응답에 사용할 문장들
+_STUB_SENTENCES = [
+    "말씀해주신 내용 잘 들었어요.",
+    "그 경험에서 가장 기억에 남는 부분은 무엇이었나요?",
+    "사용하신 기술 스택을 조금 더 구체적으로 알려주실 수 있을까요?",
+    "그 과정에서 맡으셨던 역할이 궁금해요.",
+    "수치로 표현할 수 있는 성과가 있었다면 함께 이야기해볼까요?",
+    "팀 안에서는 어떤 방식으로 협업하셨나요?",
+]
+
+
+class StubBackend(LLMBackend):
+    """프롬프트에 따라 항상 같은 응답을 돌려주는 오프라인 백엔드
+
+    - latency: 전체 응답 시간(초), ttft: 첫 조각까지의 시간(초, 기본값은 latency의 30%)
+    - length: 응답 길이(글자 수), chunk_size: 스트리밍 조각 크기(글자 수)
+    - step_complete_rate: 응답 끝에 STEP_COMPLETE 신호를 붙일 비율 (프롬프트 해시로 결정)
+    - json_fill_rate: response_schema 요청 시 값을 채워 돌려줄 필드 비율 (프롬프트 해시로 결정)
+    - prefill_per_1k_tokens: 캐시되지 않은 입력 1000토큰당 추가 지연(초)
+      system_instruction은 처음 본 것만 비용을 내고 이후에는 캐시된 것으로 취급
+      (provider 측 system instruction / context cache 동작을 흉내냄)
+    - error_rate: 호출이 일시 오류(ConnectionError)로 실패할 확률 (재시도/서킷 브레이커 시험용)
+    - slow_rate, slow_factor: 호출이 slow_factor배 느려질 확률과 배수 (꼬리 지연/헤지 시험용)
+    """
+
+    name = "stub"
+
+    def __init__(self, latency=0.2, ttft=None, length=120, chunk_size=12, step_complete_rate=0.3,
+                 json_fill_rate=0.6, prefill_per_1k_tokens=0.0, error_rate=0.0, slow_rate=0.0, slow_factor=10.0):
+        super().__init__()
+        self.model_name = "stub"
+        self.latency = latency
+        self.ttft = latency * 0.3 if ttft is None else ttft
+        self.length = length
+        self.chunk_size = max(1, chunk_size)
+        self.step_complete_rate = step_complete_rate
+        self.json_fill_rate = json_fill_rate
+        self.prefill_per_1k_tokens = prefill_per_1k_tokens
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_factor = slow_factor
+        self._random = random.Random()
+        self._cached_instructions = set()
+        self._lock = threading.Lock()
+
+    def _prefill_delay(self, prompt, system_instruction):
+        uncached = estimate_tokens(prompt)
+        cached = 0
+        if system_instruction:
+            instruction_tokens = estimate_tokens(system_instruction)
+            with self._lock:
+                seen = system_instruction in self._cached_instructions
+                self._cached_instructions.add(system_instruction)
+            if seen:
+                cached = instruction_tokens
+            else:
+                uncached += instruction_tokens
+        self._record_usage(uncached + cached, cached)
+        return uncached / 1000 * self.prefill_per_1k_tokens
+
+    def _fault(self):
+        """오류를 낼지 결정하고 지연 배수를 반환"""
+        if self._random.random() < self.error_rate:
+            raise ConnectionError("스텁 백엔드 일시 오류")
+        return self.slow_factor if self._random.random() < self.slow_rate else 1.0
+
+    def _digest(self, prompt):
+        return hashlib.sha256(prompt.encode("utf-8")).digest()
+
+    def _text(self, prompt):
+        digest = self._digest(prompt)
+        sentences = []
+        i = 0
+        while len(" ".join(sentences)) < self.length:
+            sentences.append(_STUB_SENTENCES[digest[i % len(digest)] % len(_STUB_SENTENCES)])
+            i += 1
+        text = " ".join(sentences)[: self.length]
+        if digest[-1] / 255 < self.step_complete_rate:
+            text += " STEP_COMPLETE"
+        return text
+
+    def _json(self, prompt, schema):
+        digest = self._digest(prompt)
+        data = {}
+        for i, (name, spec) in enumerate(schema.get("properties", {}).items()):
+            filled = digest[i % len(digest)] / 255 < self.json_fill_rate
+            if spec.get("type") == "array":
+                data[name] = [f"{name} 예시"] if filled else []
+            else:
+                data[name] = f"{name} 예시" if filled else None
+        if "next_question" in data:
+            data["next_question"] = self._text(prompt).replace(" STEP_COMPLETE", "")
+        return json.dumps(data, ensure_ascii=False)
+
+    def generate(self, prompt, system_instruction=None, response_schema=None):
+        slow = self._fault()
+        time.sleep(self.latency * slow + self._prefill_delay(prompt, system_instruction))
+        if response_schema is not None:
+            return self._json(prompt, response_schema)
+        return self._text(prompt)
+
+    def stream(self, prompt, system_instruction=None):
+        text = self._text(prompt)
+        chunks = [text[i : i + self.chunk_size] for i in range(0, len(text), self.chunk_size)]
+        slow = self._fault()
+        time.sleep(self.ttft * slow + self._prefill_delay(prompt, system_instruction))
+        rest = (self.latency - self.ttft) / max(len(chunks) - 1, 1)
+        for i, chunk in enumerate(chunks):
+            if i:
+                time.sleep(rest)
+            yield chunk
+
+
+def create_backend(name=None, api_key=None):
+    """환경변수 설정에 맞는 백엔드를 생성"""
+    name = (name or os.getenv("LLM_BACKEND", "gemini")).lower()
+    if name == "gemini":
+        return GeminiBackend(
+            api_key=api_key or os.getenv("GOOGLE_API_KEY"),
+            model_name=os.getenv("GEMINI_MODEL", "gemini-1.5-pro"),
+        )
+    if name == "stub":
+        ttft = os.getenv("STUB_TTFT")
+        return StubBackend(
+            latency=float(os.getenv("STUB_LATENCY", "0.2")),
+            ttft=float(ttft) if ttft else None,
+            length=int(os.getenv("STUB_LENGTH", "120")),
+            chunk_size=int(os.getenv("STUB_CHUNK_SIZE", "12")),
+            step_complete_rate=float(os.getenv("STUB_STEP_COMPLETE_RATE", "0.3")),
+            json_fill_rate=float(os.getenv("STUB_JSON_FILL_RATE", "0.6")),
+            prefill_per_1k_tokens=float(os.getenv("STUB_PREFILL_PER_1K_TOKENS", "0")),
+            error_rate=float(os.getenv("STUB_ERROR_RATE", "0")),
+            slow_rate=float(os.getenv("STUB_SLOW_RATE", "0")),
+            slow_factor=float(os.getenv("STUB_SLOW_FACTOR", "10")),
+        )
+    raise BackendConfigError(f"알 수 없는 LLM_BACKEND입니다: {name}")
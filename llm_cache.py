@@ -0,0 +1,153 @@
+"""LLM 응답 캐시 - 메모리 LRU 계층 + SQLite 디스크 계층"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_prompt(prompt):
+    """들여쓰기/공백 차이로 같은 프롬프트가 다른 키가 되지 않도록 정규화"""
+    lines = (" ".join(line.split()) for line in prompt.strip().splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def make_cache_key(prompt, model_name, generation_config=None):
+    """정규화된 프롬프트 + 모델명 + 생성 설정으로 캐시 키 생성"""
+    payload = json.dumps(
+        {
+            "prompt": normalize_prompt(prompt),
+            "model": model_name,
+            "config": generation_config or {},
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """프로세스 내 LRU와 디스크(SQLite)를 함께 쓰는 응답 캐시
+
+    - 메모리 계층: 최근 사용한 max_memory_items개를 유지
+    - 디스크 계층: 재시작 후에도 유지, max_disk_items를 넘으면 오래 안 쓴 항목부터 삭제
+    - ttl(초)이 지난 항목은 두 계층 모두에서 만료 처리
+    """
+
+    def __init__(self, path=None, max_memory_items=256, max_disk_items=10000, ttl=24 * 60 * 60):
+        self.path = path
+        self.max_memory_items = max_memory_items
+        self.max_disk_items = max_disk_items
+        self.ttl = ttl
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        self._conn = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+            self._conn.commit()
+
+    def _expired(self, created_at, now):
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if not self._expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self._counters["hits"] += 1
+                    self._counters["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, created_at = row
+                    if not self._expired(created_at, now):
+                        self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                        self._conn.commit()
+                        self._remember(key, value, created_at)
+                        self._counters["hits"] += 1
+                        self._counters["disk_hits"] += 1
+                        return value
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+
+            self._counters["misses"] += 1
+            return None
+
+    def set(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, value, now, now),
+                )
+                self._evict_disk(now)
+                self._conn.commit()
+
+    def _remember(self, key, value, created_at):
+        # 호출 측에서 lock을 잡고 있어야 함
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _evict_disk(self, now):
+        # 만료 항목 삭제 후, 용량 초과분은 오래 안 쓴 순서로 삭제
+        if self.ttl is not None:
+            cursor = self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+            self._counters["evictions"] += max(cursor.rowcount, 0)
+        count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        overflow = count - self.max_disk_items
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                (overflow,),
+            )
+            self._counters["evictions"] += overflow
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM responses")
+                self._conn.commit()
+
+    def stats(self):
+        """적중/미스 카운터와 현재 크기 반환"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_items"] = len(self._memory)
+            if self._conn is not None:
+                stats["disk_items"] = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+            return stats
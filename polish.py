@@ -0,0 +1,195 @@
+"""이력서 문장 다듬기 - 인터뷰 답변을 섹션별로 이력서에 넣을 문장(STAR 글머리표, 수치 성과)으로 바꿈
+
+섹션(자기소개/경력/프로젝트/기술 스택)마다 모델을 한 번씩 호출하고, 호출은 프로세스가 공유하는
+스레드 풀에서 동시에 실행한다. 호출 측은 끝나는 순서대로 결과를 받아 바로 표시하므로
+전체 대기 시간은 섹션 시간의 합이 아니라 가장 느린 섹션 하나의 시간에 가깝다.
+
+결과는 섹션이 의존하는 원본 섹션들의 버전(resume_graph.artifact_key)과 모델을 키로 LRU에 보관한다.
+- 의존하는 섹션이 바뀌지 않았으면 다시 다듬지 않는다 (예: 프로젝트를 고쳐도 경력은 그대로,
+  자기소개는 경력을 참고하므로 경력을 고치면 자기소개도 다시 다듬음)
+- 같은 섹션을 여러 실행/세션이 동시에 요청하면 실행 중인 호출 하나를 함께 기다린다
+- 실패한 호출은 보관하지 않으므로 다음 요청에서 다시 시도한다
+
+이 모듈은 Streamlit에 의존하지 않는다 (워커 스레드에서 st.*를 호출하지 않도록
+모델 호출 함수는 호출 측이 넘긴다).
+"""
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from resume_graph import artifact_key
+from term_index import CATEGORY_LABELS, TECH_CATEGORIES
+
+# 프롬프트를 바꾸면 올려서 이전 결과를 쓰지 않도록 함
+PROMPT_VERSION = 1
+
+# 섹션 -> (표시 이름, 작성 지침)
+SECTIONS = {
+    "summary": (
+        "자기소개",
+        "3~4문장의 자기소개 문단으로 작성하세요. 글머리표 없이 문단 하나로 쓰고, "
+        "지원 직무와 관련된 강점과 대표 성과를 앞에 두세요.",
+    ),
+    "experience": (
+        "경력",
+        "회사/역할마다 첫 줄에 '회사명 | 역할 | 기간'(모르는 항목은 생략)을 쓰고, 아래에 성과를 "
+        "'- '로 시작하는 글머리표로 쓰세요. 각 글머리표는 STAR(상황-과제-행동-결과) 흐름의 한 문장으로, "
+        "'~ 구축', '~ 개선'처럼 명사형으로 끝내고 결과 수치가 있으면 반드시 포함하세요.",
+    ),
+    "projects": (
+        "프로젝트",
+        "프로젝트마다 첫 줄에 '프로젝트명 (기간)'을 쓰고, 아래에 역할, 사용 기술, 성과를 "
+        "'- '로 시작하는 글머리표로 쓰세요. 성과는 STAR 흐름의 한 문장으로, 수치가 있으면 포함하세요.",
+    ),
+    "skills": (
+        "기술 스택",
+        "분류(언어, 프레임워크, DB/인프라, 도구 등)마다 '- 분류: 기술1, 기술2' 형식의 한 줄로 쓰세요. "
+        "숙련도나 사용 기간이 언급된 기술은 괄호로 덧붙이세요.",
+    ),
+}
+
+POLISH_SYSTEM_PROMPT = (
+    "당신은 IT 직무 이력서 첨삭 전문가입니다. 지원자의 답변을 이력서에 그대로 넣을 수 있는 "
+    "간결한 문장으로 다듬습니다. 답변에 없는 회사, 기간, 수치, 기술은 절대 만들어내지 않습니다."
+)
+
+_FENCE_RE = re.compile(r"^```[a-zA-Z]*\n?|\n?```$")
+
+
+def section_source(data, section):
+    """다듬을 원래 내용 - 섹션의 답변과 추출된 필드 (답변이 없으면 빈 문자열)"""
+    value = data.get(section) or []
+    answers = [value] if isinstance(value, str) else [text for text in value if text]
+    if not answers:
+        return ""
+    lines = list(answers)
+    fields = data.get("structured", {}).get(section) or {}
+    extracted = [
+        f"- {name}: {', '.join(value) if isinstance(value, list) else value}"
+        for name, value in fields.items() if value
+    ]
+    if extracted:
+        lines += ["", "[추출된 정보]", *extracted]
+    if section == "skills":
+        terms = data.get("terms", {})
+        mentioned = [f"- {CATEGORY_LABELS[category]}: {', '.join(terms[category])}"
+                     for category in TECH_CATEGORIES if terms.get(category)]
+        if mentioned:
+            lines += ["", "[대화에서 언급된 기술]", *mentioned]
+    return "\n".join(lines)
+
+
+def polish_prompt(section, data):
+    """섹션 다듬기 프롬프트 - 내용이 없으면 None (resume_graph의 polish.* 의존성과 같은 값만 사용)"""
+    source = section_source(data, section)
+    if not source:
+        return None
+    label, instruction = SECTIONS[section]
+    parts = [f"다음은 지원자가 인터뷰에서 답한 '{label}' 내용입니다. 이력서용 문장으로 다듬어주세요."]
+    job_title = data.get("job_info", {}).get("title")
+    if job_title:
+        parts.append(f"지원 직무: {job_title}")
+    if section == "summary":
+        experience = section_source(data, "experience")
+        if experience:
+            parts += ["", "[참고: 경력 답변 - 대표 성과를 고를 때만 참고]", experience]
+    parts += [
+        "",
+        "규칙:",
+        f"- {instruction}",
+        "- 답변에 없는 내용은 추가하지 말고, 답변에 있는 수치(기간, 인원, 개선율 등)는 빠짐없이 살리세요.",
+        "- 굵은 글씨 등 다른 마크다운이나 설명 문구 없이 결과만 출력하세요.",
+        "",
+        "[답변]",
+        source,
+    ]
+    return "\n".join(parts)
+
+
+def clean_output(text):
+    """모델 출력 정리 - 코드 블록 표시와 앞뒤 공백 제거"""
+    return _FENCE_RE.sub("", (text or "").strip()).strip()
+
+
+def polish_key(section, data, model):
+    payload = json.dumps([PROMPT_VERSION, artifact_key(f"polish.{section}", data), model])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SectionPolisher:
+    """섹션별 다듬기 결과 LRU + 동시 실행 풀 (모든 세션이 공유, 스레드 안전)
+
+    - max_workers: 동시에 실행할 모델 호출 수
+    - max_items: 보관할 결과 수 (실행 중인 호출은 내보내지 않음)
+    """
+
+    def __init__(self, max_workers=4, max_items=256):
+        self.max_items = max_items
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="polish")
+        self._lock = threading.Lock()
+        self._memo = OrderedDict()  # 키 -> future
+        self._counters = {"hits": 0, "misses": 0, "errors": 0, "evictions": 0}
+
+    def submit(self, section, data, generate, model=""):
+        """섹션 다듬기 시작 - 같은 키의 결과(또는 실행 중인 호출)가 있으면 그 future를 돌려줌
+
+        generate: 프롬프트 -> 모델 출력 (워커 스레드에서 호출)
+        """
+        key = polish_key(section, data, model)
+        with self._lock:
+            future = self._memo.get(key)
+            if future is not None:
+                self._memo.move_to_end(key)
+                self._counters["hits"] += 1
+                return future
+            prompt = polish_prompt(section, data)
+            future = self._executor.submit(lambda: clean_output(generate(prompt)))
+            self._counters["misses"] += 1
+            self._memo[key] = future
+            self._evict()
+        future.add_done_callback(lambda done: self._forget_failed(key, done))
+        return future
+
+    def _evict(self):
+        """오래된 완료 결과부터 내보냄 (잠금을 잡은 상태에서 호출)"""
+        excess = len(self._memo) - self.max_items
+        for key in [key for key, future in self._memo.items() if future.done()][:max(0, excess)]:
+            del self._memo[key]
+            self._counters["evictions"] += 1
+
+    def _forget_failed(self, key, future):
+        if future.cancelled() or future.exception() is not None:
+            with self._lock:
+                if self._memo.get(key) is future:
+                    del self._memo[key]
+                self._counters["errors"] += 1
+
+    def start(self, data, generate, sections=None, model=""):
+        """내용이 있는 섹션의 다듬기를 모두 시작하고 기다리지 않음 - {future: 섹션}"""
+        futures = {}
+        for section in sections or SECTIONS:
+            if section_source(data, section):
+                futures[self.submit(section, data, generate, model)] = section
+        return futures
+
+    def polish(self, data, generate, sections=None, model=""):
+        """resume_data의 섹션들을 동시에 다듬고 끝나는 순서대로 (섹션, 결과, 오류)를 내보냄
+
+        내용이 없는 섹션은 건너뛴다. 실패한 섹션은 결과 None과 오류를 내보낸다.
+        """
+        futures = self.start(data, generate, sections, model)
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["items"] = len(self._memo)
+            stats["running"] = sum(not future.done() for future in self._memo.values())
+            return stats
@@ -0,0 +1,132 @@
+"""추측 실행(speculative prefetch) - 사용자가 읽고 고르는 동안 다음 모델 응답을 미리 생성
+
+세션이 곧 보낼 가능성이 높은 요청(예: 단계 완료 확인 화면에서 "아니요"를 누르면 보낼 추가
+질문 프롬프트)을 백그라운드 스레드 풀에서 미리 실행하고 (세션, 요청 키)로 보관한다.
+- take(): 실제 요청이 예측과 같으면(hit) 결과를 돌려준다. 아직 실행 중이면 끝날 때까지 기다린다.
+  세션에 남은 다른 예측은 빗나간 것이므로(miss) 버린다
+- discard(): 새 답변 입력처럼 상태가 바뀌어 예측이 쓸모없어진 경우
+- ttl초가 지난 예측은 버린다 (expired)
+
+실행 중인 호출은 취소할 수 없으므로 버린 예측은 결과만 버린다.
+예측 결과는 hit일 때만 호출 측이 응답 캐시에 넣는다 (빗나간 예측이 캐시를 차지하지 않도록).
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+OUTCOMES = ("submitted", "hit", "miss", "discarded", "expired", "error")
+
+
+class Prefetcher:
+    """프로세스 단위 예측 실행기 (모든 세션이 공유, 스레드 안전)
+
+    - max_workers: 동시에 실행할 예측 요청 수
+    - ttl: 예측을 보관하는 최대 시간(초)
+    - max_per_session: 세션 하나가 보관할 수 있는 예측 수 (넘으면 가장 오래된 것부터 버림)
+    - on_event: (결과 이름, 개수) -> None - 계측용 콜백 (이름은 OUTCOMES 중 하나)
+    """
+
+    def __init__(self, max_workers=4, ttl=300.0, max_per_session=4, on_event=None):
+        self.ttl = ttl
+        self.max_per_session = max(1, max_per_session)
+        self.on_event = on_event
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._sessions = {}  # 세션 -> {요청 키: (future, 생성 시각)}
+        self._counts = dict.fromkeys(OUTCOMES, 0)
+
+    def _count(self, outcome, amount=1):
+        if not amount:
+            return
+        with self._lock:
+            self._counts[outcome] += amount
+        if self.on_event is not None:
+            self.on_event(outcome, amount)
+
+    def _expire(self, now):
+        """ttl이 지난 예측 제거 - 제거한 수 반환 (잠금을 잡은 상태에서 호출)"""
+        expired = 0
+        for session in list(self._sessions):
+            entries = self._sessions[session]
+            for key in [key for key, (_, created) in entries.items() if now - created > self.ttl]:
+                entries.pop(key)[0].cancel()
+                expired += 1
+            if not entries:
+                del self._sessions[session]
+        return expired
+
+    def submit(self, session, key, fn):
+        """예측 요청 fn()을 백그라운드에서 실행 - 같은 예측이 이미 있으면 무시하고 False"""
+        now = time.monotonic()
+        dropped = 0
+        with self._lock:
+            expired = self._expire(now)
+            entries = self._sessions.setdefault(session, {})
+            if key in entries:
+                started = False
+            else:
+                while len(entries) >= self.max_per_session:
+                    oldest = min(entries, key=lambda k: entries[k][1])
+                    entries.pop(oldest)[0].cancel()
+                    dropped += 1
+                entries[key] = (self._executor.submit(fn), now)
+                started = True
+        self._count("expired", expired)
+        self._count("discarded", dropped)
+        if started:
+            self._count("submitted")
+        return started
+
+    def has_pending(self, session):
+        with self._lock:
+            return bool(self._sessions.get(session))
+
+    def take(self, session, key, timeout=None):
+        """실제 요청 key의 예측 결과 - (hit 여부, 결과)
+
+        세션에 예측이 없으면 (False, None)만 돌려주고 아무것도 세지 않는다.
+        예측이 실패했거나 timeout 안에 끝나지 않으면 miss로 세고 (False, None).
+        """
+        with self._lock:
+            entries = self._sessions.pop(session, None)
+        if not entries:
+            return False, None
+        entry = entries.pop(key, None)
+        for future, _ in entries.values():
+            future.cancel()
+        self._count("miss", len(entries))
+        if entry is None:
+            return False, None
+        future, created = entry
+        if time.monotonic() - created > self.ttl:
+            future.cancel()
+            self._count("expired")
+            return False, None
+        try:
+            result = future.result(timeout=timeout)
+        except FutureTimeout:
+            self._count("miss")
+            return False, None
+        except Exception:
+            self._count("error")
+            return False, None
+        self._count("hit")
+        return True, result
+
+    def discard(self, session):
+        """세션의 예측을 모두 버림 - 버린 수 반환"""
+        with self._lock:
+            entries = self._sessions.pop(session, None) or {}
+        for future, _ in entries.values():
+            future.cancel()
+        self._count("discarded", len(entries))
+        return len(entries)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counts)
+            stats["pending"] = sum(len(entries) for entries in self._sessions.values())
+        decided = stats["hit"] + stats["miss"] + stats["discarded"] + stats["expired"] + stats["error"]
+        stats["hit_rate"] = round(stats["hit"] / decided, 3) if decided else None
+        return stats
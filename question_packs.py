@@ -0,0 +1,387 @@
+"""직무별 질문 팩 - 단계별 질문, 필드 정의, 안내 문구, 완료 조건을 JSON 파일에서 읽는다
+
+팩 파일(data/question_packs/<팩 id>.json) 하나가 직무 묶음 하나를 맡는다.
+    {"version": 1, "label": "프론트엔드", "extends": "default",
+     "roles": ["Frontend Developer", ...],
+     "steps": {"job_info": {"fields": [{"name": ..., "description": ..., "list": true}], ...}}}
+
+- default 팩은 모든 단계의 필수 항목을 가져야 한다. 다른 팩은 바뀌는 항목만 적으면 나머지는
+  extends 팩(생략 시 default)에서 가져온다 (more_info는 키 단위로 덮어씀)
+- roles는 용어 사전(data/tech_terms.json)의 직무 대표 이름이며, 한 직무는 한 팩에만 속한다
+- 모든 팩을 검증한 뒤 팩 id -> QuestionPack, 직무 이름 -> QuestionPack 사전으로 한 번에
+  컴파일하므로 직무/단계 조회는 사전 조회 한 번이다
+- QuestionPackLoader는 check_interval초마다 파일 수정 시각을 확인해 바뀌었으면 다시 컴파일한다.
+  바뀐 팩에 오류가 있으면 이전 팩을 계속 쓰고 오류를 기록한다
+
+필드에는 로컬 충실도 판정(completeness.py)에 쓸 detect(종류), categories(용어 분류), keywords(핵심어)를
+적을 수 있다. 생략하면 필드 이름으로 추정한다.
+
+문구 안의 {name}(intro), {title}(title_followup), {tech}(more_info.with_tech)는 실행 중에 채워진다.
+"""
+import glob
+import json
+import logging
+import os
+import string
+import threading
+import time
+
+from completeness import KINDS, FieldDetector
+from interview import STEP_TOPICS
+from term_index import CATEGORY_LABELS
+
+DEFAULT_PACKS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "question_packs")
+DEFAULT_PACK = "default"
+
+# 단계 항목 -> 문구에 쓸 수 있는 자리표시자 (None이면 문구가 아닌 항목)
+STEP_KEYS = {
+    "label": (),
+    "intro": ("name",),
+    "questions": (),
+    "fields": None,
+    "context": (),
+    "criteria": (),
+    "more_info": None,
+    "followup": (),
+    "title_followup": ("title",),
+    "answer_labels": None,
+}
+REQUIRED_STEP_KEYS = ("label", "intro", "fields", "context", "criteria", "followup")
+MORE_INFO_KEYS = {"text": (), "with_tech": ("tech",), "domains": None, "keywords": None}
+
+logger = logging.getLogger("resume_bot.question_packs")
+
+
+class QuestionPackError(ValueError):
+    """질문 팩 파일 형식이 잘못된 경우"""
+
+
+class StepPack:
+    """한 팩의 한 단계(주제) - 컴파일된 뒤에는 읽기 전용으로 공유"""
+
+    __slots__ = (
+        "topic", "label", "intro", "questions", "fields", "list_fields", "context", "criteria",
+        "more_info", "followup", "title_followup", "answer_labels", "detectors",
+    )
+
+    def __init__(self, topic, spec):
+        self.topic = topic
+        self.label = spec["label"]
+        self.intro = spec["intro"]
+        self.questions = tuple(spec.get("questions", ()))
+        self.fields = tuple((field["name"], field["description"]) for field in spec["fields"])
+        self.list_fields = frozenset(field["name"] for field in spec["fields"] if field.get("list"))
+        self.context = spec["context"]
+        self.criteria = spec["criteria"]
+        self.more_info = spec.get("more_info", {})
+        self.followup = spec["followup"]
+        self.title_followup = spec.get("title_followup")
+        self.answer_labels = tuple(spec.get("answer_labels", ()))
+        self.detectors = tuple(FieldDetector.from_field(field) for field in spec["fields"])
+
+    def intro_message(self, name):
+        return self.intro.format(name=name)
+
+    def more_info_context(self, last_response, terms, tech):
+        """추가 정보 요청 시 안내 문구 - 키워드, 분야, 언급된 기술 순으로 맞는 문구를 고름
+
+        - terms: 마지막 응답의 {분류: [대표 이름]}, tech: 마지막 응답에서 찾은 기술 이름 목록
+        """
+        lowered = (last_response or "").lower()
+        for rule in self.more_info.get("keywords", ()):
+            if any(keyword in lowered for keyword in rule["any"]):
+                return rule["text"]
+        domains = terms.get("domain", [])
+        for domain, text in self.more_info.get("domains", {}).items():
+            if domain in domains:
+                return text
+        if tech and self.more_info.get("with_tech"):
+            return self.more_info["with_tech"].format(tech=", ".join(tech))
+        return self.more_info.get("text", self.context)
+
+
+class QuestionPack:
+    __slots__ = ("id", "label", "roles", "steps")
+
+    def __init__(self, pack_id, label, roles, steps):
+        self.id = pack_id
+        self.label = label
+        self.roles = tuple(roles)
+        self.steps = steps  # 주제 -> StepPack
+
+    def step(self, topic):
+        return self.steps.get(topic)
+
+    def step_at(self, step):
+        return self.steps.get(STEP_TOPICS.get(step))
+
+    def __repr__(self):
+        return f"QuestionPack({self.id!r})"
+
+
+class QuestionPacks:
+    """컴파일된 전체 팩 - 팩 id와 직무 이름으로 조회"""
+
+    def __init__(self, packs):
+        if DEFAULT_PACK not in packs:
+            raise QuestionPackError(f"{DEFAULT_PACK} 팩이 없습니다")
+        self.packs = packs
+        self.default = packs[DEFAULT_PACK]
+        self.by_role = {role: pack for pack in packs.values() for role in pack.roles}
+
+    def get(self, pack_id):
+        return self.packs.get(pack_id, self.default)
+
+    def for_roles(self, roles):
+        """언급된 직무(대표 이름, 언급 순서) 중 팩이 있는 첫 직무의 팩 (없으면 default)"""
+        for role in roles or ():
+            pack = self.by_role.get(role)
+            if pack is not None:
+                return pack
+        return self.default
+
+
+def _placeholders(text):
+    return {name for _, name, _, _ in string.Formatter().parse(text) if name is not None}
+
+
+def _check_text(where, value, allowed):
+    if not isinstance(value, str) or not value.strip():
+        raise QuestionPackError(f"{where}: 비어 있지 않은 문자열이어야 합니다")
+    try:
+        unknown = _placeholders(value) - set(allowed)
+    except ValueError as e:
+        raise QuestionPackError(f"{where}: 중괄호 형식이 잘못되었습니다 ({e})") from e
+    if unknown:
+        raise QuestionPackError(f"{where}: 쓸 수 없는 자리표시자입니다: {', '.join(sorted(unknown))}")
+
+
+def _check_text_list(where, value):
+    if not isinstance(value, list):
+        raise QuestionPackError(f"{where}: 목록이어야 합니다")
+    for i, item in enumerate(value):
+        _check_text(f"{where}[{i}]", item, ())
+
+
+def _check_fields(where, fields):
+    if not isinstance(fields, list) or not fields:
+        raise QuestionPackError(f"{where}: 필드가 하나 이상 있어야 합니다")
+    names = set()
+    for i, field in enumerate(fields):
+        if not isinstance(field, dict) or set(field) - {"name", "description", "list", "detect", "categories", "keywords"}:
+            raise QuestionPackError(f"{where}[{i}]: name, description, list, detect, categories, keywords 항목만 쓸 수 있습니다")
+        _check_text(f"{where}[{i}].name", field.get("name"), ())
+        _check_text(f"{where}[{i}].description", field.get("description"), ())
+        if not isinstance(field.get("list", False), bool):
+            raise QuestionPackError(f"{where}[{i}].list: true 또는 false여야 합니다")
+        if "detect" in field and field["detect"] not in KINDS:
+            raise QuestionPackError(f"{where}[{i}].detect: {', '.join(KINDS)} 중 하나여야 합니다")
+        categories = field.get("categories", [])
+        if not isinstance(categories, list):
+            raise QuestionPackError(f"{where}[{i}].categories: 목록이어야 합니다")
+        for category in categories:
+            if category not in CATEGORY_LABELS:
+                raise QuestionPackError(f"{where}[{i}].categories: 알 수 없는 용어 분류입니다: {category}")
+        if "keywords" in field:
+            _check_text_list(f"{where}[{i}].keywords", field["keywords"])
+        if field["name"] in names:
+            raise QuestionPackError(f"{where}: 필드 이름이 중복됩니다: {field['name']}")
+        names.add(field["name"])
+
+
+def _check_more_info(where, more_info):
+    if not isinstance(more_info, dict):
+        raise QuestionPackError(f"{where}: 객체여야 합니다")
+    for key, value in more_info.items():
+        if key not in MORE_INFO_KEYS:
+            raise QuestionPackError(f"{where}: 알 수 없는 항목입니다: {key}")
+        if key == "domains":
+            if not isinstance(value, dict):
+                raise QuestionPackError(f"{where}.domains: 객체여야 합니다")
+            for domain, text in value.items():
+                _check_text(f"{where}.domains.{domain}", text, ())
+        elif key == "keywords":
+            if not isinstance(value, list):
+                raise QuestionPackError(f"{where}.keywords: 목록이어야 합니다")
+            for i, rule in enumerate(value):
+                if not isinstance(rule, dict) or set(rule) != {"any", "text"}:
+                    raise QuestionPackError(f"{where}.keywords[{i}]: any, text 항목이 있어야 합니다")
+                _check_text_list(f"{where}.keywords[{i}].any", rule["any"])
+                _check_text(f"{where}.keywords[{i}].text", rule["text"], ())
+        else:
+            _check_text(f"{where}.{key}", value, MORE_INFO_KEYS[key])
+
+
+def _check_step(where, spec):
+    if not isinstance(spec, dict):
+        raise QuestionPackError(f"{where}: 객체여야 합니다")
+    for key, value in spec.items():
+        if key not in STEP_KEYS:
+            raise QuestionPackError(f"{where}: 알 수 없는 항목입니다: {key}")
+        if key == "fields":
+            _check_fields(f"{where}.fields", value)
+        elif key == "more_info":
+            _check_more_info(f"{where}.more_info", value)
+        elif key in ("questions", "answer_labels"):
+            _check_text_list(f"{where}.{key}", value)
+        else:
+            _check_text(f"{where}.{key}", value, STEP_KEYS[key])
+
+
+def validate_pack(pack_id, data):
+    """팩 파일 하나의 형식 검증 (상속 관계와 필수 항목은 compile_packs에서 확인)"""
+    if not isinstance(data, dict):
+        raise QuestionPackError(f"{pack_id}: JSON 객체여야 합니다")
+    unknown = set(data) - {"version", "label", "extends", "roles", "steps"}
+    if unknown:
+        raise QuestionPackError(f"{pack_id}: 알 수 없는 항목입니다: {', '.join(sorted(unknown))}")
+    if data.get("version") != 1:
+        raise QuestionPackError(f"{pack_id}: 지원하지 않는 version입니다: {data.get('version')!r}")
+    _check_text(f"{pack_id}.label", data.get("label"), ())
+    if "extends" in data and not isinstance(data["extends"], str):
+        raise QuestionPackError(f"{pack_id}.extends: 팩 id 문자열이어야 합니다")
+    _check_text_list(f"{pack_id}.roles", data.get("roles", []))
+    steps = data.get("steps", {})
+    if not isinstance(steps, dict):
+        raise QuestionPackError(f"{pack_id}.steps: 객체여야 합니다")
+    topics = set(STEP_TOPICS.values())
+    for topic, spec in steps.items():
+        if topic not in topics:
+            raise QuestionPackError(f"{pack_id}.steps: 알 수 없는 단계입니다: {topic}")
+        _check_step(f"{pack_id}.steps.{topic}", spec)
+
+
+def _merge_step(base, override):
+    merged = dict(base)
+    for key, value in override.items():
+        if key == "more_info":
+            merged[key] = {**base.get(key, {}), **value}
+        else:
+            merged[key] = value
+    return merged
+
+
+def compile_packs(raw):
+    """{팩 id: 팩 JSON} -> QuestionPacks (상속을 풀고 모든 단계의 필수 항목을 확인)"""
+    for pack_id, data in raw.items():
+        validate_pack(pack_id, data)
+    if DEFAULT_PACK not in raw:
+        raise QuestionPackError(f"{DEFAULT_PACK} 팩이 없습니다")
+
+    resolved = {}
+
+    def resolve(pack_id, chain=()):
+        if pack_id in resolved:
+            return resolved[pack_id]
+        if pack_id in chain:
+            raise QuestionPackError(f"팩 상속이 순환합니다: {' -> '.join(chain + (pack_id,))}")
+        if pack_id not in raw:
+            raise QuestionPackError(f"{chain[-1]}: 상속할 팩이 없습니다: {pack_id}")
+        data = raw[pack_id]
+        parent_id = data.get("extends", None if pack_id == DEFAULT_PACK else DEFAULT_PACK)
+        steps = dict(resolve(parent_id, chain + (pack_id,))) if parent_id else {}
+        for topic, spec in data.get("steps", {}).items():
+            steps[topic] = _merge_step(steps.get(topic, {}), spec)
+        resolved[pack_id] = steps
+        return steps
+
+    packs = {}
+    owners = {}
+    for pack_id, data in raw.items():
+        steps = resolve(pack_id)
+        compiled = {}
+        for topic in STEP_TOPICS.values():
+            spec = steps.get(topic, {})
+            missing = [key for key in REQUIRED_STEP_KEYS if key not in spec]
+            if missing:
+                raise QuestionPackError(f"{pack_id}.steps.{topic}: 필수 항목이 없습니다: {', '.join(missing)}")
+            compiled[topic] = StepPack(topic, spec)
+        for role in data.get("roles", []):
+            if role in owners:
+                raise QuestionPackError(f"직무 {role}이(가) {owners[role]}, {pack_id} 팩에 모두 있습니다")
+            owners[role] = pack_id
+        packs[pack_id] = QuestionPack(pack_id, data["label"], data.get("roles", []), compiled)
+    return QuestionPacks(packs)
+
+
+def _pack_files(directory):
+    return sorted(glob.glob(os.path.join(directory, "*.json")))
+
+
+def read_packs(directory=None):
+    """디렉터리의 팩 파일을 모두 읽어 {팩 id(파일 이름): JSON}"""
+    directory = directory or DEFAULT_PACKS_DIR
+    raw = {}
+    for path in _pack_files(directory):
+        try:
+            with open(path, encoding="utf-8") as f:
+                raw[os.path.splitext(os.path.basename(path))[0]] = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise QuestionPackError(f"질문 팩을 읽을 수 없습니다: {path} ({e})") from e
+    return raw
+
+
+def load_question_packs(directory=None):
+    return compile_packs(read_packs(directory))
+
+
+class QuestionPackLoader:
+    """파일이 바뀌면 다시 컴파일하는 팩 로더 (프로세스 하나에서 공유, 스레드 안전)
+
+    - check_interval: 파일 수정 시각을 확인하는 최소 간격(초). 0이면 get()마다 확인
+    """
+
+    def __init__(self, directory=None, check_interval=2.0):
+        self.directory = directory or DEFAULT_PACKS_DIR
+        self.check_interval = check_interval
+        self.reloads = 0
+        self.error = None
+        self._lock = threading.Lock()
+        self._signature = self._scan()
+        self._packs = compile_packs(read_packs(self.directory))
+        self._checked_at = time.monotonic()
+        self._loaded_at = time.time()
+
+    def _scan(self):
+        signature = []
+        for path in _pack_files(self.directory):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def get(self):
+        """현재 팩 - check_interval이 지났고 파일이 바뀌었으면 다시 컴파일"""
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return self._packs
+        with self._lock:
+            if time.monotonic() - self._checked_at >= self.check_interval:
+                self._reload_if_changed()
+                self._checked_at = time.monotonic()
+        return self._packs
+
+    def _reload_if_changed(self):
+        signature = self._scan()
+        if signature == self._signature:
+            return
+        self._signature = signature
+        try:
+            self._packs = compile_packs(read_packs(self.directory))
+        except QuestionPackError as e:
+            self.error = str(e)
+            logger.warning("질문 팩을 다시 불러오지 못해 이전 팩을 계속 사용합니다: %s", e)
+            return
+        self.error = None
+        self.reloads += 1
+        self._loaded_at = time.time()
+
+    def stats(self):
+        return {
+            "packs": sorted(self._packs.packs),
+            "roles": len(self._packs.by_role),
+            "reloads": self.reloads,
+            "loaded_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self._loaded_at)),
+            "error": self.error,
+        }
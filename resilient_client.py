@@ -0,0 +1,361 @@
+"""장애에 강한 모델 호출 - 마감 시간, 지터 재시도, 헤지 요청, 서킷 브레이커
+
+ResilientBackend는 다른 LLM 백엔드를 감싸 같은 인터페이스(generate/stream)를 제공한다.
+- 마감 시간(deadline): 호출 하나가 재시도까지 포함해 쓸 수 있는 최대 시간. 넘으면 DeadlineExceeded
+- 재시도: 일시적인 오류(429, 5xx, 시간 초과, 연결 오류)만 지수 백오프 + 전체 지터로 다시 시도
+- 헤지 요청: 최근 성공 지연 시간의 백분위수(예: p95)가 지나도 응답이 없으면 같은 요청을
+  한 번 더 보내 먼저 끝난 결과를 사용 (느린 꼬리 지연 완화)
+- 서킷 브레이커: 연속 실패가 쌓이면 일정 시간 동안 호출하지 않고 CircuitOpenError를 바로
+  내서, 호출 측이 캐시/기본 질문으로 넘어가게 함. 이후 한 번의 시험 호출로 복구를 확인
+  (잘못된 요청처럼 서버 상태와 무관한 오류는 브레이커 상태를 바꾸지 않음)
+- 스트리밍: 첫 조각까지는 재시도/헤지를 적용하고, 이후 조각도 남은 마감 시간 안에 오지 않으면
+  DeadlineExceeded를 내서 멈춘 스트림이 호출 측을 붙잡지 않게 함
+
+스레드에서 실행 중인 호출은 취소할 수 없으므로 마감 시간이 지난 시도는 결과만 버린다.
+버려진 시도가 느린 백엔드에 쌓이지 않도록 끝나지 않은 헤지 요청 수는 max_hedges_in_flight로 제한한다.
+"""
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from llm_backend import LLMBackend
+
+# 재시도할 HTTP 상태 코드와 예외 이름 (google.api_core 등을 직접 import하지 않고 판별)
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+RETRYABLE_ERROR_NAMES = {
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+    "DeadlineExceeded", "GatewayTimeout", "BadGateway", "Aborted", "RetryError",
+}
+
+
+class ModelCallError(RuntimeError):
+    """재시도 후에도 모델 응답을 받지 못한 경우의 공통 예외"""
+
+
+class DeadlineExceeded(ModelCallError, TimeoutError):
+    """마감 시간 안에 응답을 받지 못한 경우"""
+
+
+class CircuitOpenError(ModelCallError):
+    """서킷 브레이커가 열려 있어 호출하지 않은 경우"""
+
+
+def is_retryable(error):
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    if isinstance(getattr(error, "code", None), int) and error.code in RETRYABLE_STATUS:
+        return True
+    return any(cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(error).__mro__)
+
+
+def backoff_delay(attempt, base, cap):
+    """지수 백오프 + 전체 지터 (0 ~ min(cap, base * 2^attempt))"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """연속 실패 failure_threshold번이면 reset_timeout초 동안 열림(open)
+
+    열린 뒤 reset_timeout이 지나면 반열림(half_open) 상태로 시험 호출 하나만 허용하고,
+    성공하면 닫힘(closed), 실패하면 다시 열림으로 돌아간다.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now):
+        if self._opened_at is None:
+            return "closed"
+        if now - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self._state(time.monotonic())
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def release(self):
+        """서버 상태를 알 수 없는 결과 - 상태는 그대로 두고 시험 호출 자리만 돌려줌"""
+        with self._lock:
+            self._probing = False
+
+
+class LatencyWindow:
+    """최근 성공한 호출의 지연 시간 (헤지 기준 계산용)"""
+
+    def __init__(self, size=200):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p, min_samples=1):
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < max(1, min_samples):
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+
+_END = object()
+
+
+class ResilientBackend(LLMBackend):
+    """다른 백엔드를 감싸 마감 시간/재시도/헤지/서킷 브레이커를 적용
+
+    - deadline: 호출 하나(재시도 포함)의 최대 시간(초)
+    - max_attempts: 최대 시도 횟수 (첫 시도 포함)
+    - backoff_base, backoff_max: 재시도 대기 시간의 기준/상한(초)
+    - hedge_percentile: 이 백분위수 지연 시간이 지나면 헤지 요청 (0이면 사용 안 함)
+    - hedge_min_samples: 헤지 기준을 계산하기 위한 최소 표본 수
+    - failure_threshold, reset_timeout: 서킷 브레이커 설정
+    - max_hedges_in_flight: 동시에 끝나지 않은 헤지 요청의 최대 수 (넘으면 헤지하지 않음)
+    """
+
+    name = "resilient"
+
+    def __init__(self, backend, deadline=30.0, max_attempts=3, backoff_base=0.5, backoff_max=8.0,
+                 hedge_percentile=95, hedge_min_samples=20, failure_threshold=5, reset_timeout=30.0,
+                 max_workers=32, max_hedges_in_flight=8):
+        super().__init__()
+        self.backend = backend
+        self.model_name = backend.model_name
+        # 사용량은 실제 백엔드의 집계를 그대로 사용
+        self.usage = backend.usage
+        self.deadline = deadline
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.max_hedges_in_flight = max_hedges_in_flight
+        self._hedges_in_flight = 0
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        # 전체 응답(generate)과 첫 조각(stream)의 지연 시간은 분포가 달라 따로 집계
+        self.latencies = {"generate": LatencyWindow(), "stream": LatencyWindow()}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="model-call")
+        self._counters_lock = threading.Lock()
+        self._counters = {
+            "calls": 0, "attempts": 0, "retries": 0, "hedges": 0, "hedge_wins": 0,
+            "deadline_exceeded": 0, "failures": 0, "rejected": 0, "hedges_skipped": 0,
+        }
+
+    def __getattr__(self, name):
+        # supports_system_instruction 등 백엔드 고유 속성은 감싼 백엔드에서 찾음
+        if name == "backend":
+            raise AttributeError(name)
+        return getattr(self.backend, name)
+
+    def warm_up(self):
+        self.backend.warm_up()
+
+    def _count(self, name, amount=1):
+        with self._counters_lock:
+            self._counters[name] += amount
+
+    def _hedge_delay(self, kind):
+        if not self.hedge_percentile:
+            return None
+        return self.latencies[kind].percentile(self.hedge_percentile, self.hedge_min_samples)
+
+    def _timed(self, fn, kind):
+        start = time.monotonic()
+        result = fn()
+        self.latencies[kind].add(time.monotonic() - start)
+        return result
+
+    def _attempt(self, fn, kind, timeout):
+        """한 번의 시도 - 헤지 기준 시간이 지나도 끝나지 않으면 같은 요청을 한 번 더 보내
+        먼저 성공한 결과를 사용"""
+        start = time.monotonic()
+        primary = self._executor.submit(self._timed, fn, kind)
+        futures = [primary]
+        hedge_delay = self._hedge_delay(kind)
+        while True:
+            elapsed = time.monotonic() - start
+            remaining = timeout - elapsed
+            if remaining <= 0:
+                raise DeadlineExceeded(f"{timeout:.1f}초 안에 모델 응답을 받지 못했습니다")
+            wait_for = remaining
+            if hedge_delay is not None:
+                wait_for = min(remaining, max(0.0, hedge_delay - elapsed))
+            done, _ = wait(futures, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    if future is not primary:
+                        self._count("hedge_wins")
+                    return future.result()
+                futures.remove(future)
+                if not futures:
+                    raise error
+            if not done and hedge_delay is not None and time.monotonic() - start >= hedge_delay:
+                hedge_delay = None
+                hedge = self._submit_hedge(fn, kind)
+                if hedge is not None:
+                    futures.append(hedge)
+
+    def _submit_hedge(self, fn, kind):
+        """헤지 요청 제출 - 끝나지 않은 헤지가 상한에 닿았으면 None"""
+        with self._counters_lock:
+            if self._hedges_in_flight >= self.max_hedges_in_flight:
+                self._counters["hedges_skipped"] += 1
+                return None
+            self._hedges_in_flight += 1
+            self._counters["hedges"] += 1
+        future = self._executor.submit(self._timed, fn, kind)
+        future.add_done_callback(lambda _: self._end_hedge())
+        return future
+
+    def _end_hedge(self):
+        with self._counters_lock:
+            self._hedges_in_flight -= 1
+
+    def _call(self, fn, kind, deadline):
+        """마감 시간 안에서 재시도하며 fn을 실행"""
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise CircuitOpenError("모델 서버 응답이 불안정해 잠시 호출을 멈췄습니다")
+        self._count("calls")
+        deadline = self.deadline if deadline is None else deadline
+        end = time.monotonic() + deadline
+        attempt = 0
+        while True:
+            self._count("attempts")
+            try:
+                result = self._attempt(fn, kind, end - time.monotonic())
+            except Exception as e:
+                retryable = is_retryable(e)
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+                attempt += 1
+                if not retryable or attempt >= self.max_attempts or time.monotonic() + delay >= end:
+                    if isinstance(e, DeadlineExceeded):
+                        self._count("deadline_exceeded")
+                    self._count("failures")
+                    # 요청 자체가 잘못된 경우는 서버 상태와 무관하므로 브레이커 상태를 바꾸지 않음
+                    if retryable:
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.release()
+                    raise
+                self._count("retries")
+                time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+    def generate(self, prompt, system_instruction=None, response_schema=None, deadline=None):
+        return self._call(
+            lambda: self.backend.generate(prompt, system_instruction=system_instruction,
+                                          response_schema=response_schema),
+            "generate",
+            deadline,
+        )
+
+    def stream(self, prompt, system_instruction=None, deadline=None):
+        """첫 조각을 받을 때까지 재시도/헤지를 적용 (이미 출력한 뒤에는 다시 보내지 않음)
+
+        이후 조각은 별도 스레드가 받아 큐로 넘기고, 남은 마감 시간 안에 다음 조각이 오지 않으면
+        DeadlineExceeded를 낸다.
+        """
+        deadline = self.deadline if deadline is None else deadline
+        end = time.monotonic() + deadline
+
+        def first_chunk():
+            chunks = iter(self.backend.stream(prompt, system_instruction=system_instruction))
+            return chunks, next(chunks, _END)
+
+        chunks, first = self._call(first_chunk, "stream", deadline)
+        if first is _END:
+            return
+        yield first
+
+        received = queue.Queue()
+        stop = threading.Event()
+
+        def pump():
+            try:
+                for chunk in chunks:
+                    if stop.is_set():
+                        return
+                    received.put((chunk, None))
+                received.put((_END, None))
+            except Exception as e:
+                received.put((_END, e))
+
+        threading.Thread(target=pump, name="model-stream", daemon=True).start()
+        try:
+            while True:
+                try:
+                    chunk, error = received.get(timeout=max(0.0, end - time.monotonic()))
+                except queue.Empty:
+                    self._count("deadline_exceeded")
+                    raise DeadlineExceeded(f"{deadline:.1f}초 안에 모델 응답을 끝까지 받지 못했습니다") from None
+                if error is not None:
+                    raise error
+                if chunk is _END:
+                    return
+                yield chunk
+        finally:
+            # 호출 측이 그만두거나 마감 시간이 지나면 받는 스레드도 다음 조각에서 멈춤
+            stop.set()
+
+    def stats(self):
+        with self._counters_lock:
+            stats = dict(self._counters)
+        stats["circuit"] = self.breaker.state
+        for kind in self.latencies:
+            hedge_delay = self._hedge_delay(kind)
+            stats[f"hedge_after_seconds_{kind}"] = round(hedge_delay, 3) if hedge_delay is not None else None
+        return stats
+
+
+def wrap_backend(backend):
+    """환경변수 설정에 맞게 백엔드를 ResilientBackend로 감쌈"""
+    return ResilientBackend(
+        backend,
+        deadline=float(os.getenv("LLM_DEADLINE", "30")),
+        max_attempts=int(os.getenv("LLM_MAX_ATTEMPTS", "3")),
+        backoff_base=float(os.getenv("LLM_BACKOFF_BASE", "0.5")),
+        backoff_max=float(os.getenv("LLM_BACKOFF_MAX", "8")),
+        hedge_percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", "95")),
+        hedge_min_samples=int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20")),
+        failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+        reset_timeout=float(os.getenv("LLM_BREAKER_RESET", "30")),
+        max_hedges_in_flight=int(os.getenv("LLM_HEDGE_MAX_IN_FLIGHT", "8")),
+    )
@@ -0,0 +1,195 @@
+"""프로세스 단위 공유 자원 - 모델 백엔드, 응답 캐시, 용어 인덱스, 세션 저장소, 계측 등
+
+Streamlit은 app.py를 실행(rerun)마다 다시 실행하므로, 그 안의 @st.cache_resource 데코레이터도
+매번 다시 적용되며 함수 소스를 읽어 키를 만든다. 자원 생성 함수를 이 모듈에 두면 import될 때
+한 번만 데코레이터가 적용되고, 각 자원은 프로세스에서 처음 요청될 때 한 번만 만들어진다.
+
+.env도 이 모듈을 처음 불러올 때 한 번만 읽는다 (환경변수를 읽는 다른 모듈보다 먼저 import).
+"""
+import atexit
+import os
+
+import streamlit as st
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from llm_backend import create_backend  # noqa: E402
+from llm_cache import ResponseCache  # noqa: E402
+from polish import SectionPolisher  # noqa: E402
+from prefetch import Prefetcher  # noqa: E402
+from question_packs import QuestionPackLoader  # noqa: E402
+from resilient_client import wrap_backend  # noqa: E402
+from resume_render import ResumeRenderer  # noqa: E402
+from session_journal import SessionJournal  # noqa: E402
+from session_model import SessionMemoryRegistry  # noqa: E402
+from session_store import create_session_store  # noqa: E402
+from single_flight import SingleFlight  # noqa: E402
+from telemetry import Telemetry, configure_json_log, export_file_periodically, serve_metrics  # noqa: E402
+from term_index import TermIndex  # noqa: E402
+
+# 세션 저널/공유 저장소에 남길 session_state 키
+SESSION_KEYS = (
+    "step", "chat_history", "resume_data", "question_count", "context",
+    "collected_info", "step_complete_confirmed", "current_question", "memory",
+)
+# 저장하지 않고 필요할 때 다시 만드는 값(검색 인덱스, 검증 결과)을 모아 두는 session_state 키
+# (세션 메모리 상한을 넘거나 유휴 세션이 되면 비움)
+DERIVED_KEY = "derived"
+
+# Prometheus HELP 설명
+METRIC_HELP = {
+    "stage_duration_seconds": "대화 파이프라인 단계별 소요 시간(초)",
+    "model_requests_total": "모델 요청 수 (kind: text/schema/stream/polish, cache: hit/prefetch/miss/shared/error)",
+    "model_tokens_total": "모델 입출력 토큰 수 추정치 (direction: input/output)",
+    "model_ttft_seconds": "스트리밍 응답의 첫 조각까지 걸린 시간(초)",
+    "script_runs_total": "스크립트 실행 수 (kind: full/fragment)",
+    "turns_total": "처리한 사용자 턴 수 (kind: answer/more_info)",
+    "runs_per_turn": "턴 사이에 일어난 스크립트 실행 수",
+    "chat_history_messages": "턴이 끝난 시점의 대화 메시지 수",
+    "chat_history_tokens": "턴이 끝난 시점의 대화 토큰 수 추정치",
+    "prefetch_total": "추측 실행 결과 수 (outcome: submitted/hit/miss/discarded/expired/error)",
+    "step_decisions_total": "답변 판정 방법 (source: local_complete/local_question/model/fallback)",
+    "resume_section_changes_total": "이력서 확인 화면에 돌아왔을 때 바뀐 섹션 수 (node: resume_graph 원본 노드)",
+    "retrieval_results": "프롬프트에 넣은 관련 이전 답변 수",
+    "prompt_tokens": "대화 프롬프트의 토큰 수 추정치 (고정 system instruction 제외)",
+    "session_state_bytes": "턴이 끝난 시점의 세션 상태 메모리 추정치(bytes)",
+    "session_state_trims_total": "세션 메모리 상한(SESSION_STATE_MAX_BYTES)을 넘어 다시 만들 수 있는 값을 비운 횟수",
+    "session_evictions_total": "유휴 세션/세션 상한(SESSION_MEMORY_MAX_SESSIONS)으로 다른 세션의 다시 만들 수 있는 값을 비운 횟수",
+    "sessions_in_memory": "최근 ttl 안에 활동한 세션 수 (state: active/idle)",
+    "sessions_state_bytes": "프로세스의 세션 상태 메모리 추정치 합계(bytes)",
+    "process_rss_bytes": "프로세스 RSS(bytes)",
+}
+
+
+# 계측 - 단계별 소요 시간, 토큰, 캐시 적중, 실행 횟수
+# - METRICS_PORT: /metrics HTTP 엔드포인트 포트, METRICS_FILE: 주기적으로 갱신하는 스크랩 파일
+# - TRACE_LOG_PATH: 턴별 JSON 로그 파일 ("-"이면 표준 오류)
+@st.cache_resource(show_spinner=False)
+def get_telemetry():
+    telemetry = Telemetry(help=METRIC_HELP)
+    configure_json_log(os.getenv("TRACE_LOG_PATH", ""))
+    port = os.getenv("METRICS_PORT")
+    if port:
+        try:
+            serve_metrics(telemetry, int(port))
+        except OSError:
+            # 같은 호스트의 다른 프로세스가 이미 포트를 쓰는 경우 - 스크랩 파일/관리 패널로만 제공
+            pass
+    path = os.getenv("METRICS_FILE")
+    if path:
+        export_file_periodically(telemetry, path, float(os.getenv("METRICS_FILE_INTERVAL", "15")))
+    return telemetry
+
+
+# 모델 백엔드 (LLM_BACKEND=gemini|stub) - 마감 시간/재시도/헤지/서킷 브레이커를 적용한 백엔드로 감쌈
+# SDK import/클라이언트 생성은 첫 화면을 막지 않도록 백그라운드에서 미리 수행
+@st.cache_resource(show_spinner=False)
+def get_backend():
+    backend = wrap_backend(create_backend())
+    backend.warm_up_in_background()
+    return backend
+
+
+# 응답 캐시
+@st.cache_resource(show_spinner=False)
+def get_response_cache():
+    return ResponseCache(
+        path=os.getenv("LLM_CACHE_PATH", ".cache/llm_cache.sqlite3") or None,
+        max_memory_items=int(os.getenv("LLM_CACHE_MEMORY_ITEMS", "256")),
+        max_disk_items=int(os.getenv("LLM_CACHE_DISK_ITEMS", "10000")),
+        ttl=float(os.getenv("LLM_CACHE_TTL", str(24 * 60 * 60))),
+    )
+
+
+# 동일 프롬프트 동시 요청 합치기
+@st.cache_resource(show_spinner=False)
+def get_single_flight():
+    return SingleFlight()
+
+
+# 추측 실행 - 사용자가 단계 완료 여부를 고르는 동안 다음 모델 응답을 미리 생성
+# (PREFETCH_WORKERS=0이면 끔, 빗나간 예측도 모델 호출 비용은 듦)
+@st.cache_resource(show_spinner=False)
+def get_prefetcher():
+    workers = int(os.getenv("PREFETCH_WORKERS", "4"))
+    if workers <= 0:
+        return None
+    telemetry = get_telemetry()
+    return Prefetcher(
+        max_workers=workers,
+        ttl=float(os.getenv("PREFETCH_TTL", "300")),
+        on_event=lambda outcome, amount: telemetry.inc("prefetch_total", amount, outcome=outcome),
+    )
+
+
+# 기술/직무 용어 인덱스 - 사전을 한 번만 컴파일
+@st.cache_resource(show_spinner=False)
+def get_term_index():
+    return TermIndex.from_file(os.getenv("TERM_DICTIONARY_PATH") or None)
+
+
+# 직무별 질문 팩 - 한 번 컴파일하고, 파일이 바뀌면 다시 컴파일 (QUESTION_PACKS_CHECK_INTERVAL초마다 확인)
+@st.cache_resource(show_spinner=False)
+def get_question_packs():
+    return QuestionPackLoader(
+        os.getenv("QUESTION_PACKS_DIR") or None,
+        check_interval=float(os.getenv("QUESTION_PACKS_CHECK_INTERVAL", "2")),
+    )
+
+
+# 세션 저널 - 새로고침/서버 재시작 후에도 인터뷰를 이어갈 수 있도록 상태 변경을 기록
+@st.cache_resource(show_spinner=False)
+def get_session_journal():
+    path = os.getenv("SESSION_JOURNAL_PATH", ".cache/sessions.sqlite3")
+    if not path:
+        return None
+    journal = SessionJournal(
+        path,
+        SESSION_KEYS,
+        append_keys=("chat_history",),
+        tuple_keys=("chat_history",),
+        flush_interval=float(os.getenv("SESSION_JOURNAL_FLUSH_INTERVAL", "0.2")),
+        snapshot_every=int(os.getenv("SESSION_SNAPSHOT_EVERY", "50")),
+        # 보관 기간(초, 기본 7일) - 0이면 지우지 않음
+        ttl=float(os.getenv("SESSION_JOURNAL_TTL", str(7 * 24 * 3600))) or None,
+        purge_interval=float(os.getenv("SESSION_JOURNAL_PURGE_INTERVAL", "3600")),
+    )
+    atexit.register(journal.close)
+    return journal
+
+
+# 공유 세션 저장소 (SESSION_STORE_URL) - 여러 레플리카가 같은 세션을 이어받을 때 사용
+@st.cache_resource(show_spinner=False)
+def get_session_store():
+    return create_session_store()
+
+
+# 렌더링 결과 캐시 - 같은 이력서 내용/템플릿/포맷은 다시 렌더링하지 않음
+@st.cache_resource(show_spinner=False)
+def get_resume_renderer():
+    return ResumeRenderer(max_items=int(os.getenv("RESUME_RENDER_CACHE_ITEMS", "128")))
+
+
+# 이력서 문장 다듬기 - 섹션별 모델 호출을 동시에 실행하고 섹션 내용 해시로 결과를 보관
+# (RESUME_POLISH_WORKERS=0이면 끄고 입력한 답변을 그대로 표시)
+@st.cache_resource(show_spinner=False)
+def get_section_polisher():
+    workers = int(os.getenv("RESUME_POLISH_WORKERS", "4"))
+    if workers <= 0:
+        return None
+    return SectionPolisher(
+        max_workers=workers,
+        max_items=int(os.getenv("RESUME_POLISH_CACHE_ITEMS", "256")),
+    )
+
+
+# 세션별 메모리 기록 - 세션 수/합계/유휴 세션 보고 (SESSION_IDLE_SECONDS 동안 활동이 없으면 유휴)
+# 유휴 세션과 SESSION_MEMORY_MAX_SESSIONS를 넘은 오래된 세션은 다시 만들 수 있는 값을 비움
+@st.cache_resource(show_spinner=False)
+def get_session_memory():
+    return SessionMemoryRegistry(
+        idle_after=float(os.getenv("SESSION_IDLE_SECONDS", "600")),
+        ttl=float(os.getenv("SESSION_MEMORY_TTL", "3600")),
+        max_sessions=int(os.getenv("SESSION_MEMORY_MAX_SESSIONS", "0")),
+    )
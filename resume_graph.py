@@ -0,0 +1,121 @@
+"""이력서 섹션 버전과 파생 결과 의존성 그래프
+
+resume_data를 섹션(원본 노드) 단위로 나누어 내용 해시를 섹션 버전으로 삼고, 파생 결과
+(다듬은 문장, 검증 결과, 문서 블록, 렌더링 파일)가 어떤 노드에 의존하는지 DEPENDENCIES로 정의한다.
+
+파생 결과의 키(artifact_key)는 직간접으로 의존하는 원본 노드들의 버전으로만 만든다.
+섹션 하나를 고치면 그 섹션에 의존하는 결과의 키만 바뀌므로, 키로 결과를 보관하는 캐시
+(SectionPolisher, ResumeRenderer, 검증 결과)는 바뀐 부분만 다시 계산한다.
+예) 프로젝트 하나를 고치면 polish.projects, document.projects, validation.projects, render만 다시 계산
+
+섹션 버전은 내용 해시이므로 resume_data를 고치는 코드(interview.py 등)가 버전을 따로 올리지 않아도 되고,
+저널/공유 저장소에서 복원한 세션도 같은 버전을 얻는다.
+"""
+import hashlib
+import json
+from functools import lru_cache
+
+# 다듬기 대상 섹션 (polish.SECTIONS와 같은 순서)
+POLISHED_SECTIONS = ("summary", "experience", "projects", "skills")
+
+# 원본 노드 -> resume_data 안의 경로들
+SOURCES = {
+    "basic_info": (("basic_info",),),
+    "job_info": (("job_info",), ("structured", "job_info")),
+    "summary": (("summary",), ("structured", "summary")),
+    "experience": (("experience",), ("structured", "experience")),
+    "projects": (("projects",), ("structured", "projects")),
+    # 대화에서 찾은 기술 용어도 기술 스택 섹션에 표시됨
+    "skills": (("skills",), ("structured", "skills"), ("terms",)),
+}
+# 다듬은 문장 (polish.* 결과를 저장한 값)
+SOURCES.update({f"polished.{section}": (("polished", section),) for section in POLISHED_SECTIONS})
+
+SECTIONS = ("basic_info", "job_info", "summary", "experience", "projects", "skills")
+
+# 파생 결과 -> 의존하는 노드 (원본 노드 또는 다른 파생 결과)
+DEPENDENCIES = {
+    # 자기소개는 지원 직무와 경력을 참고해 다듬음
+    "polish.summary": ("summary", "job_info", "experience"),
+    "polish.experience": ("experience", "job_info"),
+    "polish.projects": ("projects", "job_info"),
+    "polish.skills": ("skills", "job_info"),
+}
+DEPENDENCIES.update({f"validation.{section}": (section,) for section in SECTIONS})
+DEPENDENCIES.update({
+    f"document.{section}": (section, f"polished.{section}") if section in POLISHED_SECTIONS else (section,)
+    for section in SECTIONS
+})
+DEPENDENCIES["render"] = tuple(f"document.{section}" for section in SECTIONS)
+
+
+def _lookup(data, path):
+    value = data
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def node_version(data, node):
+    """원본 노드의 버전 - 노드에 속한 값들의 내용 해시"""
+    payload = json.dumps([_lookup(data, path) for path in SOURCES[node]], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def versions(data):
+    """모든 원본 노드의 버전 - {노드: 버전}"""
+    return {node: node_version(data, node) for node in SOURCES}
+
+
+@lru_cache(maxsize=None)
+def sources_of(node):
+    """노드가 직간접으로 의존하는 원본 노드 (정렬된 튜플)"""
+    if node in SOURCES:
+        return (node,)
+    found = set()
+    for dependency in DEPENDENCIES[node]:
+        found.update(sources_of(dependency))
+    return tuple(sorted(found))
+
+
+def artifact_key(node, data=None, current=None):
+    """파생 결과의 키 - 의존하는 원본 노드 버전의 해시 (current: 미리 계산한 versions(data))"""
+    if current is None:
+        current = {}
+    parts = [(source, current.get(source) or node_version(data, source)) for source in sources_of(node)]
+    payload = json.dumps([node, parts], ensure_ascii=False)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def changed(previous, current):
+    """버전이 바뀐 원본 노드 (previous가 비어 있으면 전부)"""
+    return {node for node, version in current.items() if (previous or {}).get(node) != version}
+
+
+def affected(changed_nodes):
+    """바뀐 원본 노드 때문에 다시 계산해야 하는 파생 결과"""
+    changed_nodes = set(changed_nodes)
+    return {node for node in DEPENDENCIES if changed_nodes.intersection(sources_of(node))}
+
+
+class SectionVersions:
+    """세션의 섹션 버전 기록 - 사용자가 고친 섹션마다 번호를 올림 (session_state에 보관)
+
+    다듬은 문장(polished.*)은 파생 결과를 저장한 값이므로 세지 않는다.
+    번호는 표시/계측용이고, 캐시 키는 항상 내용 해시(artifact_key)를 쓴다.
+    """
+
+    def __init__(self):
+        self.hashes = {}
+        self.numbers = dict.fromkeys(SECTIONS, 0)
+
+    def update(self, data):
+        """현재 resume_data로 섹션 버전을 갱신하고 바뀐 섹션을 돌려줌"""
+        current = {section: node_version(data, section) for section in SECTIONS}
+        nodes = changed(self.hashes, current)
+        for node in nodes:
+            self.numbers[node] = self.numbers.get(node, 0) + 1
+        self.hashes = current
+        return nodes
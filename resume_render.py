@@ -0,0 +1,521 @@
+"""이력서 렌더링 엔진 - resume_data를 템플릿에 따라 텍스트/Markdown/HTML/DOCX/PDF로 출력
+
+1. build_document(data, template)로 템플릿 순서에 맞춘 블록 목록(문서 모델)을 만들고
+2. 포맷별 렌더러가 블록을 io.StringIO / io.BytesIO에 차례로 써서 결과를 만든다.
+
+DOCX(Office Open XML)와 PDF는 추가 패키지 없이 직접 만든다. PDF는 한글 표시를 위해
+PDF 뷰어가 기본 제공하는 CJK 글꼴(HYGoThic-Medium, Adobe-Korea1)을 임베드 없이 참조한다.
+
+resume_data["polished"]에 섹션별로 다듬은 문장(polish.py)이 있으면 그 섹션은 원래 답변 대신 다듬은 문장으로 출력한다.
+
+ResumeRenderer는 resume_graph의 섹션 버전으로 결과를 보관한다.
+- 섹션 블록: (섹션, document.<섹션> 키) - 섹션 하나를 고치면 그 섹션의 블록만 다시 만듦
+- 렌더링 결과: (render 키, 템플릿, 포맷) - 같은 내용을 다시 내려받거나 미리보기할 때는 렌더링하지 않음
+"""
+import html
+import io
+import threading
+import zipfile
+from collections import OrderedDict
+from xml.sax.saxutils import escape as xml_escape
+
+from resume_graph import artifact_key, versions
+from term_index import CATEGORY_LABELS, TECH_CATEGORIES
+
+# 포맷 -> (파일 확장자, MIME 타입)
+FORMATS = {
+    "txt": ("txt", "text/plain"),
+    "md": ("md", "text/markdown"),
+    "html": ("html", "text/html"),
+    "docx": ("docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"),
+    "pdf": ("pdf", "application/pdf"),
+}
+
+# 템플릿: 제목과 섹션 순서 (섹션 ID는 SECTION_BUILDERS의 키)
+TEMPLATES = {
+    "standard": {
+        "label": "기본",
+        "sections": ["basic_info", "job_info", "summary", "experience", "projects", "skills"],
+    },
+    "tech": {
+        "label": "기술 중심",
+        "sections": ["basic_info", "job_info", "skills", "projects", "experience", "summary"],
+    },
+}
+DEFAULT_TEMPLATE = "standard"
+
+
+# ---------------------------------------------------------------------------
+# 문서 모델
+# 블록: ("title", 텍스트) / ("heading", 텍스트) / ("field", 이름, 값) /
+#       ("paragraph", 텍스트) / ("item", 번호 또는 None, 텍스트) / ("note", 텍스트)
+# ---------------------------------------------------------------------------
+
+def _structured_fields(data, topic):
+    values = data.get("structured", {}).get(topic) or {}
+    blocks = []
+    for name, value in values.items():
+        if value:
+            blocks.append(("field", name, ", ".join(value) if isinstance(value, list) else str(value)))
+    return blocks
+
+
+def _basic_info(data):
+    info = data.get("basic_info", {})
+    return [
+        ("heading", "인적사항"),
+        ("field", "이름", info.get("name") or "미입력"),
+        ("field", "이메일", info.get("email") or "미입력"),
+        ("field", "전화번호", info.get("phone") or "미입력"),
+        ("field", "포트폴리오", info.get("portfolio") or "없음"),
+    ]
+
+
+def _job_info(data):
+    job = data.get("job_info", {})
+    return [
+        ("heading", "지원 직무"),
+        ("field", "직무", job.get("title") or "미입력"),
+        ("field", "주요 기술", job.get("answer_0") or ""),
+        ("field", "주요 경험", job.get("answer_1") or ""),
+    ] + _structured_fields(data, "job_info")
+
+
+def _text_list(value):
+    if not value:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+def _polished(data, heading, section):
+    """다듬은 문장이 있으면 섹션 블록 ("- "로 시작하는 줄은 글머리표, 나머지는 문단), 없으면 None"""
+    text = (data.get("polished") or {}).get(section)
+    if not text:
+        return None
+    blocks = [("heading", heading)]
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith(("- ", "* ", "• ")):
+            blocks.append(("item", None, line[2:].strip()))
+        elif line:
+            blocks.append(("paragraph", line))
+    return blocks
+
+
+def _summary(data):
+    polished = _polished(data, "자기소개", "summary")
+    if polished:
+        return polished
+    summaries = _text_list(data.get("summary"))
+    blocks = [("heading", "자기소개")]
+    blocks += [("paragraph", text) for text in summaries] or [("note", "자기소개가 아직 작성되지 않았습니다.")]
+    return blocks + _structured_fields(data, "summary")
+
+
+def _numbered(heading, items, empty, topic, data):
+    polished = _polished(data, heading, topic)
+    if polished:
+        return polished
+    blocks = [("heading", heading)]
+    blocks += [("item", i, text) for i, text in enumerate(items, 1)] or [("note", empty)]
+    return blocks + _structured_fields(data, topic)
+
+
+def _experience(data):
+    return _numbered("경력 및 프로젝트 경험", _text_list(data.get("experience")),
+                     "경력 정보가 아직 작성되지 않았습니다.", "experience", data)
+
+
+def _projects(data):
+    return _numbered("프로젝트 경험", _text_list(data.get("projects")),
+                     "프로젝트 정보가 아직 작성되지 않았습니다.", "projects", data)
+
+
+def _skills(data):
+    polished = _polished(data, "기술 스택", "skills")
+    if polished:
+        return polished
+    skills = _text_list(data.get("skills"))
+    blocks = [("heading", "기술 스택")]
+    blocks += [("item", None, skill.lstrip("- ")) for skill in skills] or [("note", "기술 스택이 아직 작성되지 않았습니다.")]
+    # 추출된 기술 스택 필드가 없는 분류만 대화에서 찾은 용어로 채움
+    extracted = data.get("structured", {}).get("skills") or {}
+    terms = data.get("terms", {})
+    for category in TECH_CATEGORIES:
+        label = CATEGORY_LABELS[category]
+        if terms.get(category) and not extracted.get(label):
+            blocks.append(("field", label, ", ".join(terms[category])))
+    return blocks + _structured_fields(data, "skills")
+
+
+SECTION_BUILDERS = {
+    "basic_info": _basic_info,
+    "job_info": _job_info,
+    "summary": _summary,
+    "experience": _experience,
+    "projects": _projects,
+    "skills": _skills,
+}
+
+
+def document_title(data):
+    name = data.get("basic_info", {}).get("name")
+    return ("title", f"{name} 이력서" if name else "이력서")
+
+
+def build_document(data, template=DEFAULT_TEMPLATE):
+    blocks = [document_title(data)]
+    for section in TEMPLATES[template]["sections"]:
+        blocks.extend(SECTION_BUILDERS[section](data))
+    return blocks
+
+
+# ---------------------------------------------------------------------------
+# 포맷별 렌더러
+# ---------------------------------------------------------------------------
+
+def render_text(blocks):
+    out = io.StringIO()
+    for block in blocks:
+        kind = block[0]
+        if kind == "title":
+            continue
+        if kind == "heading":
+            if out.tell():
+                out.write("\n")
+            out.write(f"[{block[1]}]\n")
+        elif kind == "field":
+            out.write(f"{block[1]}: {block[2]}\n")
+        elif kind == "item":
+            out.write(f"{block[1]}. {block[2]}\n" if block[1] else f"- {block[2]}\n")
+        else:
+            out.write(f"{block[1]}\n")
+    return out.getvalue()
+
+
+def _md_escape(text):
+    return str(text).replace("\\", "\\\\").replace("*", "\\*").replace("_", "\\_").replace("#", "\\#")
+
+
+def render_markdown(blocks):
+    out = io.StringIO()
+    for block in blocks:
+        kind = block[0]
+        if kind == "title":
+            out.write(f"# {_md_escape(block[1])}\n")
+        elif kind == "heading":
+            out.write(f"\n## {_md_escape(block[1])}\n\n")
+        elif kind == "field":
+            out.write(f"- **{_md_escape(block[1])}**: {_md_escape(block[2])}\n")
+        elif kind == "item":
+            text = _md_escape(block[2]).replace("\n", "  \n   ")
+            out.write(f"{block[1]}. {text}\n" if block[1] else f"- {text}\n")
+        elif kind == "note":
+            out.write(f"_{_md_escape(block[1])}_\n")
+        else:
+            out.write(f"{_md_escape(block[1])}\n\n")
+    return out.getvalue()
+
+
+_HTML_STYLE = (
+    "body{font-family:'Malgun Gothic','Apple SD Gothic Neo',sans-serif;max-width:800px;margin:40px auto;"
+    "line-height:1.6;color:#222}h1{border-bottom:2px solid #333;padding-bottom:8px}"
+    "h2{margin-top:28px;border-bottom:1px solid #ccc;padding-bottom:4px}.note{color:#888}"
+    "dl{display:grid;grid-template-columns:max-content 1fr;gap:4px 16px}dt{font-weight:bold}dd{margin:0}"
+)
+
+
+def render_html(blocks):
+    out = io.StringIO()
+    title = next((block[1] for block in blocks if block[0] == "title"), "이력서")
+    out.write(f'<!DOCTYPE html>\n<html lang="ko"><head><meta charset="utf-8"><title>{html.escape(title)}</title>')
+    out.write(f"<style>{_HTML_STYLE}</style></head><body>\n")
+    open_tag = None  # 연속된 field/item 블록을 하나의 목록 태그로 묶음
+
+    def switch(tag):
+        nonlocal open_tag
+        if open_tag != tag:
+            if open_tag:
+                out.write(f"</{open_tag}>\n")
+            if tag:
+                out.write(f"<{tag}>\n")
+            open_tag = tag
+
+    for block in blocks:
+        kind = block[0]
+        if kind == "field":
+            switch("dl")
+            out.write(f"<dt>{html.escape(block[1])}</dt><dd>{html.escape(block[2])}</dd>\n")
+        elif kind == "item":
+            switch("ol" if block[1] else "ul")
+            out.write(f"<li>{html.escape(block[2]).replace(chr(10), '<br>')}</li>\n")
+        else:
+            switch(None)
+            text = html.escape(block[1]).replace("\n", "<br>")
+            if kind == "title":
+                out.write(f"<h1>{text}</h1>\n")
+            elif kind == "heading":
+                out.write(f"<h2>{text}</h2>\n")
+            elif kind == "note":
+                out.write(f'<p class="note">{text}</p>\n')
+            else:
+                out.write(f"<p>{text}</p>\n")
+    switch(None)
+    out.write("</body></html>\n")
+    return out.getvalue()
+
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    "</Types>"
+)
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    "</Relationships>"
+)
+
+
+def _docx_run(text, size=21, bold=False, color=None):
+    props = '<w:rFonts w:ascii="Malgun Gothic" w:hAnsi="Malgun Gothic" w:eastAsia="Malgun Gothic"/>'
+    if bold:
+        props += "<w:b/>"
+    if color:
+        props += f'<w:color w:val="{color}"/>'
+    props += f'<w:sz w:val="{size}"/><w:szCs w:val="{size}"/>'
+    lines = str(text).split("\n")
+    body = "<w:br/>".join(f'<w:t xml:space="preserve">{xml_escape(line)}</w:t>' for line in lines)
+    return f"<w:r><w:rPr>{props}</w:rPr>{body}</w:r>"
+
+
+def _docx_paragraph(runs, space_before=0, space_after=80, indent=0):
+    props = f'<w:spacing w:before="{space_before}" w:after="{space_after}"/>'
+    if indent:
+        props += f'<w:ind w:left="{indent}"/>'
+    return f"<w:p><w:pPr>{props}</w:pPr>{''.join(runs)}</w:p>"
+
+
+def render_docx(blocks):
+    body = io.StringIO()
+    for block in blocks:
+        kind = block[0]
+        if kind == "title":
+            body.write(_docx_paragraph([_docx_run(block[1], size=36, bold=True)], space_after=240))
+        elif kind == "heading":
+            body.write(_docx_paragraph([_docx_run(block[1], size=26, bold=True)], space_before=240, space_after=120))
+        elif kind == "field":
+            body.write(_docx_paragraph([_docx_run(f"{block[1]}: ", bold=True), _docx_run(block[2])]))
+        elif kind == "item":
+            prefix = f"{block[1]}. " if block[1] else "• "
+            body.write(_docx_paragraph([_docx_run(prefix + block[2])], indent=284))
+        elif kind == "note":
+            body.write(_docx_paragraph([_docx_run(block[1], color="888888")]))
+        else:
+            body.write(_docx_paragraph([_docx_run(block[1])]))
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+        f"{body.getvalue()}"
+        '<w:sectPr><w:pgSz w:w="11906" w:h="16838"/>'
+        '<w:pgMar w:top="1134" w:right="1134" w:bottom="1134" w:left="1134" w:header="567" w:footer="567" w:gutter="0"/>'
+        "</w:sectPr></w:body></w:document>"
+    )
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as docx:
+        docx.writestr("[Content_Types].xml", _DOCX_CONTENT_TYPES)
+        docx.writestr("_rels/.rels", _DOCX_RELS)
+        docx.writestr("word/document.xml", document)
+    return out.getvalue()
+
+
+# PDF (A4, 단위 pt)
+_PAGE_WIDTH, _PAGE_HEIGHT, _MARGIN = 595, 842, 56
+_PDF_STYLES = {  # 블록 종류 -> (글자 크기, 위 여백, 들여쓰기, 색(회색 0~1))
+    "title": (18, 0, 0, 0),
+    "heading": (13, 14, 0, 0),
+    "field": (10.5, 2, 0, 0),
+    "item": (10.5, 2, 12, 0),
+    "note": (10.5, 2, 0, 0.5),
+    "paragraph": (10.5, 2, 0, 0),
+}
+
+
+def _char_width(ch, size):
+    return size * (0.55 if ord(ch) < 0x1100 else 1.0)
+
+
+def _wrap(text, size, width):
+    lines = []
+    for raw in str(text).split("\n"):
+        line, line_width = "", 0.0
+        for ch in raw:
+            w = _char_width(ch, size)
+            if line and line_width + w > width:
+                lines.append(line)
+                line, line_width = "", 0.0
+            line += ch
+            line_width += w
+        lines.append(line)
+    return lines
+
+
+def _pdf_hex(text):
+    # UniKS-UCS2-H는 BMP 문자만 표현하므로 이모지 등은 제외
+    return "".join(f"{ord(ch):04X}" for ch in text if ord(ch) <= 0xFFFF)
+
+
+def render_pdf(blocks):
+    pages, ops = [], io.StringIO()
+    y = _PAGE_HEIGHT - _MARGIN
+    width = _PAGE_WIDTH - 2 * _MARGIN
+    for block in blocks:
+        kind = block[0]
+        size, before, indent, gray = _PDF_STYLES[kind]
+        if kind == "field":
+            text = f"{block[1]}: {block[2]}"
+        elif kind == "item":
+            text = (f"{block[1]}. " if block[1] else "- ") + block[2]
+        else:
+            text = block[1]
+        y -= before
+        for line in _wrap(text, size, width - indent):
+            if y - size * 1.5 < _MARGIN:
+                pages.append(ops.getvalue())
+                ops = io.StringIO()
+                y = _PAGE_HEIGHT - _MARGIN
+            y -= size * 1.5
+            ops.write(f"BT {gray} g /F1 {size} Tf {_MARGIN + indent} {y:.1f} Td <{_pdf_hex(line)}> Tj ET\n")
+        if kind in ("title", "heading"):
+            ops.write(f"0.7 G 0.5 w {_MARGIN} {y - 4:.1f} m {_PAGE_WIDTH - _MARGIN} {y - 4:.1f} l S\n")
+            y -= 6
+    pages.append(ops.getvalue())
+
+    # 객체 번호: 1 카탈로그, 2 페이지 트리, 3 글꼴, 4 CID 글꼴, 5 글꼴 정보, 이후 (페이지, 내용) 쌍
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        "<< /Type /Font /Subtype /Type0 /BaseFont /HYGoThic-Medium /Encoding /UniKS-UCS2-H "
+        "/DescendantFonts [4 0 R] >>",
+        "<< /Type /Font /Subtype /CIDFontType0 /BaseFont /HYGoThic-Medium "
+        "/CIDSystemInfo << /Registry (Adobe) /Ordering (Korea1) /Supplement 1 >> "
+        "/FontDescriptor 5 0 R /DW 1000 /W [1 95 550] >>",
+        "<< /Type /FontDescriptor /FontName /HYGoThic-Medium /Flags 6 /FontBBox [-6 -145 1003 880] "
+        "/ItalicAngle 0 /Ascent 880 /Descent -120 /CapHeight 880 /StemV 93 >>",
+    ]
+    page_refs = []
+    for content in pages:
+        page_number = len(objects) + 1
+        page_refs.append(f"{page_number} 0 R")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {_PAGE_WIDTH} {_PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_number + 1} 0 R >>"
+        )
+        data = content.encode("latin-1")
+        objects.append(f"<< /Length {len(data)} >>\nstream\n{content}endstream")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(page_refs)}] /Count {len(page_refs)} >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{obj}\nendobj\n".encode("latin-1"))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1"))
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode("latin-1"))
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1"))
+    return out.getvalue()
+
+
+RENDERERS = {
+    "txt": render_text,
+    "md": render_markdown,
+    "html": render_html,
+    "docx": render_docx,
+    "pdf": render_pdf,
+}
+
+
+def _check(fmt, template):
+    if fmt not in RENDERERS:
+        raise ValueError(f"지원하지 않는 포맷입니다: {fmt}")
+    if template not in TEMPLATES:
+        raise ValueError(f"알 수 없는 템플릿입니다: {template}")
+
+
+def render(data, fmt, template=DEFAULT_TEMPLATE):
+    """캐시 없이 바로 렌더링 (텍스트 포맷은 str, DOCX/PDF는 bytes)"""
+    _check(fmt, template)
+    return RENDERERS[fmt](build_document(data, template))
+
+
+class ResumeRenderer:
+    """(render 키, 템플릿, 포맷) -> 렌더링 결과, (섹션, document 키) -> 섹션 블록 LRU 캐시"""
+
+    def __init__(self, max_items=128, max_sections=512):
+        self.max_items = max_items
+        self.max_sections = max_sections
+        self._cache = OrderedDict()
+        self._sections = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "section_hits": 0, "section_misses": 0}
+
+    def _put(self, cache, key, value, limit, evictions=None):
+        with self._lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > limit:
+                cache.popitem(last=False)
+                if evictions:
+                    self._counters[evictions] += 1
+
+    def _section_blocks(self, data, section, current):
+        key = (section, artifact_key(f"document.{section}", current=current))
+        with self._lock:
+            blocks = self._sections.get(key)
+            if blocks is not None:
+                self._sections.move_to_end(key)
+                self._counters["section_hits"] += 1
+                return blocks
+            self._counters["section_misses"] += 1
+        blocks = SECTION_BUILDERS[section](data)
+        self._put(self._sections, key, blocks, self.max_sections)
+        return blocks
+
+    def document(self, data, template=DEFAULT_TEMPLATE, current=None):
+        """build_document와 같은 결과 - 바뀌지 않은 섹션은 보관한 블록을 씀"""
+        current = current or versions(data)
+        blocks = [document_title(data)]
+        for section in TEMPLATES[template]["sections"]:
+            blocks.extend(self._section_blocks(data, section, current))
+        return blocks
+
+    def render(self, data, fmt, template=DEFAULT_TEMPLATE):
+        _check(fmt, template)
+        current = versions(data)
+        key = (artifact_key("render", current=current), template, fmt)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self._counters["hits"] += 1
+                return self._cache[key]
+            self._counters["misses"] += 1
+        result = RENDERERS[fmt](self.document(data, template, current))
+        self._put(self._cache, key, result, self.max_items, "evictions")
+        return result
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["items"] = len(self._cache)
+            stats["sections"] = len(self._sections)
+            return stats
@@ -0,0 +1,258 @@
+"""세션 안 검색 인덱스 - 이전 답변 중 지금 단계/질문과 관련된 것만 프롬프트에 넣기 위한 BM25
+
+세션마다 지난 사용자 답변(chat_history)과 추출된 이력서 필드(resume_data["structured"])를
+문서로 색인하고, 현재 질문과 단계 정보로 검색해 점수가 높은 k개만 프롬프트에 넣는다.
+지원 직무 답변 전체를 매번 붙이던 방식보다 프롬프트가 짧고, 앞 단계에서 말한 관련 내용
+(예: 프로젝트 단계에서 경력 단계에 말한 같은 기술)은 단계가 지나도 다시 찾아 쓸 수 있다.
+
+토큰
+- 한글은 어절마다 글자 2-gram (조사가 붙어도 어간 부분이 맞도록, 한 글자 어절은 그대로)
+- 영문/숫자는 소문자 단어
+- 용어 사전이 있으면 찾은 용어의 대표 이름("@java")을 더해 "자바"와 "Java"가 서로 맞도록 함
+
+색인은 증분식이다. sync()는 새로 생긴 답변과 내용이 바뀐 필드만 색인하고, 바뀐 필드의
+이전 문서는 지운 것으로 표시한다. 문서별 단어 빈도는 CSR 형태의 NumPy 배열(단어 id, 빈도,
+문서 번호)에 이어 붙이고, 검색은 질문 단어가 들어 있는 위치만 골라 bincount로 점수를 합한다.
+단어 id는 세션 인덱스의 단어 사전(토큰 -> 번호)으로 매기므로 서로 다른 토큰이 같은 id가 되지
+않고, 문서 빈도(df)는 검색할 때 고른 위치에서 센다. 지운 문서가 살아 있는 문서보다 많아지면
+(COMPACT_MIN_DEAD개 이상일 때) 지운 문서의 위치와 쓰이지 않는 단어를 빼고 배열을 다시 만들어,
+필드를 자주 고쳐도 배열과 검색할 때 훑는 위치가 살아 있는 문서만큼으로 유지된다.
+
+문서 본문은 복사해 두지 않는다. 문서는 키(메시지 id 또는 추출 필드 이름)와 내용 해시만
+가지고, 검색 결과의 본문은 document_text()로 chat_history/resume_data에서 읽는다.
+
+인덱스는 session_state에 두는 세션별 객체이고 저장/복원 대상이 아니다. 복원된 세션은
+처음 sync()할 때 chat_history와 resume_data로 다시 만든다.
+"""
+import re
+import unicodedata
+
+import numpy as np
+
+from session_model import Sender
+
+_WORD_RE = re.compile(r"[가-힣]+|[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+
+def tokenize(text, term_index=None):
+    """검색 토큰 목록 (중복 포함)"""
+    text = text or ""
+    tokens = []
+    for word in _WORD_RE.findall(unicodedata.normalize("NFKC", text).casefold()):
+        if "가" <= word[0] <= "힣":
+            tokens += [word[i:i + 2] for i in range(len(word) - 1)] if len(word) > 1 else [word]
+        else:
+            tokens.append(word)
+    if term_index is not None:
+        tokens += ["@" + match.name.casefold() for match in term_index.find(text)]
+    return tokens
+
+
+# 지운 문서가 이 수 이상이고 살아 있는 문서보다 많으면 배열을 압축
+COMPACT_MIN_DEAD = 32
+
+
+def _grow(array, size):
+    """size 이상이 되도록 용량을 두 배씩 늘린 배열"""
+    if size <= len(array):
+        return array
+    capacity = max(len(array), 8)
+    while capacity < size:
+        capacity *= 2
+    grown = np.zeros(capacity, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class SessionIndex:
+    """세션 하나의 BM25 색인 - 문서는 (키, 라벨, 본문 해시)
+
+    - 키: ("turn", chat_history 인덱스) 또는 ("field", 주제, 필드 이름)
+    - 라벨: 프롬프트에 붙일 출처 표시 (예: "경력")
+    용어 사전(term_index)은 프로세스가 공유하는 객체이므로 세션 상태에 들고 있지 않고 호출할 때 받는다.
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.docs = []  # 문서 번호 -> (키, 라벨, 본문 해시)
+        self.rows = {}  # 키 -> 현재 문서 번호
+        self.synced_turns = 0
+        self.vocabulary = {}  # 토큰 -> 단어 id
+        self._dead = 0
+        self._lengths = np.zeros(8, dtype=np.float32)
+        self._alive = np.zeros(8, dtype=bool)
+        self._indices = np.zeros(64, dtype=np.uint32)
+        self._counts = np.zeros(64, dtype=np.uint16)
+        self._doc_of = np.zeros(64, dtype=np.int32)
+        self._size = 0
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _token_ids(self, tokens, add=False):
+        """토큰 -> 단어 id - add=False이면 사전에 없는 토큰(어느 문서에도 없는 단어)은 뺌"""
+        vocabulary = self.vocabulary
+        if add:
+            return np.fromiter(
+                (vocabulary.setdefault(token, len(vocabulary)) for token in tokens), dtype=np.uint32, count=len(tokens),
+            )
+        return np.array([vocabulary[token] for token in tokens if token in vocabulary], dtype=np.uint32)
+
+    def add(self, key, label, text, term_index=None):
+        """문서 추가 - 같은 키의 문서가 있으면 지우고 새로 넣음"""
+        self.remove(key)
+        tokens = tokenize(text, term_index)
+        if not tokens:
+            return
+        ids, counts = np.unique(self._token_ids(tokens, add=True), return_counts=True)
+        row = len(self.docs)
+        self.docs.append((key, label, hash(text)))
+        self.rows[key] = row
+
+        self._lengths = _grow(self._lengths, row + 1)
+        self._lengths[row] = len(tokens)
+        self._alive = _grow(self._alive, row + 1)
+        self._alive[row] = True
+
+        end = self._size + len(ids)
+        self._indices = _grow(self._indices, end)
+        self._counts = _grow(self._counts, end)
+        self._doc_of = _grow(self._doc_of, end)
+        self._indices[self._size:end] = ids
+        self._counts[self._size:end] = counts
+        self._doc_of[self._size:end] = row
+        self._size = end
+
+    def remove(self, key):
+        row = self.rows.pop(key, None)
+        if row is None:
+            return
+        self._alive[row] = False
+        self._dead += 1
+        if self._dead >= COMPACT_MIN_DEAD and self._dead > len(self.rows):
+            self._compact()
+
+    def _compact(self):
+        """지운 문서의 행/위치와 살아 있는 문서에 없는 단어를 빼고 배열을 다시 만듦"""
+        rows = len(self.docs)
+        alive = self._alive[:rows]
+        renumber = np.cumsum(alive) - 1
+        keep = alive[self._doc_of[:self._size]]
+        indices = self._indices[:self._size][keep]
+        # 단어 id는 사전에 넣은 순서대로 매기므로, 쓰이는 id를 작은 것부터 0, 1, ...로 다시 매기면
+        # 사전 순서를 그대로 두고 번호만 당기면 됨
+        used, indices = np.unique(indices, return_inverse=True)
+        used = set(used.tolist())
+
+        self.docs = [doc for doc, live in zip(self.docs, alive) if live]
+        self.rows = {key: int(renumber[row]) for key, row in self.rows.items()}
+        self.vocabulary = {
+            token: i for i, token in enumerate(token for token, id_ in self.vocabulary.items() if id_ in used)
+        }
+        self._lengths = self._lengths[:rows][alive]
+        self._alive = np.ones(len(self.docs), dtype=bool)
+        self._indices = indices.astype(np.uint32)
+        self._counts = self._counts[:self._size][keep]
+        self._doc_of = renumber[self._doc_of[:self._size][keep]].astype(np.int32)
+        self._size = len(self._indices)
+        self._dead = 0
+
+    def search(self, query, k=4, exclude=None, term_index=None, min_ratio=0.3):
+        """질문과 관련된 문서 상위 k개 [(키, 라벨, 점수)]
+
+        - exclude: 키 -> True이면 뺄 문서
+        - min_ratio: 가장 높은 점수의 이 비율보다 낮은 문서는 관련이 적다고 보고 뺌
+        """
+        ids = self._token_ids(tokenize(query, term_index))
+        if not len(ids) or not self.rows or k <= 0:
+            return []
+        size = self._size
+        rows = len(self.docs)
+        positions = np.isin(self._indices[:size], ids) & self._alive[self._doc_of[:size]]
+        doc_of = self._doc_of[:size][positions]
+        counts = self._counts[:size][positions]
+        # 문서마다 단어 id가 한 번씩만 있으므로 고른 위치에서 id별 개수가 곧 문서 빈도
+        _, inverse, df = np.unique(self._indices[:size][positions], return_inverse=True, return_counts=True)
+        df = df[inverse]
+
+        alive = self._alive[:rows]
+        total = alive.sum()
+        lengths = self._lengths[:rows]
+        average = lengths[alive].mean()
+        idf = np.log1p((total - df + 0.5) / (df + 0.5))
+        norm = self.k1 * (1 - self.b + self.b * lengths[doc_of] / average)
+        scores = np.bincount(doc_of, weights=idf * counts * (self.k1 + 1) / (counts + norm), minlength=rows)
+
+        results = []
+        for row in np.argsort(-scores, kind="stable"):
+            if scores[row] <= 0 or len(results) >= k or (results and scores[row] < results[0][2] * min_ratio):
+                break
+            key, label, _ = self.docs[row]
+            if exclude is not None and exclude(key):
+                continue
+            results.append((key, label, float(scores[row])))
+        return results
+
+    def sync(self, chat_history, resume_data, step_starts, labels, term_index=None):
+        """새 답변과 바뀐 추출 필드를 색인
+
+        - step_starts: {단계: 시작한 chat_history 인덱스} (답변의 단계를 정함)
+        - labels: {단계 또는 주제: 표시 이름}
+        """
+        if self.synced_turns > len(chat_history):
+            # 세션을 새로 시작해 대화가 줄어든 경우 처음부터 다시 색인
+            self.__init__(self.k1, self.b)
+        starts = sorted(step_starts.items(), key=lambda item: item[1])
+        for i in range(self.synced_turns, len(chat_history)):
+            sender, msg = chat_history[i]
+            if sender == Sender.USER and msg:
+                step = turn_step(starts, i)
+                self.add(("turn", i), labels.get(step, ""), msg, term_index)
+        self.synced_turns = len(chat_history)
+
+        seen = set()
+        for topic, values in (resume_data.get("structured") or {}).items():
+            for name, value in (values or {}).items():
+                if not value:
+                    continue
+                text = field_text(name, value)
+                key = ("field", topic, name)
+                seen.add(key)
+                row = self.rows.get(key)
+                if row is None or self.docs[row][2] != hash(text):
+                    self.add(key, labels.get(topic, topic), text, term_index)
+        for key in [key for key in self.rows if key[0] == "field" and key not in seen]:
+            self.remove(key)
+
+    def stats(self):
+        return {
+            "documents": len(self.rows),
+            "deleted": self._dead,
+            "postings": self._size,
+            "vocabulary": len(self.vocabulary),
+            "bytes": sum(array.nbytes for array in (
+                self._lengths, self._alive, self._indices, self._counts, self._doc_of)),
+        }
+
+
+def field_text(name, value):
+    return f"{name}: {', '.join(map(str, value)) if isinstance(value, list) else value}"
+
+
+def document_text(key, chat_history, resume_data):
+    """검색 결과 키 -> 본문 (메시지는 chat_history에서, 추출 필드는 resume_data에서 읽음)"""
+    if key[0] == "turn":
+        return chat_history[key[1]][1]
+    _, topic, name = key
+    return field_text(name, resume_data["structured"][topic][name])
+
+
+def turn_step(starts, index):
+    """chat_history 인덱스가 속한 단계 - starts: 시작 인덱스 순으로 정렬한 [(단계, 시작 인덱스)]"""
+    step = None
+    for candidate, start in starts:
+        if start > index:
+            break
+        step = candidate
+    return step
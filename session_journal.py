@@ -0,0 +1,367 @@
+"""세션 저널 - 인터뷰 상태를 SQLite(WAL)에 추가 전용 기록으로 남겨 재시작 후 복원
+
+스크립트 실행이 끝날 때마다 session_state에서 바뀐 키만 짧은 JSON 기록으로 남긴다.
+- {"k": 키, "v": 값}: 값 전체 교체
+- {"k": 키, "a": [항목, ...]}: 목록 끝에 추가 (chat_history처럼 계속 늘어나는 목록)
+- {"k": 키, "d": 1}: 키 삭제
+
+기록은 메모리 버퍼에 모았다가 백그라운드 스레드가 flush_interval마다 한 트랜잭션으로
+쓴다. 세션별 기록이 snapshot_every개 쌓이면 전체 상태 스냅샷을 남기고 그 이전 기록은
+지운다. 복원은 "마지막 스냅샷 + 이후 기록"을 순서대로 적용한다.
+
+보관 기간
+- delete(): 세션의 스냅샷과 기록을 모두 지움 ("처음으로 돌아가기")
+- ttl: 마지막 기록 후 이 시간(초)이 지난 세션은 백그라운드 스레드가 purge_interval마다 지움.
+  지운 세션이 다시 기록하면 다음 track()에서 전체 상태를 새로 남긴다.
+
+세션 ID는 추측할 수 없는 토큰으로, URL의 ?resume= 값으로 쓰여 새로고침이나
+서버 재시작 후에도 같은 단계로 돌아온다.
+"""
+import hashlib
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+# 지운 세션을 기억하는 시간(초) - 지우기 전에 버퍼에서 꺼낸 기록을 쓰는 flush가 끝날 때까지면 충분
+DELETED_GRACE = 60.0
+
+# 정수 키 딕셔너리(대화 메모리의 단계별 인덱스 등)를 JSON으로 보존하기 위한 표시
+_INT_KEYS = "__int_keys__"
+
+
+def _encode(value):
+    if isinstance(value, dict):
+        if any(not isinstance(key, str) for key in value):
+            return {_INT_KEYS: [[key, _encode(item)] for key, item in value.items()]}
+        return {key: _encode(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict):
+        if _INT_KEYS in value and len(value) == 1:
+            return {key: _decode(item) for key, item in value[_INT_KEYS]}
+        return {key: _decode(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    return value
+
+
+def dumps(value):
+    return json.dumps(_encode(value), ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def loads(text):
+    return _decode(json.loads(text))
+
+
+def _digest(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def apply_record(state, record):
+    key = record["k"]
+    if "d" in record:
+        state.pop(key, None)
+    elif "a" in record:
+        state.setdefault(key, []).extend(record["a"])
+    else:
+        state[key] = record["v"]
+
+
+class SessionJournal:
+    """세션 상태 저널
+
+    - keys: 저장할 session_state 키 목록
+    - append_keys: 끝에 추가만 되는 목록 키 (추가된 항목만 기록)
+    - tuple_keys: 복원 시 항목을 튜플로 되돌릴 목록 키 (chat_history의 (보낸 사람, 메시지))
+    """
+
+    def __init__(self, path, keys, append_keys=(), tuple_keys=(), flush_interval=0.2, snapshot_every=50,
+                 ttl=None, purge_interval=3600):
+        self.path = path
+        self.keys = tuple(keys)
+        self.append_keys = set(append_keys)
+        self.tuple_keys = set(tuple_keys)
+        self.flush_interval = flush_interval
+        self.snapshot_every = snapshot_every
+        self.ttl = ttl
+        self.purge_interval = purge_interval
+        self._buffer = []
+        self._seq = {}
+        self._deleted = {}  # 지운 세션 -> 지운 시각 - 이미 버퍼에서 꺼낸 기록이 뒤늦게 쓰이지 않도록 함
+        self._expired = set()  # 보관 기간이 지나 지운 세션 - 다시 기록하면 전체 상태부터 남김
+        self._last_purge = 0.0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._counters = {"records": 0, "snapshots": 0, "flushes": 0, "restores": 0, "deletes": 0, "expired": 0}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS session_snapshots (
+                session_id TEXT PRIMARY KEY,
+                seq INTEGER NOT NULL,
+                state TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS session_journal (
+                session_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                record TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (session_id, seq)
+            );
+            """
+        )
+        self._conn.commit()
+
+        self._writer = threading.Thread(target=self._run, name="session-journal", daemon=True)
+        self._writer.start()
+
+    @staticmethod
+    def new_session_id():
+        return secrets.token_urlsafe(16)
+
+    # 잠금 순서: 두 잠금이 모두 필요하면 항상 self._write_lock을 먼저 잡는다.
+    # self._lock을 잡은 채로 self._write_lock을 기다리지 않도록 DB 조회는 self._lock 밖에서 한다.
+
+    def _stored_seq(self, session_id):
+        """DB에 저장된 세션의 마지막 seq (없으면 0)"""
+        with self._write_lock:
+            row = self._conn.execute(
+                "SELECT MAX(seq) FROM (SELECT seq FROM session_journal WHERE session_id = ? "
+                "UNION ALL SELECT seq FROM session_snapshots WHERE session_id = ?)",
+                (session_id, session_id),
+            ).fetchone()
+        return row[0] or 0
+
+    def track(self, session_id, state, tracker, write=True):
+        """state에서 지난 호출 이후 바뀐 키를 기록
+
+        tracker는 세션별 plain dict(session_state에 보관)로, 키별 다이제스트와
+        목록 길이를 기억한다. write=False면 현재 상태를 기준점으로만 삼는다.
+        """
+        digests = tracker.setdefault("digests", {})
+        lengths = tracker.setdefault("lengths", {})
+        records = []
+        for key in self.keys:
+            if key not in state:
+                if key in digests:
+                    del digests[key]
+                    lengths.pop(key, None)
+                    records.append({"k": key, "d": 1})
+                continue
+            value = state[key]
+            if key in self.append_keys and isinstance(value, list):
+                previous = lengths.get(key)
+                appended = previous is not None and previous <= len(value) and \
+                    (previous == 0 or _digest(dumps(value[previous - 1])) == digests.get(key))
+                if appended:
+                    if previous < len(value):
+                        records.append({"k": key, "a": value[previous:]})
+                elif previous is not None or value:
+                    records.append({"k": key, "v": value})
+                lengths[key] = len(value)
+                digests[key] = _digest(dumps(value[-1])) if value else None
+                continue
+            text = dumps(value)
+            digest = _digest(text)
+            if digests.get(key) != digest:
+                digests[key] = digest
+                records.append({"k": key, "v": value})
+
+        if not write or not records:
+            return 0
+        tracker["since_snapshot"] = tracker.get("since_snapshot", 0) + len(records)
+        snapshot = None
+        if tracker["since_snapshot"] >= self.snapshot_every:
+            tracker["since_snapshot"] = 0
+            snapshot = dumps({key: state[key] for key in self.keys if key in state})
+        now = time.time()
+        stored = None if session_id in self._seq else self._stored_seq(session_id)
+        with self._lock:
+            expired = session_id in self._expired
+            if expired:
+                self._expired.discard(session_id)
+            else:
+                seq = self._seq.get(session_id, stored or 0)
+                for record in records:
+                    seq += 1
+                    self._buffer.append(("record", session_id, seq, dumps(record), now))
+                if snapshot is not None:
+                    self._buffer.append(("snapshot", session_id, seq, snapshot, now))
+                self._seq[session_id] = seq
+                self._counters["records"] += len(records)
+        if expired:
+            # 보관 기간이 지나 지워진 세션 - 바뀐 키만이 아니라 전체 상태를 다시 남김
+            tracker.clear()
+            return self.track(session_id, state, tracker, write)
+        return len(records)
+
+    def flush(self):
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return 0
+        try:
+            with self._write_lock:
+                self._write(batch)
+                self._counters["flushes"] += 1
+        except sqlite3.Error:
+            # 쓰지 못한 기록은 버리지 않고 다음 flush에서 다시 시도
+            with self._lock:
+                self._buffer[:0] = batch
+            raise
+        return len(batch)
+
+    def _write(self, batch):
+        with self._conn:
+            for kind, session_id, seq, payload, created_at in batch:
+                if session_id in self._deleted:
+                    continue
+                if kind == "record":
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO session_journal (session_id, seq, record, created_at) VALUES (?, ?, ?, ?)",
+                        (session_id, seq, payload, created_at),
+                    )
+                else:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO session_snapshots (session_id, seq, state, updated_at) VALUES (?, ?, ?, ?)",
+                        (session_id, seq, payload, created_at),
+                    )
+                    self._conn.execute(
+                        "DELETE FROM session_journal WHERE session_id = ? AND seq <= ?",
+                        (session_id, seq),
+                    )
+                    self._counters["snapshots"] += 1
+
+    def load(self, session_id):
+        """마지막 스냅샷 + 이후 기록으로 상태를 복원 (없는 세션이면 None)
+
+        버퍼를 먼저 쓰되, 쓰지 못하면(예: database is locked) 저장된 내용에 버퍼의 기록을 더해 복원한다.
+        """
+        if not session_id:
+            return None
+        try:
+            self.flush()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            pending = [item for item in self._buffer if item[1] == session_id]
+        with self._write_lock:
+            row = self._conn.execute(
+                "SELECT seq, state FROM session_snapshots WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            base_seq, state = (row[0], loads(row[1])) if row else (0, {})
+            tail = self._conn.execute(
+                "SELECT seq, record FROM session_journal WHERE session_id = ? AND seq > ? ORDER BY seq",
+                (session_id, base_seq),
+            ).fetchall()
+        if not row and not tail and not pending:
+            return None
+        last_seq = base_seq
+        for seq, record in tail:
+            apply_record(state, loads(record))
+            last_seq = seq
+        for kind, _, seq, payload, _ in pending:
+            if kind == "snapshot" and seq >= last_seq:
+                state = loads(payload)
+            elif kind == "record" and seq > last_seq:
+                apply_record(state, loads(payload))
+            last_seq = max(last_seq, seq)
+        for key in self.tuple_keys:
+            if isinstance(state.get(key), list):
+                state[key] = [tuple(item) if isinstance(item, list) else item for item in state[key]]
+        with self._lock:
+            self._seq[session_id] = max(self._seq.get(session_id, 0), last_seq)
+            self._counters["restores"] += 1
+        return state
+
+    def delete(self, session_id):
+        """세션의 스냅샷과 기록을 모두 지움 (아직 쓰지 않은 기록도 버림)"""
+        if not session_id:
+            return
+        now = time.time()
+        with self._lock:
+            self._deleted = {s: at for s, at in self._deleted.items() if now - at < DELETED_GRACE}
+            self._deleted[session_id] = now
+            self._buffer = [item for item in self._buffer if item[1] != session_id]
+            self._seq.pop(session_id, None)
+        with self._write_lock:
+            self._delete_rows([session_id])
+            self._counters["deletes"] += 1
+
+    def _delete_rows(self, session_ids, before=None):
+        """세션들의 스냅샷과 기록을 지움 (before가 있으면 그 시각 이전에 쓴 것만)
+
+        호출 측에서 self._write_lock을 잡고 있어야 함
+        """
+        condition = "" if before is None else " AND {column} < ?"
+        extra = () if before is None else (before,)
+        with self._conn:
+            for table, column in (("session_snapshots", "updated_at"), ("session_journal", "created_at")):
+                self._conn.executemany(
+                    f"DELETE FROM {table} WHERE session_id = ?" + condition.format(column=column),
+                    [(s, *extra) for s in session_ids],
+                )
+
+    def purge_expired(self, now=None):
+        """마지막 기록 후 ttl이 지난 세션을 지우고 지운 세션 수를 반환"""
+        if not self.ttl:
+            return 0
+        now = time.time() if now is None else now
+        cutoff = now - self.ttl
+        with self._write_lock:
+            rows = self._conn.execute(
+                "SELECT session_id FROM (SELECT session_id, updated_at AS t FROM session_snapshots "
+                "UNION ALL SELECT session_id, created_at FROM session_journal) "
+                "GROUP BY session_id HAVING MAX(t) < ?",
+                (cutoff,),
+            ).fetchall()
+        with self._lock:
+            self._deleted = {s: at for s, at in self._deleted.items() if now - at < DELETED_GRACE}
+            # 버퍼에 기록이 남은 세션은 지금 활동 중이므로 지우지 않음
+            active = {item[1] for item in self._buffer}
+            expired = [session_id for session_id, in rows if session_id not in active]
+            for session_id in expired:
+                # 이 프로세스가 이어서 기록 중인 세션만 표시 (다른 세션은 다시 기록하기 전에 복원을 거침)
+                if self._seq.pop(session_id, None) is not None:
+                    self._expired.add(session_id)
+        if expired:
+            # 조회한 뒤에 다시 기록한 내용(전체 상태)은 남도록 cutoff 이전에 쓴 것만 지움
+            with self._write_lock:
+                self._delete_rows(expired, before=cutoff)
+                self._counters["expired"] += len(expired)
+        return len(expired)
+
+    def _run(self):
+        while not self._closed.wait(self.flush_interval):
+            try:
+                self.flush()
+                if self.ttl and time.time() - self._last_purge >= self.purge_interval:
+                    self._last_purge = time.time()
+                    self.purge_expired()
+            except sqlite3.Error:
+                pass
+
+    def close(self):
+        self._closed.set()
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["pending"] = len(self._buffer)
+            return stats
@@ -0,0 +1,237 @@
+"""세션 상태의 압축 표현과 메모리 계측
+
+대화 기록(chat_history)은 Message 레코드 목록이다.
+- Message는 (보낸 사람, 메시지) namedtuple이라 인스턴스 딕셔너리가 없고, 기존 튜플처럼
+  풀어 쓰거나(sender, msg = message) JSON 목록으로 저장된다
+- 보낸 사람은 Sender 열거형 값 하나를 모든 메시지가 함께 가리킨다. 저널/저장소에서 복원하면
+  JSON이 메시지마다 새 문자열을 만들므로 restore_history()가 열거형 값으로 되돌린다
+- 메시지 id는 chat_history 안의 위치다 (대화 메모리의 step_starts, 검색 인덱스의 키와 같음)
+
+resume_data/context의 답변 값(job_info의 answer_N, last_response 등)은 실행 중에는 대화
+메시지와 같은 문자열 객체를 가리키지만, 복원하면 JSON이 값마다 새 복사본을 만든다.
+share_strings()는 같은 내용의 문자열을 대화 메시지의 문자열 하나로 합친다. 저장 형식과
+이력서 데이터를 읽는 코드(다듬기, 렌더링, 검증, 배치 출력)는 바뀌지 않는다.
+
+메모리 계측
+- session_memory(): 세션 상태 키별 바이트 (여러 키가 함께 가리키는 객체는 처음 키에서 한 번만 셈)
+- SessionMemoryRegistry: 프로세스의 세션별 마지막 측정값과 마지막 활동 시각 - 세션 수,
+  합계, 가장 큰 세션, 유휴 세션과 프로세스 RSS를 보고 세션 상한/유휴 세션 정리 기준을 정함
+
+세션 정리
+- 다시 만들 수 있는 값(검색 인덱스, 검증 결과)은 세션 상태의 DerivedState 하나에 모은다
+- 레지스트리는 세션마다 DerivedState를 약한 참조로 들고 있다가, evict()가 유휴 세션과
+  세션 상한(max_sessions)을 넘은 오래된 세션의 DerivedState를 비운다. 다른 세션의 상태를
+  직접 건드리지 않고 딕셔너리만 비우므로, 그 세션이 다시 활동하면 필요한 값만 다시 만든다
+- 대화 기록, 이력서 데이터처럼 저장 대상인 값은 지우지 않는다 (디스크로 내보내기는 세션 저널이 맡음)
+"""
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import namedtuple
+from enum import Enum
+
+import numpy as np
+
+
+class Sender(str, Enum):
+    """메시지를 보낸 쪽 - 값은 기존 chat_history의 이모지와 같아서 문자열과 비교해도 같음"""
+
+    USER = "🧑"
+    BOT = "🤖"
+
+    def __str__(self):
+        return self.value
+
+    def __format__(self, spec):
+        return format(self.value, spec)
+
+
+Message = namedtuple("Message", ("sender", "text"))
+
+
+def user_message(text):
+    return Message(Sender.USER, text)
+
+
+def bot_message(text):
+    return Message(Sender.BOT, text)
+
+
+def restore_history(items):
+    """저장된 [(보낸 사람, 메시지)] -> Message 목록 (보낸 사람은 Sender 값 하나를 함께 가리킴)"""
+    return [Message(Sender(sender), text) for sender, text in items]
+
+
+def share_strings(state, keys=("resume_data", "context", "current_question", "collected_info")):
+    """keys 아래의 문자열 중 대화 메시지와 (또는 서로) 내용이 같은 것을 한 객체로 합침
+
+    목록/딕셔너리는 제자리에서 바꾼다. 합쳐진 문자열 수를 돌려준다.
+    """
+    pool = {}
+    for _, text in state.get("chat_history") or ():
+        if isinstance(text, str):
+            pool.setdefault(text, text)
+    shared = 0
+
+    def walk(value):
+        nonlocal shared
+        if isinstance(value, str):
+            canonical = pool.setdefault(value, value)
+            shared += canonical is not value
+            return canonical
+        if isinstance(value, dict):
+            for key, item in value.items():
+                value[key] = walk(item)
+        elif isinstance(value, list):
+            value[:] = [walk(item) for item in value]
+        return value
+
+    for key in keys:
+        if key in state:
+            state[key] = walk(state[key])
+    return shared
+
+
+def deep_sizeof(obj, seen=None):
+    """컨테이너와 객체 속성까지 포함한 대략적인 메모리 사용량(bytes) - seen에 든 객체는 세지 않음"""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, Enum):
+        return 0  # 열거형 값은 프로세스가 공유
+    if isinstance(obj, np.ndarray):
+        # 데이터를 가진 배열은 getsizeof에 데이터가 포함됨
+        return sys.getsizeof(obj) + (obj.nbytes if obj.base is not None else 0)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    elif hasattr(obj, "__slots__"):
+        size += sum(deep_sizeof(getattr(obj, name), seen) for name in obj.__slots__ if hasattr(obj, name))
+    return size
+
+
+def session_memory(state, keys):
+    """세션 상태 키별 메모리 - {"keys": {키: bytes}, "total": bytes}
+
+    keys 순서대로 세므로, 여러 키가 같은 문자열을 가리키면 앞의 키(chat_history)에만 들어간다.
+    """
+    seen = set()
+    sizes = {key: deep_sizeof(state[key], seen) for key in keys if key in state}
+    return {"keys": sizes, "total": sum(sizes.values())}
+
+
+def process_rss():
+    """프로세스의 현재 RSS(bytes) - /proc가 없으면 최대 RSS, 알 수 없으면 None"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class DerivedState(dict):
+    """세션 상태에 두는 다시 만들 수 있는 값 모음 (키 -> 값)
+
+    dict와 같지만 약한 참조를 만들 수 있어서 레지스트리가 세션을 붙잡지 않고 비울 수 있다.
+    """
+
+
+class SessionMemoryRegistry:
+    """프로세스의 세션별 메모리 기록 (모든 세션이 공유, 스레드 안전)
+
+    - idle_after: 이 시간(초) 동안 활동이 없으면 유휴 세션으로 봄
+    - ttl: 이 시간(초) 동안 기록이 없으면 닫힌 세션으로 보고 목록에서 지움
+    - max_sessions: 기록된 세션이 이보다 많으면 오래된 세션부터 DerivedState를 비움 (0이면 상한 없음)
+    """
+
+    def __init__(self, idle_after=600, ttl=3600, max_sessions=0):
+        self.idle_after = idle_after
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._sessions = {}  # 세션 id -> (bytes, 마지막 활동 시각)
+        self._derived = {}  # 세션 id -> (DerivedState 약한 참조, 그 bytes)
+        self.evicted = 0
+
+    def update(self, session_id, total_bytes, now=None, derived=None, derived_bytes=0):
+        """세션의 측정값 기록 - derived: 세션의 DerivedState (evict()가 비울 대상)"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._sessions[session_id] = (total_bytes, now)
+            if derived is not None:
+                self._derived[session_id] = (weakref.ref(derived), derived_bytes)
+            self._prune(now)
+
+    def forget(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._derived.pop(session_id, None)
+
+    def _prune(self, now):
+        for session_id in [s for s, (_, seen) in self._sessions.items() if now - seen > self.ttl]:
+            del self._sessions[session_id]
+            self._derived.pop(session_id, None)
+
+    def evict(self, now=None):
+        """유휴 세션과 상한을 넘은 오래된 세션의 DerivedState를 비움 - 비운 세션 id 목록
+
+        비운 세션의 기록된 bytes에서 DerivedState 몫을 뺀다 (다음 활동 때 다시 측정됨).
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            by_age = sorted(self._derived, key=lambda s: self._sessions.get(s, (0, 0))[1])
+            over = max(0, len(self._sessions) - self.max_sessions) if self.max_sessions else 0
+            targets = [
+                s for i, s in enumerate(by_age)
+                if i < over or now - self._sessions.get(s, (0, now))[1] > self.idle_after
+            ]
+            evicted = []
+            for session_id in targets:
+                ref, derived_bytes = self._derived.pop(session_id)
+                derived = ref()
+                if derived:
+                    derived.clear()
+                    evicted.append(session_id)
+                if session_id in self._sessions:
+                    total, seen = self._sessions[session_id]
+                    self._sessions[session_id] = (max(0, total - derived_bytes), seen)
+            self.evicted += len(evicted)
+        return evicted
+
+    def idle_sessions(self, now=None):
+        """유휴 세션 id 목록 (오래된 순) - 디스크로 내보낼 후보"""
+        now = time.time() if now is None else now
+        with self._lock:
+            idle = [(seen, s) for s, (_, seen) in self._sessions.items() if now - seen > self.idle_after]
+        return [s for _, s in sorted(idle)]
+
+    def report(self, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self._prune(now)
+            sizes = sorted(size for size, _ in self._sessions.values())
+            idle = [size for size, seen in self._sessions.values() if now - seen > self.idle_after]
+        return {
+            "sessions": len(sizes),
+            "total_bytes": sum(sizes),
+            "max_bytes": sizes[-1] if sizes else 0,
+            "p50_bytes": sizes[len(sizes) // 2] if sizes else 0,
+            "idle_sessions": len(idle),
+            "idle_bytes": sum(idle),
+            "evicted_sessions": self.evicted,
+            "rss_bytes": process_rss(),
+        }
@@ -0,0 +1,152 @@
+"""공유 세션 저장소 - 여러 앱 인스턴스(레플리카)가 같은 인터뷰 상태를 이어받기 위한 저장소
+
+세션 하나의 상태(resume_data, chat_history, collected_info, step/context 등)를 버전
+번호와 함께 한 덩어리로 저장한다. 저장할 때는 읽어 온 버전(expected_version)이 아직
+최신인 경우에만 버전을 1 올려 쓰고, 그 사이 다른 실행이 먼저 썼다면 VersionConflict를
+낸다(낙관적 동시성 제어). 호출 측은 최신 상태를 다시 읽어 이어가면 된다.
+
+SESSION_STORE_URL 형식
+- sqlite:///경로 또는 파일 경로: 로컬/공유 디스크의 SQLite 파일 (테스트/단일 노드용)
+- redis://호스트:포트/DB: Redis (redis 패키지 필요, 여러 노드에서 공유)
+"""
+import os
+import sqlite3
+import threading
+import time
+
+from session_journal import dumps, loads
+
+
+class SessionStoreError(RuntimeError):
+    """세션 저장소 설정이 잘못되었거나 필요한 패키지가 없는 경우"""
+
+
+class VersionConflict(RuntimeError):
+    """읽은 뒤 다른 실행이 먼저 세션을 저장한 경우"""
+
+
+class SessionStore:
+    """세션 저장소 공통 인터페이스"""
+
+    def version(self, session_id):
+        """저장된 버전 (없으면 0)"""
+        raise NotImplementedError
+
+    def load(self, session_id):
+        """(상태 dict, 버전) - 없으면 (None, 0)"""
+        raise NotImplementedError
+
+    def save(self, session_id, state, expected_version):
+        """expected_version이 최신일 때만 저장하고 새 버전을 반환"""
+        raise NotImplementedError
+
+
+class SQLiteSessionStore(SessionStore):
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        # 여러 프로세스가 같은 파일을 쓰므로 잠금 대기 시간을 넉넉히 둠
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                state TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def version(self, session_id):
+        with self._lock:
+            row = self._conn.execute("SELECT version FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return row[0] if row else 0
+
+    def load(self, session_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, state FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        if not row:
+            return None, 0
+        return loads(row[1]), row[0]
+
+    def save(self, session_id, state, expected_version):
+        text = dumps(state)
+        now = time.time()
+        with self._lock, self._conn:
+            if expected_version == 0:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO sessions (session_id, version, state, updated_at) VALUES (?, 1, ?, ?)",
+                    (session_id, text, now),
+                )
+            else:
+                cursor = self._conn.execute(
+                    "UPDATE sessions SET version = version + 1, state = ?, updated_at = ? "
+                    "WHERE session_id = ? AND version = ?",
+                    (text, now, session_id, expected_version),
+                )
+        if cursor.rowcount == 0:
+            raise VersionConflict(f"세션 {session_id}이(가) 버전 {expected_version} 이후에 변경되었습니다")
+        return expected_version + 1
+
+
+class RedisSessionStore(SessionStore):
+    """세션마다 해시 하나(version, state)를 쓰고 WATCH/MULTI로 버전을 확인"""
+
+    def __init__(self, url, prefix="resume-bot:session:", ttl=7 * 24 * 60 * 60):
+        try:
+            import redis
+        except ImportError as e:
+            raise SessionStoreError("Redis 세션 저장소를 쓰려면 redis 패키지가 필요합니다 (pip install redis)") from e
+        self._redis_module = redis
+        self._redis = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def _key(self, session_id):
+        return f"{self.prefix}{session_id}"
+
+    def version(self, session_id):
+        return int(self._redis.hget(self._key(session_id), "version") or 0)
+
+    def load(self, session_id):
+        version, state = self._redis.hmget(self._key(session_id), "version", "state")
+        if state is None:
+            return None, 0
+        return loads(state.decode("utf-8")), int(version)
+
+    def save(self, session_id, state, expected_version):
+        key = self._key(session_id)
+        text = dumps(state)
+        with self._redis.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                current = int(pipe.hget(key, "version") or 0)
+                if current != expected_version:
+                    raise VersionConflict(f"세션 {session_id}이(가) 버전 {expected_version} 이후에 변경되었습니다")
+                pipe.multi()
+                pipe.hset(key, mapping={"version": expected_version + 1, "state": text})
+                pipe.expire(key, self.ttl)
+                pipe.execute()
+            except self._redis_module.WatchError as e:
+                raise VersionConflict(f"세션 {session_id}을(를) 저장하는 중 다른 실행이 먼저 저장했습니다") from e
+        return expected_version + 1
+
+
+def create_session_store(url=None):
+    """SESSION_STORE_URL 설정에 맞는 저장소 (설정이 없으면 None)"""
+    url = url if url is not None else os.getenv("SESSION_STORE_URL", "")
+    if not url:
+        return None
+    if url.startswith(("redis://", "rediss://")):
+        return RedisSessionStore(url, ttl=int(os.getenv("SESSION_STORE_TTL", str(7 * 24 * 60 * 60))))
+    if url.startswith("sqlite:///"):
+        url = url[len("sqlite:///"):]
+    return SQLiteSessionStore(url)
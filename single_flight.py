@@ -0,0 +1,163 @@
+"""동일한 요청이 동시에 들어오면 한 번만 실행하고 결과를 공유하는 single-flight 유틸리티
+
+스트리밍 요청(stream)은 leader가 받은 조각을 차례로 모아 두고, 같은 키로 들어온 요청은
+처음 조각부터 다시 받은 뒤 leader가 새 조각을 받는 대로 이어 받는다.
+"""
+import threading
+
+
+class SingleFlightTimeout(TimeoutError):
+    """대기 중이던 요청이 제한 시간 안에 결과를 받지 못한 경우"""
+
+
+class SingleFlightAbandoned(RuntimeError):
+    """leader가 스트림을 끝까지 받지 않고 그만둔 경우"""
+
+
+class _Call:
+    __slots__ = ("event", "result", "error", "waiters")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class _StreamCall:
+    __slots__ = ("condition", "chunks", "done", "complete", "error", "waiters")
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.chunks = []
+        self.done = False
+        self.complete = False
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """키별로 진행 중인 호출을 하나로 합치는 클래스
+
+    처음 들어온 호출(leader)이 fn을 실행하고, 같은 키로 뒤따라 들어온 호출들은
+    leader의 결과(또는 예외)를 그대로 받는다. 결과는 저장하지 않으므로
+    호출이 끝난 뒤 들어온 요청은 다시 실행된다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._streams = {}
+        self._counters = {"executed": 0, "shared": 0, "timeouts": 0}
+
+    def do(self, key, fn, timeout=None):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self._counters["executed"] += 1
+            else:
+                call.waiters += 1
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.event.set()
+        else:
+            finished = call.event.wait(timeout)
+            with self._lock:
+                call.waiters -= 1
+                if finished:
+                    self._counters["shared"] += 1
+                else:
+                    self._counters["timeouts"] += 1
+            if not finished:
+                raise SingleFlightTimeout(f"{timeout}초 안에 진행 중인 요청이 끝나지 않았습니다")
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stream(self, key, fn, timeout=None):
+        """fn()이 돌려주는 조각 이터러블을 같은 키의 요청끼리 공유하는 제너레이터
+
+        timeout은 뒤따라 온 요청이 다음 조각을 기다리는 최대 시간(초)이다.
+        """
+        with self._lock:
+            call = self._streams.get(key)
+            leader = call is None
+            if leader:
+                call = _StreamCall()
+                self._streams[key] = call
+                self._counters["executed"] += 1
+            else:
+                call.waiters += 1
+        if leader:
+            yield from self._lead(key, call, fn)
+        else:
+            yield from self._follow(call, timeout)
+
+    def _lead(self, key, call, fn):
+        try:
+            for chunk in fn():
+                with call.condition:
+                    call.chunks.append(chunk)
+                    call.condition.notify_all()
+                yield chunk
+            call.complete = True
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._streams[key]
+            with call.condition:
+                call.done = True
+                call.condition.notify_all()
+
+    def _follow(self, call, timeout):
+        index = 0
+        try:
+            while True:
+                with call.condition:
+                    ready = call.condition.wait_for(lambda: call.done or len(call.chunks) > index, timeout)
+                    chunks = call.chunks[index:]
+                    done = call.done
+                if not ready:
+                    with self._lock:
+                        self._counters["timeouts"] += 1
+                    raise SingleFlightTimeout(f"{timeout}초 안에 진행 중인 스트림의 다음 조각이 오지 않았습니다")
+                index += len(chunks)
+                yield from chunks
+                if done:
+                    break
+        finally:
+            with self._lock:
+                call.waiters -= 1
+        if call.error is not None:
+            raise call.error
+        if not call.complete:
+            raise SingleFlightAbandoned("진행 중이던 스트림이 끝나기 전에 중단되었습니다")
+        with self._lock:
+            self._counters["shared"] += 1
+
+    def waiters(self, key):
+        """해당 키의 진행 중인 호출을 기다리는 요청 수"""
+        with self._lock:
+            call = self._calls.get(key) or self._streams.get(key)
+            return call.waiters if call else 0
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            calls = [*self._calls.values(), *self._streams.values()]
+            stats["in_flight"] = len(calls)
+            stats["waiting"] = sum(call.waiters for call in calls)
+            return stats
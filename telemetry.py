@@ -0,0 +1,280 @@
+"""대화 파이프라인 계측 - 단계별 스팬, 카운터, Prometheus 텍스트/JSON 로그 내보내기
+
+- span(stage): 코드 구간의 소요 시간을 resume_bot_stage_duration_seconds{stage=...}에 기록.
+  trace 안에서 열린 스팬은 턴 기록에도 (이름, 시작 오프셋, 소요 시간, 속성)으로 남는다.
+- trace(name): 사용자 턴 하나를 묶는 최상위 스팬. 끝나면 턴 기록 전체를 JSON 한 줄로 로그에 남김
+- inc/observe/set_gauge: 카운터, 히스토그램, 게이지
+- percentiles(): 최근 표본으로 계산한 p50/p95/p99 (용량 계획용)
+- render_prometheus(): Prometheus 텍스트 형식 (HTTP 엔드포인트/스크랩 파일 공용)
+
+라벨은 키워드 인자로 받는다. 지표 이름 앞에는 namespace가 붙는다.
+"""
+import bisect
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 지연 시간 히스토그램 버킷(초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# 개수/크기 히스토그램 버킷 (토큰 수, 메시지 수, 실행 횟수 등)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+# 메모리 히스토그램 버킷(bytes) - 1KB ~ 16MB
+BYTES_BUCKETS = tuple(1024 * 4 ** n for n in range(8))
+
+logger = logging.getLogger("resume_bot.trace")
+
+_current_trace = contextvars.ContextVar("resume_bot_trace", default=None)
+
+
+def _label_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        name + '="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum", "samples")
+
+    def __init__(self, buckets, sample_size):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.samples = deque(maxlen=sample_size)
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.samples.append(value)
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+class Telemetry:
+    """프로세스 단위 지표 저장소 (모든 세션이 공유, 스레드 안전)
+
+    - sample_size: 백분위수 계산에 쓰는 시계열별 최근 표본 수
+    - help: {지표 이름: 설명} - Prometheus HELP 줄에 사용
+    """
+
+    def __init__(self, namespace="resume_bot", sample_size=2048, help=None):
+        self.namespace = namespace
+        self.sample_size = sample_size
+        self.help = dict(help or {})
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+
+    def _name(self, name):
+        return f"{self.namespace}_{name}" if self.namespace else name
+
+    def inc(self, name, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def set_gauge(self, name, value, **labels):
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name, value, buckets=DEFAULT_BUCKETS, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(buckets, self.sample_size)
+            histogram.observe(value)
+
+    def record_span(self, stage, seconds, start=None, **attrs):
+        """이미 측정한 구간 기록 (스트리밍처럼 with 블록으로 감싸기 어려운 경우)"""
+        self.observe("stage_duration_seconds", seconds, stage=stage)
+        trace = _current_trace.get()
+        if trace is not None:
+            start = time.perf_counter() - seconds if start is None else start
+            trace["spans"].append({
+                "stage": stage,
+                "start": round(start - trace["_start"], 6),
+                "seconds": round(seconds, 6),
+                **attrs,
+            })
+
+    @contextmanager
+    def span(self, stage, **attrs):
+        """구간 소요 시간 기록 - yield한 dict에 넣은 값은 턴 기록의 속성으로 남음"""
+        start = time.perf_counter()
+        try:
+            yield attrs
+        finally:
+            self.record_span(stage, time.perf_counter() - start, start, **attrs)
+
+    def timed(self, stage):
+        """함수 전체를 span으로 감싸는 데코레이터"""
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+
+        return decorator
+
+    @contextmanager
+    def trace(self, name, **attrs):
+        """턴 하나를 묶는 최상위 스팬 - 끝나면 JSON 로그 한 줄을 남김"""
+        trace = {"trace": name, "_start": time.perf_counter(), "spans": [], **attrs}
+        token = _current_trace.set(trace)
+        started_at = time.time()
+        try:
+            with self.span(name):
+                yield trace
+        finally:
+            _current_trace.reset(token)
+            spans = trace.pop("spans")
+            trace.pop("_start")
+            root = spans.pop()
+            record = {"ts": round(started_at, 3), **trace, "seconds": root["seconds"], "spans": spans}
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(json.dumps(record, ensure_ascii=False, default=str))
+
+    def annotate(self, **attrs):
+        """현재 턴 기록에 속성 추가 (trace 밖이면 무시)"""
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.update(attrs)
+
+    def percentiles(self, name, ps=(50, 95, 99)):
+        """[(라벨 dict, 표본 수, {p: 값})] - 최근 표본 기준"""
+        with self._lock:
+            series = [(key, list(histogram.samples), histogram.count) for key, histogram in self._histograms.get(name, {}).items()]
+        rows = []
+        for key, samples, count in sorted(series):
+            samples.sort()
+            rows.append((dict(key), count, {p: percentile(samples, p) for p in ps}))
+        return rows
+
+    def counter_values(self, name):
+        with self._lock:
+            return {key: value for key, value in self._counters.get(name, {}).items()}
+
+    def render_prometheus(self):
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            gauges = {name: dict(series) for name, series in self._gauges.items()}
+            histograms = {
+                name: {key: (h.buckets, list(h.counts), h.count, h.sum) for key, h in series.items()}
+                for name, series in self._histograms.items()
+            }
+        lines = []
+
+        def header(name, kind):
+            full = self._name(name)
+            if name in self.help:
+                lines.append(f"# HELP {full} {self.help[name]}")
+            lines.append(f"# TYPE {full} {kind}")
+            return full
+
+        for name in sorted(counters):
+            full = header(name, "counter")
+            for key, value in sorted(counters[name].items()):
+                lines.append(f"{full}{_format_labels(key)} {value}")
+        for name in sorted(gauges):
+            full = header(name, "gauge")
+            for key, value in sorted(gauges[name].items()):
+                lines.append(f"{full}{_format_labels(key)} {value}")
+        for name in sorted(histograms):
+            full = header(name, "histogram")
+            for key, (buckets, counts, count, total) in sorted(histograms[name].items()):
+                cumulative = 0
+                for bound, bucket_count in zip(buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{full}_bucket{_format_labels(key, [('le', repr(float(bound)))])} {cumulative}")
+                lines.append(f"{full}_bucket{_format_labels(key, [('le', '+Inf')])} {count}")
+                lines.append(f"{full}_sum{_format_labels(key)} {total}")
+                lines.append(f"{full}_count{_format_labels(key)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def write_file(self, path):
+        """스크랩 파일(node_exporter textfile collector 등) - 임시 파일에 쓰고 교체"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus())
+        os.replace(temp, path)
+
+
+def serve_metrics(telemetry, port, host="0.0.0.0"):
+    """/metrics 경로로 Prometheus 텍스트를 제공하는 HTTP 서버를 백그라운드 스레드로 실행"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = telemetry.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def export_file_periodically(telemetry, path, interval=15.0):
+    """interval초마다 스크랩 파일을 갱신하는 백그라운드 스레드"""
+
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                telemetry.write_file(path)
+            except OSError:
+                pass
+
+    thread = threading.Thread(target=run, name="metrics-file", daemon=True)
+    thread.start()
+    return thread
+
+
+def configure_json_log(path):
+    """턴 기록 JSON 로그 출력 대상 설정 ("-"이면 표준 오류, 빈 값이면 끔)"""
+    if not path:
+        return
+    handler = logging.StreamHandler() if path == "-" else logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
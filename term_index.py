@@ -0,0 +1,186 @@
+"""기술/직무 용어 사전 인덱스 - Aho-Corasick 오토마톤으로 한 번에 모든 용어를 찾는다
+
+사전(JSON)은 분류별로 "대표 이름: [별칭, ...]"을 담는다.
+    {"version": 1, "terms": {"framework": {"Spring": ["스프링", "spring"]}, ...}}
+
+대표 이름과 별칭은 모두 정규화(NFKC, 소문자, 연속 공백은 한 칸)한 뒤 하나의
+오토마톤으로 컴파일한다. 메시지 한 개는 사전 크기와 관계없이 글자 수에 비례하는
+한 번의 순회로 검사한다.
+- 영문/숫자로 시작하거나 끝나는 용어는 앞뒤가 영문/숫자가 아닐 때만 인정
+  ("Java"가 "JavaScript" 안에서 잡히지 않도록). 한글은 조사가 붙으므로 경계를 보지 않음
+- 두 글자 이하의 영문 대표 이름("Go", "R", "C")은 일반 단어와 겹치므로 별칭에 직접
+  적은 경우에만 찾음
+- 겹치는 후보는 가장 왼쪽, 가장 긴 것을 우선 ("자바스크립트" 안의 "자바"는 버림)
+"""
+import json
+import os
+import unicodedata
+from collections import deque
+
+DEFAULT_DICTIONARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "tech_terms.json")
+
+# 분류 키 -> 화면/프롬프트 표시 이름 (기술 분류는 default 질문 팩의 skills 필드명과 같음)
+CATEGORY_LABELS = {
+    "role": "직무",
+    "domain": "분야",
+    "language": "언어",
+    "framework": "프레임워크",
+    "data_infra": "DB/인프라",
+    "tool": "기타 도구",
+}
+TECH_CATEGORIES = ("language", "framework", "data_infra", "tool")
+
+
+class TermDictionaryError(ValueError):
+    """용어 사전 파일 형식이 잘못된 경우"""
+
+
+class TermMatch:
+    __slots__ = ("name", "category", "start", "end")
+
+    def __init__(self, name, category, start, end):
+        self.name = name
+        self.category = category
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"TermMatch({self.name!r}, {self.category!r}, {self.start}, {self.end})"
+
+
+def _is_word_char(ch):
+    return ch.isascii() and ch.isalnum()
+
+
+def normalize(text):
+    """(정규화된 문자열, 정규화된 글자별 원문 위치 목록)"""
+    chars, positions = [], []
+    previous_space = True
+    for i, ch in enumerate(text):
+        for n in unicodedata.normalize("NFKC", ch).casefold():
+            if n.isspace():
+                if previous_space:
+                    continue
+                n = " "
+            previous_space = n == " "
+            chars.append(n)
+            positions.append(i)
+    while chars and chars[-1] == " ":
+        chars.pop()
+        positions.pop()
+    return "".join(chars), positions
+
+
+class TermIndex:
+    """용어 -> (대표 이름, 분류) 사전을 컴파일한 Aho-Corasick 오토마톤"""
+
+    def __init__(self, terms):
+        """terms: {분류: {대표 이름: [별칭, ...]}}"""
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [None]  # 노드에서 끝나는 패턴: (패턴 길이, 대표 이름, 분류, 경계 검사 여부)
+        self._dict_link = [0]  # 실패 링크를 따라가며 만나는 가장 가까운 패턴 노드
+        self.term_count = 0
+        self.pattern_count = 0
+        for category, entries in terms.items():
+            if category not in CATEGORY_LABELS:
+                raise TermDictionaryError(f"알 수 없는 분류입니다: {category}")
+            for name, aliases in entries.items():
+                self.term_count += 1
+                patterns = aliases if len(name) <= 2 and name.isascii() else [name, *aliases]
+                for alias in patterns:
+                    self._add(alias, name, category)
+        self._build()
+
+    @classmethod
+    def from_file(cls, path=None):
+        path = path or DEFAULT_DICTIONARY_PATH
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise TermDictionaryError(f"용어 사전을 읽을 수 없습니다: {path} ({e})") from e
+        if not isinstance(data, dict) or not isinstance(data.get("terms"), dict):
+            raise TermDictionaryError(f"용어 사전에 terms 항목이 없습니다: {path}")
+        return cls(data["terms"])
+
+    def _add(self, alias, name, category):
+        pattern, _ = normalize(alias)
+        if not pattern:
+            return
+        node = 0
+        for ch in pattern:
+            next_node = self._goto[node].get(ch)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][ch] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(None)
+                self._dict_link.append(0)
+            node = next_node
+        # 같은 별칭이 여러 용어에 있으면 먼저 나온 것을 사용
+        if self._output[node] is None:
+            bounded = (_is_word_char(pattern[0]), _is_word_char(pattern[-1]))
+            self._output[node] = (len(pattern), name, category, bounded)
+            self.pattern_count += 1
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                link = self._goto[fail].get(ch, 0)
+                self._fail[child] = link = 0 if link == child else link
+                self._dict_link[child] = link if self._output[link] is not None else self._dict_link[link]
+                queue.append(child)
+
+    def _candidates(self, text):
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            match = node if self._output[node] is not None else self._dict_link[node]
+            while match:
+                length, name, category, (bound_start, bound_end) = self._output[match]
+                start = i - length + 1
+                if (not bound_start or start == 0 or not _is_word_char(text[start - 1])) and \
+                        (not bound_end or i + 1 == len(text) or not _is_word_char(text[i + 1])):
+                    yield start, i + 1, name, category
+                match = self._dict_link[match]
+
+    def find(self, text):
+        """겹치지 않는 용어 목록 (가장 왼쪽, 가장 긴 것 우선)"""
+        if not text:
+            return []
+        normalized, positions = normalize(text)
+        candidates = sorted(self._candidates(normalized), key=lambda c: (c[0], -c[1]))
+        matches = []
+        covered = 0
+        for start, end, name, category in candidates:
+            if start < covered:
+                continue
+            matches.append(TermMatch(name, category, positions[start], positions[end - 1] + 1))
+            covered = end
+        return matches
+
+    def terms(self, text, categories=None):
+        """등장 순서대로 중복 없는 대표 이름 목록"""
+        seen = {}
+        for match in self.find(text):
+            if categories is None or match.category in categories:
+                seen.setdefault(match.name, match.category)
+        return list(seen)
+
+    def group(self, text):
+        """{분류: [대표 이름, ...]}"""
+        grouped = {}
+        for match in self.find(text):
+            names = grouped.setdefault(match.category, [])
+            if match.name not in names:
+                names.append(match.name)
+        return grouped
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 앱 모듈은 저장소 최상위에 있으므로 어디서 pytest를 실행해도 import되도록 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,63 @@
+import json
+import sqlite3
+import threading
+
+import pytest
+
+import batch
+import interview
+from llm_backend import StubBackend
+from llm_cache import ResponseCache
+from question_packs import load_question_packs
+from term_index import TermIndex
+
+RECORD = {
+    "id": "c1",
+    "basic_info": {"name": "홍길동"},
+    "answers": {"job_info": ["백엔드 개발자"], "skills": ["Java, Spring"]},
+}
+
+
+class LockedCache(ResponseCache):
+    def get(self, key):
+        raise sqlite3.OperationalError("database is locked")
+
+    def set(self, key, value):
+        raise sqlite3.OperationalError("database is locked")
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    worker = {
+        "backend": StubBackend(latency=0),
+        "semaphore": threading.BoundedSemaphore(1),
+        "term_index": TermIndex.from_file(),
+        "packs": load_question_packs(),
+        "cache": ResponseCache(),
+    }
+    monkeypatch.setattr(batch, "_worker", worker)
+    return worker
+
+
+def test_duplicate_ids_do_not_overwrite_files(worker, tmp_path):
+    line = json.dumps(RECORD, ensure_ascii=False)
+    first = batch.process_candidate(1, line, ["txt"], "standard", str(tmp_path))
+    second = batch.process_candidate(2, line, ["txt"], "standard", str(tmp_path))
+    assert "error" not in first and "error" not in second
+    assert first["files"] != second["files"]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["1-c1.txt", "2-c1.txt"]
+
+
+def test_missing_fields_are_reported_per_topic(worker):
+    result = batch.process_candidate(1, json.dumps(RECORD, ensure_ascii=False), ["txt"], "standard", None)
+    assert isinstance(result["missing"], dict)
+    assert set(result["missing"]) <= {"job_info", "experience", "projects", "skills", "summary"}
+    assert all(result["missing"].values())
+
+
+def test_locked_cache_falls_back_to_model(worker, monkeypatch):
+    monkeypatch.setattr(interview, "LOCAL_COMPLETENESS", False)
+    worker["cache"] = LockedCache()
+    result = batch.process_candidate(1, json.dumps(RECORD, ensure_ascii=False), ["txt"], "standard", None)
+    assert "error" not in result
+    assert result["model_calls"] > 0
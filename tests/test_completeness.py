@@ -0,0 +1,51 @@
+from completeness import FieldDetector, assess, infer_kind, missing_question
+from term_index import TermIndex
+
+TERMS = TermIndex({"language": {"Java": ["자바"]}, "framework": {"Spring": ["스프링"]}})
+
+
+def detectors(*names):
+    return [FieldDetector(name) for name in names]
+
+
+def test_infer_kind():
+    assert infer_kind("근무 기간") == "period"
+    assert infer_kind("주요 성과") == "metric"
+    assert infer_kind("회사명") == "org"
+    assert infer_kind("사용 기술") == "terms"
+    assert infer_kind("담당 업무") == "text"
+
+
+def test_complete_answer_needs_no_model():
+    answer = "A사에서 2021.03 ~ 2023.02 동안 자바와 스프링으로 결제 API를 개발해 응답 시간을 40% 줄였습니다."
+    result = assess(detectors("회사명", "근무 기간", "사용 기술", "주요 성과"), [answer], TERMS.group(answer))
+    assert result.complete
+    assert result.missing == [] and result.ambiguous == []
+    assert result.evidence["사용 기술"] == ["Java", "Spring"]
+    assert result.evidence["근무 기간"] == "2021.03 ~ 2023.02"
+
+
+def test_missing_and_ambiguous_fields():
+    answer = "결제 시스템 성능을 많이 개선했어요"
+    result = assess(detectors("근무 기간", "주요 성과", "사용 기술"), [answer], TERMS.group(answer))
+    assert result.missing == ["근무 기간", "사용 기술"]
+    assert result.ambiguous == ["주요 성과"]
+    assert not result.complete
+    assert 0 < result.coverage < 1
+
+
+def test_known_values_count_as_filled():
+    result = assess(detectors("근무 기간"), ["잘 모르겠어요"], {}, known={"근무 기간": "2020 ~ 2022"})
+    assert result.complete
+
+
+def test_keywords_respect_word_boundary():
+    detector = FieldDetector("분석 도구", keywords=["GA"])
+    assert detector.score("Gradle을 썼어요", {})[0] == 0.0
+    assert detector.score("GA로 분석했어요", {}) == (1.0, ["GA"])
+
+
+def test_missing_question_by_kind():
+    fields = detectors("근무 기간", "담당 업무")
+    assert "언제부터" in missing_question(fields, "근무 기간")
+    assert missing_question(fields, "담당 업무") is None
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+import interview
+from conversation_memory import ConversationMemory
+from interview import analyze_response, new_collected_info, new_resume_data
+from question_packs import load_question_packs
+from session_model import user_message
+from term_index import TermIndex
+
+
+@pytest.fixture(scope="module")
+def packs():
+    return load_question_packs()
+
+
+@pytest.fixture(scope="module")
+def term_index():
+    return TermIndex.from_file()
+
+
+def new_state(packs, step=4):
+    state = {
+        "step": step,
+        "chat_history": [],
+        "resume_data": new_resume_data({"name": "홍길동"}),
+        "collected_info": new_collected_info(packs.default),
+        "context": {"current_topic": None},
+        "memory": {},
+    }
+    memory = ConversationMemory(state["memory"])
+    memory.start_step(step, 0)
+    return state, memory
+
+
+def answer(state, memory, text, topic, packs, term_index, generate, **options):
+    state["chat_history"].append(user_message(text))
+    return analyze_response(state, text, topic, generate, term_index, memory, packs, **options)
+
+
+def empty_extraction(prompt, schema):
+    return json.dumps({name: [] if spec.get("type") == "array" else None
+                       for name, spec in schema["properties"].items()}, ensure_ascii=False)
+
+
+def no_model(prompt, schema):
+    raise AssertionError("로컬 판정으로 끝나야 하는데 모델을 호출했습니다")
+
+
+def test_local_decision_skips_model(packs, term_index):
+    state, memory = new_state(packs)
+    decisions = []
+    complete, followup = answer(state, memory, "잘 모르겠어요", "experience", packs, term_index, no_model,
+                                on_decision=decisions.append)
+    assert not complete and followup
+    assert decisions == ["local_question"]
+
+
+def test_streamed_followup_is_returned_as_is(packs, term_index, monkeypatch):
+    monkeypatch.setattr(interview, "LOCAL_COMPLETENESS", False)
+    state, memory = new_state(packs)
+    stream = iter(["어느 회사", "에서 일하셨나요?"])
+    calls = []
+
+    def followup(previous, topic):
+        calls.append((previous, topic))
+        return stream
+
+    complete, result = answer(state, memory, "결제 시스템 성능을 개선했어요", "experience", packs, term_index,
+                              empty_extraction, followup=followup)
+    assert not complete
+    assert result is stream
+    assert calls == [("결제 시스템 성능을 개선했어요", "experience")]
+    assert state["collected_info"]["experience"] and not any(state["collected_info"]["experience"].values())
+
+
+def test_failed_followup_falls_back_to_pack_question(packs, term_index, monkeypatch):
+    monkeypatch.setattr(interview, "LOCAL_COMPLETENESS", False)
+    state, memory = new_state(packs)
+
+    def followup(previous, topic):
+        raise ConnectionError()
+
+    complete, result = answer(state, memory, "결제 시스템 성능을 개선했어요", "experience", packs, term_index,
+                              empty_extraction, followup=followup)
+    assert not complete
+    assert isinstance(result, str) and result
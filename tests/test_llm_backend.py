@@ -0,0 +1,46 @@
+from llm_backend import GeminiBackend, StubBackend, estimate_tokens
+
+INSTRUCTION = "당신은 IT 이력서 작성을 돕는 상담가입니다. " * 10
+PROMPT = "지원 직무: 백엔드 개발자"
+
+
+class FakeModel:
+    def __init__(self, name, system_instruction=None):
+        self.system_instruction = system_instruction
+
+
+class FakeGenai:
+    GenerativeModel = FakeModel
+
+
+def gemini(supports_system_instruction):
+    backend = GeminiBackend("key")
+    backend._genai = FakeGenai
+    backend._model = FakeModel("m")
+    backend.supports_system_instruction = supports_system_instruction
+    return backend
+
+
+def test_gemini_counts_system_instruction_as_uncached_input():
+    expected = estimate_tokens(PROMPT) + estimate_tokens(INSTRUCTION)
+    for supported in (True, False):
+        backend = gemini(supported)
+        for _ in range(2):
+            backend._prepare(PROMPT, INSTRUCTION)
+        assert backend.usage["cached_input_tokens"] == 0
+        # 앞에 붙여 보내는 경우는 구분 줄바꿈만큼 차이가 날 수 있음
+        assert abs(backend.usage["input_tokens"] - 2 * expected) <= 2
+
+
+def test_gemini_reuses_instruction_model():
+    backend = gemini(True)
+    first, _ = backend._prepare(PROMPT, INSTRUCTION)
+    second, contents = backend._prepare(PROMPT, INSTRUCTION)
+    assert first is second and first.system_instruction == INSTRUCTION
+    assert contents == PROMPT
+
+
+def test_stub_input_includes_instruction():
+    backend = StubBackend(latency=0)
+    backend.generate(PROMPT, system_instruction=INSTRUCTION)
+    assert backend.usage["input_tokens"] == estimate_tokens(PROMPT) + estimate_tokens(INSTRUCTION)
@@ -0,0 +1,59 @@
+import sqlite3
+
+from llm_cache import ResponseCache, make_cache_key
+
+
+def test_key_ignores_whitespace_differences():
+    assert make_cache_key("  안녕\n\n   하세요 ", "m") == make_cache_key("안녕\n하세요", "m")
+    assert make_cache_key("안녕", "m") != make_cache_key("안녕", "other")
+
+
+def test_hit_after_set():
+    cache = ResponseCache()
+    assert cache.get("k") is None
+    cache.set("k", "v")
+    assert cache.get("k") == "v"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["memory_items"]) == (1, 1, 1)
+
+
+def test_memory_eviction_is_lru():
+    cache = ResponseCache(max_memory_items=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")  # b가 가장 오래 안 쓴 항목이 됨
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    ResponseCache(path).set("k", "v")
+    cache = ResponseCache(path)
+    assert cache.get("k") == "v"
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_disk_entries_expire_after_ttl(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    ResponseCache(path, ttl=60).set("k", "v")
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("UPDATE responses SET created_at = created_at - 120")
+    conn.close()
+
+    cache = ResponseCache(path, ttl=60)
+    assert cache.get("k") is None
+    assert cache.stats()["disk_items"] == 0
+
+
+def test_disk_overflow_drops_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), max_memory_items=1, max_disk_items=2)
+    for key in ("a", "b", "c"):
+        cache.set(key, key)
+    assert cache.stats()["disk_items"] == 2
+    assert cache.get("a") is None
+    assert cache.get("c") == "c"
@@ -0,0 +1,152 @@
+import time
+
+import pytest
+
+from llm_backend import LLMBackend
+from resilient_client import CircuitBreaker, CircuitOpenError, DeadlineExceeded, ResilientBackend, is_retryable
+
+
+class ScriptedBackend(LLMBackend):
+    """정해 둔 순서대로 예외를 내거나 응답하는 백엔드"""
+
+    name = model_name = "scripted"
+
+    def __init__(self, outcomes, delay=0.0):
+        super().__init__()
+        self.outcomes = list(outcomes)
+        self.delay = delay
+        self.calls = 0
+
+    def generate(self, prompt, system_instruction=None, response_schema=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        outcome = self.outcomes.pop(0) if self.outcomes else "ok"
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def resilient(backend, **options):
+    options = {"backoff_base": 0.001, "backoff_max": 0.001, "hedge_percentile": 0, **options}
+    return ResilientBackend(backend, **options)
+
+
+def test_retryable_errors():
+    assert is_retryable(ConnectionError())
+    assert is_retryable(TimeoutError())
+    assert not is_retryable(ValueError())
+
+
+def test_transient_errors_are_retried():
+    backend = ScriptedBackend([ConnectionError(), ConnectionError(), "done"])
+    client = resilient(backend, max_attempts=3)
+    assert client.generate("p") == "done"
+    assert backend.calls == 3
+    assert client.stats()["retries"] == 2
+
+
+def test_non_retryable_error_is_raised_without_retry():
+    backend = ScriptedBackend([ValueError("잘못된 요청")])
+    client = resilient(backend, max_attempts=3)
+    with pytest.raises(ValueError):
+        client.generate("p")
+    assert backend.calls == 1
+    assert client.breaker.state == "closed"
+
+
+def test_breaker_opens_after_threshold_and_half_opens_after_reset():
+    backend = ScriptedBackend([ConnectionError()] * 2)
+    client = resilient(backend, max_attempts=1, failure_threshold=2, reset_timeout=0.05)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            client.generate("p")
+    assert client.breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        client.generate("p")
+    assert backend.calls == 2
+    assert client.stats()["rejected"] == 1
+
+    time.sleep(0.06)
+    assert client.breaker.state == "half_open"
+    assert client.generate("p") == "ok"
+    assert client.breaker.state == "closed"
+
+
+def test_half_open_allows_single_probe_and_reopens_on_failure():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.02)
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(0.03)
+    assert breaker.allow()
+    assert not breaker.allow()  # 시험 호출은 하나만
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_deadline_exceeded():
+    client = resilient(ScriptedBackend([], delay=0.2), deadline=0.05, max_attempts=1)
+    with pytest.raises(DeadlineExceeded):
+        client.generate("p")
+    assert client.stats()["deadline_exceeded"] == 1
+
+
+def test_stream_retries_until_first_chunk():
+    backend = ScriptedBackend([ConnectionError(), "streamed"])
+    client = resilient(backend, max_attempts=2)
+    assert "".join(client.stream("p")) == "streamed"
+    assert backend.calls == 2
+
+
+def test_client_error_leaves_breaker_state_unchanged():
+    backend = ScriptedBackend([ConnectionError(), ValueError("잘못된 요청"), ValueError("잘못된 요청")])
+    client = resilient(backend, max_attempts=1, failure_threshold=1, reset_timeout=0.02)
+    with pytest.raises(ConnectionError):
+        client.generate("p")
+    time.sleep(0.03)
+    # 반열림 상태의 시험 호출이 잘못된 요청으로 끝나도 닫히지 않고, 다음 시험 호출은 가능
+    with pytest.raises(ValueError):
+        client.generate("p")
+    assert client.breaker.state == "half_open"
+    with pytest.raises(ValueError):
+        client.generate("p")
+    assert client.generate("p") == "ok"
+    assert client.breaker.state == "closed"
+
+
+class StallingBackend(LLMBackend):
+    name = model_name = "stalling"
+
+    def __init__(self, stall):
+        super().__init__()
+        self.stall = stall
+
+    def stream(self, prompt, system_instruction=None):
+        yield "첫 조각"
+        time.sleep(self.stall)
+        yield "늦은 조각"
+
+
+def test_stalled_stream_hits_deadline_after_first_chunk():
+    client = resilient(StallingBackend(stall=1.0), deadline=0.1)
+    chunks = []
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        for chunk in client.stream("p"):
+            chunks.append(chunk)
+    assert chunks == ["첫 조각"]
+    assert time.monotonic() - start < 0.5
+    assert client.stats()["deadline_exceeded"] == 1
+
+
+def test_stream_passes_all_chunks_within_deadline():
+    client = resilient(StallingBackend(stall=0.01), deadline=1.0)
+    assert list(client.stream("p")) == ["첫 조각", "늦은 조각"]
+
+
+def test_hedges_in_flight_are_capped():
+    client = resilient(ScriptedBackend([], delay=0.05), hedge_percentile=50, hedge_min_samples=1,
+                       max_hedges_in_flight=0)
+    client.latencies["generate"].add(0.001)
+    assert client.generate("p") == "ok"
+    stats = client.stats()
+    assert (stats["hedges"], stats["hedges_skipped"]) == (0, 1)
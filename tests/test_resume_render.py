@@ -0,0 +1,75 @@
+import io
+import zipfile
+from xml.etree import ElementTree
+
+import pytest
+
+from interview import new_resume_data
+from resume_render import FORMATS, ResumeRenderer, build_document, render
+
+
+@pytest.fixture
+def data():
+    data = new_resume_data({"name": "홍길동", "email": "a@b.c", "phone": "010-0000-0000", "portfolio": ""})
+    data["job_info"]["title"] = "백엔드 개발자"
+    data["summary"] = ["5년차 백엔드 개발자입니다"]
+    data["experience"] = ["A사에서 결제 API 응답 시간 40% 개선"]
+    data["projects"] = ["주문 시스템 MSA 전환"]
+    data["skills"] = ["- Java, Spring"]
+    return data
+
+
+def test_template_orders_sections(data):
+    headings = lambda template: [block[1] for block in build_document(data, template) if block[0] == "heading"]
+    assert headings("standard") != headings("tech")
+    assert sorted(headings("standard")) == sorted(headings("tech"))
+
+
+@pytest.mark.parametrize("fmt", ["txt", "md", "html"])
+def test_text_formats_contain_answers(data, fmt):
+    text = render(data, fmt)
+    assert isinstance(text, str)
+    assert "홍길동" in text and "결제 API" in text
+
+
+def test_docx_is_valid_word_package(data):
+    content = render(data, "docx")
+    with zipfile.ZipFile(io.BytesIO(content)) as docx:
+        assert {"[Content_Types].xml", "_rels/.rels", "word/document.xml"} <= set(docx.namelist())
+        document = docx.read("word/document.xml").decode("utf-8")
+    root = ElementTree.fromstring(document)
+    namespace = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+    text = "".join(node.text or "" for node in root.iter(namespace + "t"))
+    assert "홍길동" in text and "결제 API" in text
+
+
+def test_pdf_structure(data):
+    content = render(data, "pdf")
+    assert content.startswith(b"%PDF-1.4") and content.rstrip().endswith(b"%%EOF")
+    # xref 위치와 각 객체 위치가 실제 오프셋과 맞아야 뷰어가 읽을 수 있음
+    xref = int(content.rsplit(b"startxref\n", 1)[1].split(b"\n", 1)[0])
+    assert content[xref:xref + 4] == b"xref"
+    offsets = [int(line[:10]) for line in content[xref:].split(b"\n")[3:] if line.endswith(b" n ")]
+    for number, offset in enumerate(offsets, 1):
+        assert content[offset:].startswith(f"{number} 0 obj".encode())
+    # 한글은 UCS-2 16진수로 들어감
+    assert "홍".encode("utf-16-be").hex().upper().encode() in content
+
+
+def test_renderer_caches_until_section_changes(data):
+    renderer = ResumeRenderer()
+    first = renderer.render(data, "md")
+    assert renderer.render(data, "md") is first
+    data["projects"].append("배포 자동화 도구 개발")
+    second = renderer.render(data, "md")
+    assert "배포 자동화" in second
+    stats = renderer.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+    # 바뀌지 않은 섹션 블록은 다시 만들지 않음
+    assert stats["section_hits"] > 0
+
+
+def test_unknown_format(data):
+    assert set(FORMATS) == {"txt", "md", "html", "docx", "pdf"}
+    with pytest.raises(ValueError):
+        render(data, "rtf")
@@ -0,0 +1,86 @@
+from retrieval import COMPACT_MIN_DEAD, SessionIndex, document_text, tokenize, turn_step
+from session_model import bot_message, user_message
+from term_index import TermIndex
+
+TERMS = TermIndex({"language": {"Java": ["자바"]}, "data_infra": {"Kafka": ["카프카"]}})
+
+
+def test_tokenize():
+    # 한글은 어절별 글자 2-gram, 한 글자 어절은 그대로
+    assert tokenize("주문 서버를 Java로") == ["주문", "서버", "버를", "java", "로"]
+    assert tokenize("자바 개발", TERMS) == ["자바", "개발", "@java"]
+
+
+def test_bm25_ranks_relevant_answer_first():
+    index = SessionIndex()
+    texts = [
+        "사내 인사 시스템 화면을 리액트로 만들었습니다",
+        "카프카로 주문 이벤트를 처리하는 파이프라인을 구축했습니다",
+        "주문 화면 개선 프로젝트를 진행했습니다",
+    ]
+    for i, text in enumerate(texts):
+        index.add(("turn", i), "경력", text, TERMS)
+
+    results = index.search("Kafka 이벤트 처리 경험", term_index=TERMS)
+    assert results[0][0] == ("turn", 1)
+    assert all(score > 0 for _, _, score in results)
+    assert index.search("관계없는 질문") == []
+
+
+def test_remove_and_exclude():
+    index = SessionIndex()
+    index.add(("turn", 0), "", "자바 백엔드 개발")
+    index.add(("turn", 1), "", "자바 배치 개발")
+    assert [key for key, _, _ in index.search("자바", exclude=lambda key: key == ("turn", 0))] == [("turn", 1)]
+    index.remove(("turn", 1))
+    assert [key for key, _, _ in index.search("자바")] == [("turn", 0)]
+    assert len(index) == 1
+
+
+def test_repeated_edits_compact_dead_documents():
+    index = SessionIndex()
+    index.add(("turn", 0), "경력", "카프카로 주문 이벤트를 처리했습니다", TERMS)
+    for i in range(COMPACT_MIN_DEAD * 3):
+        index.add(("field", "experience", "회사명"), "경력", f"회사명: 회사{i}")
+    stats = index.stats()
+    assert stats["documents"] == 2
+    assert stats["deleted"] < COMPACT_MIN_DEAD
+    assert len(index.docs) < COMPACT_MIN_DEAD + 2
+    # 앞선 수정에만 있던 단어는 사전에서도 빠짐
+    assert stats["vocabulary"] < COMPACT_MIN_DEAD * 2
+
+    assert [key for key, _, _ in index.search("Kafka 이벤트", term_index=TERMS)] == [("turn", 0)]
+    [(key, _, _)] = index.search(f"회사{COMPACT_MIN_DEAD * 3 - 1}", k=1)
+    assert key == ("field", "experience", "회사명")
+    assert index.search("0") == []  # 첫 수정의 "회사0"에만 있던 단어
+
+
+def test_token_ids_are_distinct():
+    index = SessionIndex()
+    tokens = [f"t{i}" for i in range(5000)]
+    index.add(("turn", 0), "", " ".join(tokens))
+    assert len(set(index._token_ids(tokens).tolist())) == len(tokens)
+    assert len(index._token_ids(["없는단어"])) == 0
+
+
+def test_sync_indexes_new_turns_and_changed_fields():
+    history = [bot_message("직무는?"), user_message("자바 백엔드 개발자"), bot_message("경력은?"), user_message("A사 3년")]
+    resume = {"structured": {"experience": {"회사명": "A사", "기술": ["Java"]}}}
+    labels = {2: "직무", 4: "경력", "experience": "경력"}
+    index = SessionIndex()
+    index.sync(history, resume, {2: 0, 4: 2}, labels, TERMS)
+    assert len(index) == 4
+    assert index.rows[("turn", 3)] is not None
+    assert index.docs[index.rows[("turn", 3)]][1] == "경력"
+
+    resume["structured"]["experience"]["회사명"] = "B사"
+    del resume["structured"]["experience"]["기술"]
+    index.sync(history, resume, {2: 0, 4: 2}, labels, TERMS)
+    assert len(index) == 3
+    [(key, label, _)] = index.search("B사", k=1)
+    assert document_text(key, history, resume) == "회사명: B사"
+
+
+def test_turn_step():
+    starts = [(2, 0), (3, 4), (4, 9)]
+    assert [turn_step(starts, i) for i in (0, 3, 4, 12)] == [2, 2, 3, 4]
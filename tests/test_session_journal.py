@@ -0,0 +1,162 @@
+import time
+
+import pytest
+
+from session_journal import SessionJournal, apply_record, dumps, loads
+
+KEYS = ("step", "chat_history", "context")
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = SessionJournal(
+        str(tmp_path / "sessions.sqlite3"), KEYS,
+        append_keys=("chat_history",), tuple_keys=("chat_history",),
+        flush_interval=60, snapshot_every=50, ttl=60,
+    )
+    yield journal
+    journal.close()
+
+
+def test_records_replay():
+    state = {"chat_history": [("🧑", "a")], "step": 1}
+    apply_record(state, {"k": "chat_history", "a": [["🤖", "b"]]})
+    apply_record(state, {"k": "step", "v": 2})
+    apply_record(state, {"k": "context", "d": 1})
+    assert state == {"chat_history": [("🧑", "a"), ["🤖", "b"]], "step": 2}
+    apply_record(state, {"k": "step", "d": 1})
+    assert "step" not in state
+
+
+def test_int_keys_round_trip():
+    assert loads(dumps({1: "a", 2: {3: "b"}})) == {1: "a", 2: {3: "b"}}
+
+
+def test_track_flush_load_round_trip(journal):
+    state = {"step": 2, "chat_history": [("🤖", "직무는?")], "context": {"current_topic": "job_info"}}
+    tracker = {}
+    assert journal.track("s", state, tracker) == 3
+    state["chat_history"].append(("🧑", "백엔드 개발자"))
+    state["step"] = 3
+    del state["context"]
+    assert journal.track("s", state, tracker) == 3
+    # 바뀐 것이 없으면 기록하지 않음
+    assert journal.track("s", state, tracker) == 0
+    journal.flush()
+
+    assert journal.load("s") == {"step": 3, "chat_history": [("🤖", "직무는?"), ("🧑", "백엔드 개발자")]}
+    assert journal.load("missing") is None
+
+
+def test_appended_messages_are_recorded_as_append(journal):
+    state = {"chat_history": [("🤖", "a")]}
+    tracker = {}
+    journal.track("s", state, tracker)
+    state["chat_history"].append(("🧑", "b"))
+    journal.track("s", state, tracker)
+    journal.flush()
+    records = [loads(row[0]) for row in journal._conn.execute(
+        "SELECT record FROM session_journal WHERE session_id = 's' ORDER BY seq")]
+    assert records[-1] == {"k": "chat_history", "a": [["🧑", "b"]]}
+
+
+def test_snapshot_replaces_older_records(tmp_path):
+    journal = SessionJournal(str(tmp_path / "j.sqlite3"), KEYS, flush_interval=60, snapshot_every=3)
+    state, tracker = {}, {}
+    for step in range(1, 6):
+        state["step"] = step
+        journal.track("s", state, tracker)
+    journal.flush()
+    assert journal.stats()["snapshots"] == 1
+    assert journal._conn.execute("SELECT COUNT(*) FROM session_journal").fetchone()[0] == 2
+    assert journal.load("s") == {"step": 5}
+    journal.close()
+
+
+def test_load_uses_buffered_records_when_flush_fails(journal, monkeypatch):
+    import sqlite3
+
+    state, tracker = {"step": 1}, {}
+    journal.track("s", state, tracker)
+    journal.flush()
+    state["step"] = 2
+    journal.track("s", state, tracker)
+
+    def locked(batch):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(journal, "_write", locked)
+    assert journal.load("s") == {"step": 2}
+    assert journal.stats()["pending"] == 1
+
+
+def test_delete_removes_rows_and_pending_records(journal):
+    state, tracker = {"step": 1}, {}
+    journal.track("s", state, tracker)
+    journal.flush()
+    state["step"] = 2
+    journal.track("s", state, tracker)
+    journal.delete("s")
+    journal.flush()
+    assert journal.load("s") is None
+    assert journal.stats()["pending"] == 0
+
+
+def test_purge_expired_sessions(journal):
+    old, fresh = {"step": 1}, {"step": 1}
+    old_tracker, fresh_tracker = {}, {}
+    journal.track("old", old, old_tracker)
+    journal.track("fresh", fresh, fresh_tracker)
+    journal.flush()
+    with journal._conn:
+        journal._conn.execute("UPDATE session_journal SET created_at = ? WHERE session_id = 'old'", (time.time() - 120,))
+
+    assert journal.purge_expired() == 1
+    assert journal.load("old") is None
+    assert journal.load("fresh") == {"step": 1}
+
+    # 지운 세션이 다시 기록하면 바뀐 키만이 아니라 전체 상태를 남김
+    old["step"] = 2
+    old["context"] = {"current_topic": "skills"}
+    journal.track("old", old, old_tracker)
+    journal.flush()
+    assert journal.load("old") == {"step": 2, "context": {"current_topic": "skills"}}
+
+
+def test_track_and_purge_do_not_deadlock(journal):
+    import threading
+
+    errors = []
+    stop = threading.Event()
+
+    def purge():
+        while not stop.is_set():
+            journal.purge_expired(now=time.time() + 120)
+
+    def track():
+        try:
+            for i in range(200):
+                journal.track(f"s{i}", {"step": i}, {})
+                journal.flush()
+        except Exception as e:
+            errors.append(e)
+
+    purger = threading.Thread(target=purge, daemon=True)
+    tracker = threading.Thread(target=track, daemon=True)
+    purger.start()
+    tracker.start()
+    tracker.join(10)
+    stop.set()
+    purger.join(10)
+    assert not tracker.is_alive() and not purger.is_alive(), "track와 purge가 서로를 기다립니다"
+    assert errors == []
+
+
+def test_deleted_sessions_are_forgotten_after_grace(journal, monkeypatch):
+    import session_journal
+
+    monkeypatch.setattr(session_journal, "DELETED_GRACE", 0.0)
+    for i in range(5):
+        journal.delete(f"s{i}")
+    journal.purge_expired()
+    assert journal._deleted == {}
@@ -0,0 +1,36 @@
+import gc
+
+from session_model import DerivedState, SessionMemoryRegistry
+
+
+def test_evict_clears_idle_sessions_derived_state():
+    registry = SessionMemoryRegistry(idle_after=60, ttl=3600)
+    idle, active = DerivedState(retrieval_index=object()), DerivedState(retrieval_index=object())
+    registry.update("idle", 1000, now=0, derived=idle, derived_bytes=400)
+    registry.update("active", 1000, now=100, derived=active, derived_bytes=400)
+
+    assert registry.evict(now=110) == ["idle"]
+    assert idle == {} and "retrieval_index" in active
+    report = registry.report(now=110)
+    assert report["total_bytes"] == 1600
+    assert report["evicted_sessions"] == 1
+    # 다시 활동하기 전까지는 다시 비우지 않음
+    assert registry.evict(now=120) == []
+
+
+def test_evict_over_session_cap_starts_with_oldest():
+    registry = SessionMemoryRegistry(idle_after=600, max_sessions=2)
+    states = [DerivedState(validation_cache={}) for _ in range(3)]
+    for i, derived in enumerate(states):
+        registry.update(f"s{i}", 100, now=i, derived=derived)
+    assert registry.evict(now=3) == ["s0"]
+    assert [bool(derived) for derived in states] == [False, True, True]
+
+
+def test_registry_does_not_keep_closed_sessions_alive():
+    registry = SessionMemoryRegistry(idle_after=0)
+    derived = DerivedState(retrieval_index=object())
+    registry.update("closed", 100, now=0, derived=derived)
+    del derived
+    gc.collect()
+    assert registry.evict(now=10) == []
@@ -0,0 +1,32 @@
+import pytest
+
+from session_store import SQLiteSessionStore, VersionConflict, create_session_store
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteSessionStore(str(tmp_path / "store.sqlite3"))
+
+
+def test_save_and_load(store):
+    assert store.load("s") == (None, 0)
+    assert store.save("s", {"step": 2, "memory": {1: "요약"}}, 0) == 1
+    assert store.load("s") == ({"step": 2, "memory": {1: "요약"}}, 1)
+    assert store.version("s") == 1
+
+
+def test_stale_version_raises_conflict(store):
+    store.save("s", {"step": 2}, 0)
+    assert store.save("s", {"step": 3}, 1) == 2
+    with pytest.raises(VersionConflict):
+        store.save("s", {"step": 4}, 1)
+    with pytest.raises(VersionConflict):
+        store.save("s", {"step": 4}, 0)
+    assert store.load("s") == ({"step": 3}, 2)
+
+
+def test_create_session_store(tmp_path):
+    assert create_session_store("") is None
+    store = create_session_store(f"sqlite:///{tmp_path}/s.sqlite3")
+    assert isinstance(store, SQLiteSessionStore)
+    assert store.path == f"{tmp_path}/s.sqlite3"
@@ -0,0 +1,151 @@
+import threading
+import time
+
+import pytest
+
+from single_flight import SingleFlight, SingleFlightAbandoned, SingleFlightTimeout
+
+
+def _wait_for_waiters(flight, key, count, timeout=2.0):
+    end = time.monotonic() + timeout
+    while flight.waiters(key) < count:
+        assert time.monotonic() < end, "대기 요청이 모이지 않았습니다"
+        time.sleep(0.001)
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(2)
+        return "result"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", fn))) for _ in range(8)]
+    threads[0].start()
+    while not calls:
+        time.sleep(0.001)
+    for thread in threads[1:]:
+        thread.start()
+    _wait_for_waiters(flight, "k", 7)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ["result"] * 8
+    stats = flight.stats()
+    assert (stats["executed"], stats["shared"], stats["in_flight"], stats["waiting"]) == (1, 7, 0, 0)
+
+
+def test_error_is_shared_with_waiters():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def fn():
+        started.set()
+        release.wait(2)
+        raise ValueError("실패")
+
+    errors = []
+
+    def call():
+        try:
+            flight.do("k", fn)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(2)
+    waiter = threading.Thread(target=call)
+    waiter.start()
+    _wait_for_waiters(flight, "k", 1)
+    release.set()
+    leader.join()
+    waiter.join()
+    assert len(errors) == 2 and errors[0] is errors[1]
+
+
+def test_waiter_timeout_is_counted():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def fn():
+        started.set()
+        release.wait(2)
+        return "late"
+
+    leader = threading.Thread(target=lambda: flight.do("k", fn))
+    leader.start()
+    started.wait(2)
+    with pytest.raises(SingleFlightTimeout):
+        flight.do("k", fn, timeout=0.01)
+    assert flight.waiters("k") == 0
+    release.set()
+    leader.join()
+
+    stats = flight.stats()
+    assert (stats["executed"], stats["timeouts"], stats["shared"]) == (1, 1, 0)
+
+
+def test_finished_call_is_not_cached():
+    flight = SingleFlight()
+    counter = iter(range(10))
+    assert flight.do("k", lambda: next(counter)) == 0
+    assert flight.do("k", lambda: next(counter)) == 1
+
+
+def test_stream_followers_replay_and_follow_leader_chunks():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        yield "안녕"
+        release.wait(2)
+        yield "하세요"
+
+    leader = flight.stream("k", fn)
+    assert next(leader) == "안녕"
+    results = []
+    follower = threading.Thread(target=lambda: results.append(list(flight.stream("k", fn, timeout=2))))
+    follower.start()
+    _wait_for_waiters(flight, "k", 1)
+    release.set()
+    assert list(leader) == ["하세요"]
+    follower.join()
+
+    assert len(calls) == 1
+    assert results == [["안녕", "하세요"]]
+    assert flight.stats()["shared"] == 1
+
+
+def test_stream_error_and_abandon_reach_followers():
+    flight = SingleFlight()
+    def failing():
+        yield "a"
+        raise ConnectionError("끊김")
+
+    leader = flight.stream("k", failing)
+    next(leader)
+    follower = flight.stream("k", failing, timeout=2)
+    assert next(follower) == "a"
+    with pytest.raises(ConnectionError):
+        list(leader)
+    with pytest.raises(ConnectionError):
+        list(follower)
+
+    # leader가 중간에 그만두면 뒤따른 요청은 일부만 받은 응답을 완성된 것으로 보지 않음
+    leader = flight.stream("k2", lambda: iter(["x", "y"]))
+    next(leader)
+    follower = flight.stream("k2", lambda: iter(["x", "y"]), timeout=2)
+    assert next(follower) == "x"
+    leader.close()
+    with pytest.raises(SingleFlightAbandoned):
+        list(follower)
+    assert flight.stats()["in_flight"] == 0
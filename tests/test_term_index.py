@@ -0,0 +1,59 @@
+import pytest
+
+from term_index import TermDictionaryError, TermIndex
+
+TERMS = {
+    "language": {"Java": ["자바"], "JavaScript": ["자바스크립트", "JS"], "Go": ["golang", "Go 언어"]},
+    "framework": {"Spring": ["스프링"], "Spring Boot": ["스프링 부트"]},
+    "role": {"Backend Developer": ["백엔드 개발자"]},
+}
+
+
+@pytest.fixture(scope="module")
+def index():
+    return TermIndex(TERMS)
+
+
+def names(matches):
+    return [match.name for match in matches]
+
+
+def test_word_boundary(index):
+    assert names(index.find("JavaScript")) == ["JavaScript"]
+    assert names(index.find("Java와 JavaScript")) == ["Java", "JavaScript"]
+    assert index.find("Javas") == []
+
+
+def test_leftmost_longest(index):
+    assert names(index.find("자바스크립트")) == ["JavaScript"]
+    assert names(index.find("Spring Boot 3")) == ["Spring Boot"]
+    assert names(index.find("스프링 부트와 스프링")) == ["Spring Boot", "Spring"]
+
+
+def test_short_ascii_names_need_explicit_alias(index):
+    assert index.find("go to market") == []
+    assert names(index.find("Go 언어로 개발")) == ["Go"]
+
+
+def test_positions_point_into_original_text(index):
+    text = "저는  ＪＡＶＡ 개발자"
+    [match] = index.find(text)
+    assert (match.name, text[match.start:match.end]) == ("Java", "ＪＡＶＡ")
+
+
+def test_terms_and_group(index):
+    text = "백엔드 개발자로 자바, 스프링, Java를 씁니다"
+    assert index.terms(text) == ["Backend Developer", "Java", "Spring"]
+    assert index.terms(text, categories=("language",)) == ["Java"]
+    assert index.group(text) == {"role": ["Backend Developer"], "language": ["Java"], "framework": ["Spring"]}
+
+
+def test_unknown_category():
+    with pytest.raises(TermDictionaryError):
+        TermIndex({"unknown": {"X": []}})
+
+
+def test_default_dictionary_loads():
+    index = TermIndex.from_file()
+    assert index.term_count > 0
+    assert names(index.find("JavaScript와 Java")) == ["JavaScript", "Java"]